@@ -0,0 +1,5 @@
+"""
+Offline benchmarks. Each module runs on its own, e.g.
+
+    python -m automation-project.benchmarks.history_grid
+"""
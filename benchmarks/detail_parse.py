@@ -0,0 +1,222 @@
+"""
+Detail and grid page parsing: the old scrapers' extraction (a whole-page
+html.parser tree per scraper, then soup.find per id) versus DetailPage
+with config.HTML_PARSER on the tables only (html_parse.py).
+
+Runs on the synthetic pages in fixtures/ plus a larger generated detail page
+with --lines line items and the portal's navigation menu around it.
+Times building the tree and the extraction end to end, and checks the
+old and new extraction give identical tuples. The requisition grid was
+read through Selenium before, so it has no old bs4 code: its "old"
+column is the current parse_history_grid under html.parser.
+
+    python -m automation-project.benchmarks.detail_parse [--lines 60]
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from datetime import date
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from .. import config, html_parse
+from ..scrape_history import parse_history_grid
+from ..scrape_received import parse_received_detail
+from ..scrape_upcoming import parse_upcoming_detail
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+CUTOFF = date(2024, 1, 1)
+
+_LINE_RE = re.compile(r'\s*<tr><td class="GridDetail" id="1_1">.*?</tr>', re.S)
+
+
+def synthetic_detail(lines: int, menu_links: int = 300) -> str:
+    """fixtures/po_detail.html with `lines` line items and a full-size menu."""
+    html = (FIXTURES / "po_detail.html").read_text(encoding="utf-8")
+    row = _LINE_RE.search(html)
+    rows = "".join(re.sub(r'id="1_', f'id="{n}_', row.group()) for n in range(1, lines + 1))
+    html = html[:row.start()] + rows + re.sub(r'\s*<tr><td class="GridDetail".*?</tr>', "",
+                                              html[row.start():], flags=re.S)
+    menu = "".join(f'<li><a id="linkpitmenu_item_{n}" href="/menu/{n}">Menu entry {n}</a></li>'
+                   for n in range(menu_links))
+    return html.replace("<body>", f'<body><ul class="menu">{menu}</ul>', 1)
+
+
+# --------------------------------------------------
+# Old extraction, as the scrapers did it before html_parse.py
+# --------------------------------------------------
+
+def _old_received(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    od = soup.find(id="PODatePlaced_DISP")
+    rd = soup.find(id="DateComplete_DISP")
+    od_text = od.get_text().strip() if od else ""
+    rd_text = rd.get_text().strip() if rd else ""
+
+    invoice_hdr = None
+    for hdr in soup.find_all("td", class_="SecHeader"):
+        if "CAD-Invoice" in hdr.get_text():
+            invoice_hdr = hdr
+            break
+    received_col = 12 if invoice_hdr else 11
+
+    items = []
+    idx = 1
+    while True:
+        idf = soup.find(id=f"{idx}_1")
+        if not idf:
+            break
+        rf = soup.find(id=f"{idx}_{received_col}")
+        idx += 1
+        if not rf:
+            continue
+        try:
+            qty_rec = int(float(rf.get_text(strip=True).replace(",", "")))
+        except ValueError:
+            continue
+
+        iid = idf.get_text(strip=True)
+        iurl = f"{config.BASE_PO_DOMAIN}" + idf.find("a")["href"]
+        desc_td = soup.find(id=f"{idx - 1}_2")
+        raw_desc = desc_td.get_text(strip=True) if desc_td else ""
+
+        price_per_unit = ""
+        cost_td = soup.find(id=f"{idx - 1}_4")
+        if cost_td:
+            price_div = cost_td.find("div", id="InvoiceCostOC_DISP")
+            if price_div:
+                try:
+                    price_per_unit = f"{float(price_div.get_text(strip=True)):0.2f}"
+                except Exception:
+                    price_per_unit = price_div.get_text(strip=True)
+
+        items.append((iid, iurl, raw_desc, qty_rec, price_per_unit))
+    return od_text, rd_text, items
+
+
+def _old_upcoming(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    date_el = soup.find(id="PODatePlaced_DISP")
+    if date_el is not None:
+        po_date = date_el.get_text().strip()
+    else:
+        date_txt = re.search(r"\b\d{2}/\d{2}/\d{4}\b", soup.get_text())
+        po_date = date_txt.group() if date_txt else "Unknown"
+
+    header_row = None
+    for table in soup.find_all("table"):
+        for tr in table.find_all("tr"):
+            ths = tr.find_all("th")
+            tds = tr.find_all("td")
+            if ths and len(ths) >= 6:
+                header_row = tr
+                break
+            if tds and len(tds) >= 6 and any("SecHeader" in td.get("class", []) for td in tds):
+                header_row = tr
+                break
+        if header_row:
+            break
+    if not header_row:
+        return None
+
+    col_suffix_map = {}
+    for cell in header_row.find_all(["th", "td"]):
+        text = cell.get_text(strip=True).lower()
+        m = re.search(r"col-(\d+)$", cell.get("id", ""))
+        if not m:
+            continue
+        if "item" in text and "id" in text: col_suffix_map["item no (id)"] = m.group(1)
+        elif "description" in text: col_suffix_map["description"] = m.group(1)
+        elif "quantity" in text: col_suffix_map["quantity"] = m.group(1)
+        elif "received" in text: col_suffix_map["received"] = m.group(1)
+
+    items = []
+    for data_row in header_row.find_next_siblings("tr"):
+        cell_map = {}
+        for cell in data_row.find_all("td"):
+            m = re.search(r"_(\d+)$", cell.get("id", ""))
+            if m:
+                cell_map[m.group(1)] = cell
+        try:
+            qty_cell = cell_map.get(col_suffix_map["quantity"])
+            rec_cell = cell_map.get(col_suffix_map["received"])
+            if not qty_cell or not rec_cell:
+                continue
+            qty_ord_raw = qty_cell.get_text(strip=True).replace(",", "")
+            qty_rec_raw = rec_cell.get_text(strip=True).replace(",", "")
+            qty_ord = int(float(qty_ord_raw)) if qty_ord_raw.replace(".", "", 1).isdigit() else 0
+            qty_rec = int(float(qty_rec_raw)) if qty_rec_raw.replace(".", "", 1).isdigit() else 0
+        except Exception:
+            continue
+        remaining = qty_ord - qty_rec
+        if remaining == 0:
+            continue
+
+        item_cell = cell_map.get(col_suffix_map.get("item no (id)", "1"))
+        if not item_cell:
+            continue
+        a_tag = item_cell.find("a")
+        item_id = a_tag.get_text(strip=True) if a_tag else item_cell.get_text(strip=True)
+        item_url = ("https://example-procurement.com" + a_tag["href"]) if a_tag else ""
+        desc_cell = cell_map.get(col_suffix_map.get("description", "2"))
+        desc = desc_cell.get_text(strip=True) if desc_cell else ""
+        items.append((item_id, item_url, desc, remaining))
+    return po_date, items
+
+
+def _per_page(fn, html, repeat: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    return (time.perf_counter() - t) / repeat
+
+
+def _extract_old(name: str, html: str):
+    if name == "history_grid":
+        config.HTML_PARSER = "html.parser"
+        return parse_history_grid(html, "https://example-portal.com/", CUTOFF)
+    return _old_received(html), _old_upcoming(html)
+
+
+def _extract_new(name: str, html: str):
+    if name == "history_grid":
+        return parse_history_grid(html, "https://example-portal.com/", CUTOFF)
+    return parse_received_detail(html), parse_upcoming_detail(html)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--lines", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    pages = {p.stem: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))}
+    pages[f"synthetic ({args.lines} lines)"] = synthetic_detail(args.lines)
+    wanted = config.HTML_PARSER
+
+    print(f"📄 {len(pages)} pages, {args.repeat} repeats; configured parser: "
+          f"{html_parse.parser_name()}")
+    # tree: whole page with html.parser vs tables only with the configured
+    # parser; extract: the old per-id lookups vs DetailPage, both scrapers
+    print(f"{'page':>24} {'tree old':>10} {'tree new':>10} {'speed-up':>9}"
+          f" {'extract old':>11} {'extract new':>11} {'speed-up':>9}  same")
+    for name, html in pages.items():
+        old_tree = _per_page(lambda h: BeautifulSoup(h, "html.parser"), html, args.repeat)
+        new_tree = _per_page(lambda h: html_parse.parse_page(h, tables_only=True), html, args.repeat)
+
+        old_out = _extract_old(name, html)
+        old_t = _per_page(lambda h: _extract_old(name, h), html, args.repeat)
+        config.HTML_PARSER = wanted
+        new_out = _extract_new(name, html)
+        new_t = _per_page(lambda h: _extract_new(name, h), html, args.repeat)
+
+        print(f"{name:>24} {old_tree * 1e3:>8.2f}ms {new_tree * 1e3:>8.2f}ms "
+              f"{old_tree / new_tree:>8.1f}× {old_t * 1e3:>9.2f}ms {new_t * 1e3:>9.2f}ms "
+              f"{old_t / new_t:>8.1f}×  {'✅' if old_out == new_out else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+All five workflows end to end against the fixture portal and in-memory
+Sheets, at several data sizes.
+
+For each scale, fixture_server serves Portal(scale) (8 × scale received
+POs, 4 × scale open POs, 40 × scale requisitions) and a FakeSpreadsheet
+is seeded with 500 × scale CAME IN rows and 50 × scale WAITING ON rows.
+Then, in the Full Update order and from cold caches:
+
+    [store import →] process_received_orders → process_upcoming_orders →
+    process_item_summary → process_data_from_2024 →
+    write_weekly_by_month_table [→ sync]
+
+With --store the local store is on: it is filled from the seeded
+sheets first and the workflows' tables reach the sheets in the final
+sync.
+
+Per workflow: wall time, work done and throughput, cells written and
+cells skipped as unchanged (sheets_io diff writes), and
+p50 / p95 latency per PO (detail fetch + parse + normalize, summed from
+the run's instrument spans).
+
+The browser workflows log into the fixture portal with headless Chrome;
+without Chrome they are reported as skipped, and LATEST 2 YEARS is
+seeded from the portal's requisitions so the trend table still runs.
+
+    python -m automation-project.benchmarks.end_to_end [--scales 10,100]
+    python -m automation-project.benchmarks.end_to_end --mode http --workers 4
+    python -m automation-project.benchmarks.end_to_end --store
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Callable, List, NamedTuple, Optional
+
+from .. import config, fixture_server, instrument, store
+from ..browser import get_driver
+from ..fixture_server import Portal
+from ..scrape_history import process_data_from_2024, write_weekly_by_month_table
+from ..scrape_item_summary import process_item_summary
+from ..scrape_received import process_received_orders
+from ..scrape_upcoming import process_upcoming_orders
+from .fake_sheets import FakeSpreadsheet, patched_sheets
+from .item_summary import synthetic_sheets
+
+
+class Workflow(NamedTuple):
+    name: str                   # instrument workflow name
+    func: Callable[[], None]
+    browser: bool
+    unit: str                   # what throughput is counted in
+
+
+def _import_store() -> None:
+    with store.Store(imported=False) as db:
+        db.import_sheets()
+
+
+WORKFLOWS = [
+    Workflow("store import", _import_store, False, "rows imported"),
+    Workflow("received", process_received_orders, True, "POs"),
+    Workflow("upcoming", process_upcoming_orders, True, "POs"),
+    Workflow("item summary", lambda: process_item_summary(full=True), False, "rows read"),
+    Workflow("history", process_data_from_2024, True, "grid pages"),
+    Workflow("trend", write_weekly_by_month_table, False, "rows read"),
+    Workflow("sync", store.sync_sheets, False, "tabs synced"),
+]
+STORE_WORKFLOWS = {"store import", "sync"}
+
+# unit → the instrument counter it is read from (default: the unit itself)
+_COUNTERS = {"rows imported": "store rows imported"}
+
+
+def seed_sheets(portal: Portal, scale: int, with_history: bool) -> FakeSpreadsheet:
+    """CAME IN / WAITING ON / ITEM SUMMARY at `scale`, plus the history tabs."""
+    book = synthetic_sheets(500 * scale, 60 * scale, 50 * scale)
+    book.add("LATEST 2 YEARS", requisition_rows(portal) if with_history else ())
+    book.add("TREND GRAPH")
+    return book
+
+
+def requisition_rows(portal: Portal) -> List[list]:
+    """LATEST 2 YEARS rows for the portal's requisitions, as the history crawl writes them."""
+    cutoff = portal.today - timedelta(days=config.HISTORY_WINDOW_DAYS)
+    rows = []
+    for r in portal.requisitions:
+        if r.when.date() < cutoff:
+            break
+        if r.status != "Fully Received":
+            continue
+        main = "Main Location" in r.title
+        rows.append([f'=HYPERLINK("/Requisition/View.aspx?ReqID={r.number}","{r.number}")',
+                     r.when.strftime("%m/%d/%Y"), f"{r.total:.2f}", "—" if main else "✅"])
+    return rows
+
+
+# --------------------------------------------------
+# MEASURING
+# --------------------------------------------------
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1e3:6.1f}ms" if seconds is not None else f"{'—':>8}"
+
+
+def _units(wf: Workflow, run: instrument.Run) -> int:
+    if wf.unit == "POs":
+        return len(run.slowest(len(run.items)))
+    if wf.unit == "rows read":      # from Sheets, or from the store when it is on
+        return run.counters.get("sheets rows read", 0) + run.counters.get("store rows read", 0)
+    return run.counters.get(_COUNTERS.get(wf.unit, wf.unit), 0)
+
+
+def _browser_available() -> bool:
+    try:
+        driver = get_driver()
+    except Exception as e:
+        first = (str(e).strip().splitlines() or [""])[0]
+        print(f"⚠️ Headless Chrome unavailable ({type(e).__name__}: {first}); "
+              f"browser workflows skipped.")
+        return False
+    driver.quit()
+    return True
+
+
+def run_scale(scale: int, browser: Optional[bool], verbose: bool) -> Optional[bool]:
+    """Run every workflow at one scale; returns whether the browser was usable."""
+    portal = Portal(scale)
+    with fixture_server.serve(portal) as base, tempfile.TemporaryDirectory() as tmp:
+        config.LOGIN_URL = f"{base}/login"
+        config.HOME_URL = f"{base}/home"
+        config.BASE_PO_DOMAIN = base
+        config.PO_CACHE_FILE = os.path.join(tmp, "po_cache.sqlite3")
+        if store.enabled():
+            config.STORE_FILE = os.path.join(tmp, "po_store.sqlite3")
+        if browser is None:
+            browser = _browser_available()
+
+        book = seed_sheets(portal, scale, with_history=not browser)
+        came_in = len(book.worksheet("CAME IN").rows("B11", "I"))
+        print(f"\n📦 Scale {scale}×: {portal.summary()}; CAME IN {came_in} rows")
+        print(f"   {'workflow':<13} {'seconds':>8} {'done':>20} {'per second':>11} "
+              f"{'cells':>8} {'skipped':>8} {'p50/PO':>8} {'p95/PO':>8}")
+
+        with patched_sheets(book):
+            for wf in WORKFLOWS:
+                if wf.name in STORE_WORKFLOWS and not store.enabled():
+                    continue
+                if wf.browser and not browser:
+                    print(f"   {wf.name:<13} ⏭️  skipped (no Chrome)")
+                    continue
+                out = io.StringIO()
+                try:
+                    with (contextlib.nullcontext() if verbose else contextlib.redirect_stdout(out)):
+                        wf.func()
+                except Exception as e:
+                    print(out.getvalue()[-2000:])
+                    print(f"   {wf.name:<13} ❌ {type(e).__name__}: {e}")
+                    continue
+                run = instrument.last_run(wf.name)
+                if run is None:         # e.g. a store that needed no import
+                    continue
+                done = _units(wf, run)
+                per_po = [total for _, total, _ in run.slowest(len(run.items))]
+                p50, p95 = _percentile(per_po, 0.5), _percentile(per_po, 0.95)
+                print(f"   {wf.name:<13} {run.seconds:>7.2f}s {done:>6} {wf.unit:<13} "
+                      f"{done / run.seconds if run.seconds else 0:>11,.1f} "
+                      f"{run.counters.get('sheets cells written', 0):>8} "
+                      f"{run.counters.get('sheets cells skipped', 0):>8} {_ms(p50)} {_ms(p95)}")
+    return browser
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--scales", default="10,100", help="comma-separated data sizes (× base)")
+    ap.add_argument("--mode", choices=("browser", "http"), default=config.DETAIL_FETCH_MODE,
+                    help="detail page fetching (config.DETAIL_FETCH_MODE)")
+    ap.add_argument("--workers", type=int, default=config.DETAIL_WORKERS,
+                    help="detail page workers in browser mode")
+    ap.add_argument("--no-browser", action="store_true", help="only the sheet-only workflows")
+    ap.add_argument("--store", action="store_true", help="with the local store (store.py)")
+    ap.add_argument("--verbose", action="store_true", help="show the workflows' own output")
+    args = ap.parse_args()
+
+    config.HEADLESS = True
+    config.DETAIL_FETCH_MODE = args.mode
+    config.DETAIL_WORKERS = args.workers
+    config.ITEM_SUMMARY_STATE_FILE = ""
+    config.HISTORY_STATE_FILE = ""
+    config.WAIT_LOG_FILE = ""
+    config.RUN_REPORT_DIR = ""
+    config.STORE_FILE = "po_store.sqlite3" if args.store else ""
+
+    browser = False if args.no_browser else None
+    print(f"🧪 End-to-end on the fixture portal, today = {date.today():%m/%d/%Y}, "
+          f"detail pages via {args.mode}, store {'on' if args.store else 'off'}")
+    for scale in (int(s) for s in args.scales.split(",")):
+        browser = run_scale(scale, browser, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+In-memory stand-ins for the gspread worksheet calls the workflows make,
+so sheet-bound code can be timed offline. Cells are stored as given
+(formulas stay formula strings, serial dates stay numbers) and every
+read returns them as-is, whatever the value render option.
+
+    book = FakeSpreadsheet()
+    ws = book.add("CAME IN", rows)          # rows start at B11
+    with patched_sheets(book):
+        process_item_summary()
+
+patched_sheets routes sheets_io.open_sheet to the fake for every module,
+so worksheets are still wrapped for timing like the real ones.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol
+
+from .. import sheets_io
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: "FakeSpreadsheet", title: str, row_count: int = 1000):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.row_count = row_count
+        self.cells: Dict[tuple, Any] = {}
+        self.calls = 0
+
+    def _bounds(self, cell_range: str):
+        g = a1_range_to_grid_range(cell_range)
+        r1 = g.get("startRowIndex", 0) + 1
+        c1 = g.get("startColumnIndex", 0) + 1
+        r2 = min(g.get("endRowIndex", self.row_count), self.row_count)
+        c2 = g.get("endColumnIndex", c1)
+        return r1, c1, r2, c2
+
+    def set_rows(self, top_left: str, rows: List[List[Any]]) -> None:
+        r1, c1 = a1_to_rowcol(top_left)
+        for i, row in enumerate(rows):
+            for j, v in enumerate(row):
+                if v is not None:
+                    self.cells[(r1 + i, c1 + j)] = v
+        self.row_count = max(self.row_count, r1 + len(rows) - 1)
+
+    def get(self, cell_range: str, **_):
+        self.calls += 1
+        r1, c1, r2, c2 = self._bounds(cell_range)
+        out = []
+        for r in range(r1, r2 + 1):
+            row = [self.cells.get((r, c), "") for c in range(c1, c2 + 1)]
+            while row and row[-1] == "":
+                row.pop()
+            out.append(row)
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    def col_values(self, col: int, **_):
+        self.calls += 1
+        last = max((r for r, c in self.cells if c == col and self.cells[(r, c)] != ""), default=0)
+        return [self.cells.get((r, col), "") for r in range(1, last + 1)]
+
+    def update(self, range_name: str, values, **_):
+        self.calls += 1
+        self.set_rows(range_name.split(":")[0], values)
+
+    def batch_clear(self, ranges):
+        self.calls += 1
+        for cell_range in ranges:
+            r1, c1, r2, c2 = self._bounds(cell_range)
+            for key in [k for k in self.cells if r1 <= k[0] <= r2 and c1 <= k[1] <= c2]:
+                del self.cells[key]
+
+    def add_rows(self, n: int):
+        self.calls += 1
+        self.row_count += n
+
+    def append_row(self, values, **_):
+        self.calls += 1
+        last = max((r for r, _ in self.cells), default=0)
+        self.set_rows(f"A{last + 1}", [values])
+
+    def rows(self, top_left: str = "B11", last_col: str = "J") -> List[List[Any]]:
+        """Everything from top_left down to the last filled row."""
+        return self.get(f"{top_left}:{last_col}{self.row_count}")
+
+
+class FakeSpreadsheet:
+    id = "fake-spreadsheet"
+
+    def __init__(self):
+        self.sheets: Dict[str, FakeWorksheet] = {}
+        self.read_requests = 0
+        self.write_requests = 0
+        self.cells_written = 0
+
+    def add(self, title: str, rows: List[List[Any]] = (), top_left: str = "B11") -> FakeWorksheet:
+        ws = self.sheets[title] = FakeWorksheet(self, title)
+        if rows:
+            ws.set_rows(top_left, rows)
+        return ws
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        try:
+            return self.sheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title) from None
+
+    def add_worksheet(self, title: str, rows="1000", cols="26", **_) -> FakeWorksheet:
+        ws = self.add(title)
+        ws.row_count = int(rows)
+        return ws
+
+    def values_batch_get(self, ranges: List[str], params=None) -> dict:
+        self.read_requests += 1
+        out = []
+        for rng in ranges:
+            title, _, a1 = rng.rpartition("!")
+            out.append({"range": rng, "values": self.sheets[title.strip("'")].get(a1)})
+        return {"valueRanges": out}
+
+    def values_batch_update(self, body: dict):
+        self.write_requests += 1
+        for item in body["data"]:
+            title, _, a1 = item["range"].rpartition("!")
+            ws = self.sheets[title.strip("'")]
+            r1, c1, _, _ = ws._bounds(a1)
+            for i, row in enumerate(item["values"]):
+                for j, v in enumerate(row):
+                    if v is None:
+                        continue
+                    self.cells_written += 1
+                    if v == "":
+                        ws.cells.pop((r1 + i, c1 + j), None)
+                    else:
+                        ws.cells[(r1 + i, c1 + j)] = v
+
+
+@contextmanager
+def patched_sheets(book: FakeSpreadsheet):
+    """Serve every sheets_io spreadsheet call from the fake for a block."""
+    sheets_io.use_spreadsheet(book)
+    try:
+        yield book
+    finally:
+        sheets_io.use_spreadsheet(None)
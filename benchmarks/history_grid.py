@@ -0,0 +1,137 @@
+"""
+Rows/second of the requisition-grid extraction: the old per-cell
+WebDriver calls versus one page_source capture parsed locally.
+
+Saved grid pages are opened in headless Chrome via file:// URLs.
+Without Chrome only the local parser is measured.
+
+    python -m automation-project.benchmarks.history_grid [page.html ...]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from ..scrape_history import parse_history_grid
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+CUTOFF = date(2024, 1, 1)
+
+
+def extract_webdriver(driver, cutoff: date = CUTOFF):
+    """The pre-parser extraction: several WebDriver round trips per row."""
+    from selenium.webdriver.common.by import By
+
+    rows = []
+    for tr in driver.find_elements(By.XPATH, "//tr"):
+        tds = tr.find_elements(By.CSS_SELECTOR, "td.GridDetail")
+        if len(tds) < 6:
+            continue
+        full_dt = tds[2].text.strip()
+        if not full_dt:
+            continue
+        date_only = full_dt.split()[0]
+        try:
+            dt = datetime.strptime(date_only, "%m/%d/%Y").date()
+        except Exception:
+            continue
+        if dt < cutoff:
+            break
+        if tds[3].text.strip() != "Fully Received":
+            continue
+        link_els = tds[1].find_elements(By.TAG_NAME, "a")
+        if not link_els:
+            continue
+        req_num = link_els[0].text.strip()
+        req_url = link_els[0].get_attribute("href")
+        cost = tds[5].text.strip().replace("$", "").replace(",", "")
+        req_title = tds[4].text.strip()
+        is_main = (
+            "Main Location GM (Store 001)" in req_title or
+            "Main Location Support (Store 001)" in req_title
+        )
+        rows.append((req_num, req_url, date_only, cost, "—" if is_main else "✅"))
+    return rows
+
+
+def _headless_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    opts = Options()
+    opts.add_argument("--headless=new")
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+
+
+def _count_grid_rows(html: str) -> int:
+    """Grid rows on a page (what both extractors have to walk)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    return sum(1 for tr in soup.find_all("tr") if len(tr.find_all("td", class_="GridDetail")) >= 6)
+
+
+def bench_local(pages, repeat: int):
+    docs = [(path.as_uri(), path.read_text(encoding="utf-8")) for path in pages]
+    per_pass = sum(_count_grid_rows(html) for _, html in docs)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in docs:
+            parse_history_grid(html, url, CUTOFF)
+    return per_pass * repeat / (time.perf_counter() - t0)
+
+
+def bench_browser(driver, pages, repeat: int):
+    """Returns (old rows/s, new rows/s, outputs match)."""
+    old_rows = new_rows = 0
+    old_t = new_t = 0.0
+    match = True
+    for path in pages:
+        driver.get(path.as_uri())
+        n = _count_grid_rows(path.read_text(encoding="utf-8"))
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            old = extract_webdriver(driver)
+            old_t += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            new, _ = parse_history_grid(driver.page_source, driver.current_url, CUTOFF)
+            new_t += time.perf_counter() - t0
+
+            old_rows += n
+            new_rows += n
+            match &= (old == new)
+    return old_rows / old_t, new_rows / new_t, match
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("pages", nargs="*", type=Path,
+                    default=[FIXTURES / "history_grid.html"])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    pages = [p.resolve() for p in args.pages]
+
+    print(f"📄 {len(pages)} saved grid page(s), {args.repeat} repeats")
+    print(f"   local parse (file → rows):  {bench_local(pages, args.repeat * 20):10,.0f} rows/s")
+
+    try:
+        driver = _headless_driver()
+    except Exception as e:
+        print(f"⚠️ No headless Chrome ({e.__class__.__name__}); skipping WebDriver comparison.")
+        return
+    try:
+        old, new, match = bench_browser(driver, pages, args.repeat)
+    finally:
+        driver.quit()
+    print(f"   WebDriver per-cell calls:    {old:10,.0f} rows/s")
+    print(f"   page_source + local parse:   {new:10,.0f} rows/s  ({new / old:.0f}× faster)")
+    print(f"   identical tuples: {'✅' if match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+ITEM SUMMARY aggregation on a synthetic CAME IN sheet (50k rows by
+default) plus WAITING ON, read from in-memory worksheets.
+
+Times the old per-item date handling (list + `not in` merge + re-sort
+for gaps) against utils.DateSeries, checks both give the same dates,
+months and median gap for every item, then times process_item_summary
+end to end.
+
+With --incremental, a full ITEM SUMMARY run is followed by a few
+appended CAME IN rows and an incremental run; both are timed, with the
+cells each one wrote, and the incremental table is checked against a
+fresh full recompute.
+
+With --scale, the Python and NumPy engines (config.ITEM_SUMMARY_ENGINE)
+are compared at each size: compute time, and whether their ITEM SUMMARY
+rows are identical (tests/test_item_summary_engines.py asserts it).
+
+    python -m automation-project.benchmarks.item_summary [--rows 50000]
+    python -m automation-project.benchmarks.item_summary --incremental
+    python -m automation-project.benchmarks.item_summary --scale 10000,50000,200000
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from statistics import median
+
+from .. import config, scrape_item_summary
+from ..scrape_item_summary import compute_rows, load_came_in, load_pending, sort_rows
+from ..utils import DateSeries, parse_sheet_date
+from .fake_sheets import FakeSpreadsheet, patched_sheets
+
+EPOCH = datetime(1899, 12, 30)
+
+
+def _serial(dt: datetime) -> int:
+    return (dt - EPOCH).days
+
+
+def synthetic_sheets(rows: int, items: int, pending: int, seed: int = 11) -> FakeSpreadsheet:
+    """CAME IN (B:I) and WAITING ON (B:D) the way FORMULA render returns them."""
+    rng = random.Random(seed)
+    start = datetime(2023, 10, 1)
+    came, waiting = [], []
+    for n in range(rows):
+        # a few one-off items, and some lines without price or arrival
+        item = rng.randrange(items) if n % 97 else items + n
+        od = start + timedelta(days=rng.randrange(730))
+        days = rng.randrange(2, 40)
+        came.append([
+            f'=HYPERLINK("https://example-procurement.com/po/{n // 4}","001-{n // 4}")',
+            _serial(od) if n % 5 else od.strftime("%m/%d/%Y"),
+            _serial(od + timedelta(days=days)),
+            f"{days} days" if n % 13 else "",
+            f'=HYPERLINK("https://example-procurement.com/item/{item}","IT-{item:05d}")',
+            f"Synthetic Item {item}", rng.randrange(1, 48),
+            f"{rng.uniform(1, 90):.2f}" if n % 11 else "",
+        ])
+    for n in range(pending):
+        item = rng.randrange(items)
+        od = start + timedelta(days=rng.randrange(700, 760))
+        waiting.append([
+            f'=HYPERLINK("https://example-procurement.com/po/o{n}","001-o{n}")',
+            _serial(od),
+            f'=HYPERLINK("https://example-procurement.com/item/{item}","IT-{item:05d}")',
+        ])
+    book = FakeSpreadsheet()
+    book.add("CAME IN", came)
+    book.add("WAITING ON", waiting)
+    book.add("ITEM SUMMARY")
+    return book
+
+
+def _dates_by_item(book: FakeSpreadsheet):
+    came, pend = {}, {}
+    for row in book.worksheet("CAME IN").rows("B11", "I"):
+        came.setdefault(row[4], []).append(parse_sheet_date(row[1]))
+    for row in book.worksheet("WAITING ON").rows("B11", "D"):
+        pend.setdefault(row[2], []).append(parse_sheet_date(row[1]))
+    return came, pend
+
+
+def merge_lists(came, pend):
+    """The previous handling: lists, a linear `not in` per pending date, sort for gaps."""
+    out = {}
+    for item, dts in came.items():
+        dates, months = [], set()
+        for dt in dts:
+            dates.append(dt)
+            months.add((dt.year, dt.month))
+        for dt in pend.get(item, ()):
+            if dt not in dates:
+                dates.append(dt)
+                months.add((dt.year, dt.month))
+        s = sorted(dates)
+        gaps = [(s[i + 1] - s[i]).days for i in range(len(s) - 1)]
+        out[item] = (s, len(months), median(gaps) if gaps else float("inf"))
+    return out
+
+
+def merge_series(came, pend):
+    out = {}
+    for item, dts in came.items():
+        series = DateSeries()
+        for dt in dts:
+            series.add(dt)
+        for dt in pend.get(item, ()):
+            series.add_unique(dt)
+        out[item] = (list(series), len(series.months), series.median_gap())
+    return out
+
+
+def _best_of(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+
+def compare_engines(sizes, items: int) -> None:
+    """Python vs NumPy compute_rows at each CAME IN size, with a parity check."""
+    try:
+        from ..item_summary_np import compute_rows as compute_rows_np
+    except ImportError:
+        print("⚠️ NumPy not installed; skipping the engine comparison.")
+        return
+
+    today = datetime(2025, 11, 1).date()
+    print(f"{'rows':>9} {'python':>10} {'numpy':>10} {'speed-up':>9}  same rows")
+    for rows in sizes:
+        book = synthetic_sheets(rows, items, rows // 10)
+        cols = load_came_in(book.worksheet("CAME IN"))
+        pending = load_pending(book.worksheet("WAITING ON"))
+        py_t, py = _best_of(compute_rows, cols, pending, today)
+        np_t, fast = _best_of(compute_rows_np, cols, pending, today)
+        same = py == fast and sort_rows(py) == sort_rows(fast)
+        print(f"{rows:>9} {py_t * 1e3:>8.1f}ms {np_t * 1e3:>8.1f}ms {py_t / np_t:>8.1f}×  "
+              f"{'✅' if same else '❌'}")
+
+
+def _summary_run(book: FakeSpreadsheet, full: bool = False):
+    """(seconds, cells written) for one process_item_summary run."""
+    book.cells_written = 0
+    with patched_sheets(book):
+        t = time.perf_counter()
+        scrape_item_summary.process_item_summary(full=full)
+        t = time.perf_counter() - t
+    return t, book.cells_written
+
+
+def compare_incremental(rows: int, items: int, pending: int, appended: int = 3) -> None:
+    """Full run, append a few CAME IN rows, incremental run; check against a full run."""
+    book = synthetic_sheets(rows, items, pending)
+    with tempfile.TemporaryDirectory() as tmp:
+        config.ITEM_SUMMARY_STATE_FILE = os.path.join(tmp, "state.pickle")
+        full_t, full_cells = _summary_run(book, full=True)
+
+        came = book.worksheet("CAME IN")
+        last = max(r for r, _ in came.cells)
+        extra = synthetic_sheets(appended, items, 0, seed=99).worksheet("CAME IN").rows("B11", "I")
+        came.set_rows(f"B{last + 1}", extra)
+        inc_t, inc_cells = _summary_run(book)
+
+        check = copy.deepcopy(book)
+        config.ITEM_SUMMARY_STATE_FILE = ""
+        _summary_run(check, full=True)
+        same = book.worksheet("ITEM SUMMARY").rows() == check.worksheet("ITEM SUMMARY").rows()
+
+    print(f"📄 CAME IN {rows} rows + {appended} appended, WAITING ON {pending} rows")
+    print(f"   full run:         {full_t * 1e3:8.1f} ms, {full_cells} cells written")
+    print(f"   incremental run:  {inc_t * 1e3:8.1f} ms, {inc_cells} cells written")
+    print(f"   same table as a full recompute: {'✅' if same else '❌'}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--items", type=int, default=60)
+    ap.add_argument("--pending", type=int, default=6000)
+    ap.add_argument("--scale", help="comma-separated CAME IN sizes for the engine comparison")
+    ap.add_argument("--incremental", action="store_true",
+                    help="time an incremental run after a few appended rows")
+    args = ap.parse_args()
+    config.STORE_FILE = ""      # time the sheet-reading path, not the local store
+
+    if args.incremental:
+        compare_incremental(args.rows, args.items * 10, args.pending)
+        return
+
+    if args.scale:
+        compare_engines([int(x) for x in args.scale.split(",")], args.items * 10)
+        return
+
+    book = synthetic_sheets(args.rows, args.items, args.pending)
+    came, pend = _dates_by_item(book)
+    print(f"📄 CAME IN {args.rows} rows, WAITING ON {args.pending} rows, {len(came)} items")
+
+    old_t, old = _best_of(merge_lists, came, pend)
+    new_t, new = _best_of(merge_series, came, pend)
+    print(f"   list + `not in` merge:  {old_t * 1e3:8.1f} ms")
+    print(f"   DateSeries:             {new_t * 1e3:8.1f} ms  ({old_t / new_t:.1f}× faster)")
+    print(f"   same dates/months/gaps: {'✅' if old == new else '❌'}")
+
+    config.ITEM_SUMMARY_STATE_FILE = ""
+    t, _ = _summary_run(book, full=True)
+    print(f"   process_item_summary:   {t * 1e3:8.1f} ms end to end")
+
+
+if __name__ == "__main__":
+    main()
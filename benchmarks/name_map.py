@@ -0,0 +1,107 @@
+"""
+NAME_MAP description matching: the old per-key `pat in text` loop versus
+the Aho–Corasick automaton now used by mappings.rename_desc.
+
+The corpus is a few thousand portal-style descriptions built from the
+map itself (keys, canonical names, SKU/pack suffixes, misspellings) plus
+unmapped items, so both hits and misses are exercised.
+
+    python -m automation-project.benchmarks.name_map [--size 5000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from .. import mappings
+
+SUFFIXES = ["", " (each)", " [SKU 44120]", ", case of 12", " - 6 pack", " 1 litre", " (Store 001)"]
+UNMAPPED = [
+    "Replacement Bulb, LED 9W", "Spin Bike Seat Post Clamp", "Rubber Floor Tile 4x4",
+    "Cable Crossover Handle", "Foam Roller, 36 in", "Treadmill Belt Lubricant",
+    "Extension Cord 25 ft", "Zip Ties, 8 in (100 pack)", "Hand Truck, Folding",
+]
+
+
+def build_corpus(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    keys = [k for k in mappings.NAME_MAP]
+    names = [v for v in mappings.NAME_MAP.values() if v]
+    out = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.45:
+            base = rng.choice(keys).title()
+        elif roll < 0.75:
+            base = rng.choice(names)
+        else:
+            base = rng.choice(UNMAPPED)
+        out.append(base + rng.choice(SUFFIXES))
+    return out
+
+
+def rename_desc_loop(desc: str):
+    """The pre-automaton implementation, kept as the reference."""
+    low = desc.lower()
+    low = re.sub(r'[^a-z0-9 ]+', ' ', low)
+    low = re.sub(r'\s+', ' ', low).strip()
+    for pat, replacement in mappings.NAME_MAP.items():
+        if pat in low:
+            return replacement
+    return desc
+
+
+def _time(fn, corpus, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for desc in corpus:
+            fn(desc)
+    return (time.perf_counter() - t0) / (repeat * len(corpus))
+
+
+def _grow_map(extra: int, seed: int = 11) -> None:
+    """Append synthetic aliases after the real keys (first-match order is kept)."""
+    rng = random.Random(seed)
+    words = " ".join(mappings.NAME_MAP).split()
+    for i in range(extra):
+        key = " ".join(rng.choice(words) for _ in range(rng.randint(2, 5))) + f" x{i}"
+        mappings.NAME_MAP.setdefault(key, f"Synthetic Item {i}")
+    mappings._name_matcher = None
+
+
+def _run(corpus, repeat: int) -> None:
+    mismatches = [d for d in corpus if rename_desc_loop(d) != mappings.rename_desc(d)]
+
+    t_build = time.perf_counter()
+    mappings._AhoCorasick(list(mappings.NAME_MAP))
+    t_build = time.perf_counter() - t_build
+
+    old = _time(rename_desc_loop, corpus, repeat)
+    new = _time(mappings.rename_desc, corpus, repeat)
+
+    print(f"📄 {len(corpus)} descriptions × {repeat}, {len(mappings.NAME_MAP)} NAME_MAP keys")
+    print(f"   automaton build:        {t_build * 1e3:8.2f} ms (once)")
+    print(f"   per-key `in` loop:      {old * 1e6:8.2f} µs/desc")
+    print(f"   Aho–Corasick:           {new * 1e6:8.2f} µs/desc  ({old / new:.1f}× faster)")
+    print(f"   same first match: {'✅' if not mismatches else f'❌ {len(mismatches)} differ'}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--size", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--grow", type=int, default=2000,
+                    help="synthetic aliases to add for the scaling run (0 = skip)")
+    args = ap.parse_args()
+
+    corpus = build_corpus(args.size)
+    _run(corpus, args.repeat)
+    if args.grow:
+        _grow_map(args.grow)
+        _run(corpus, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
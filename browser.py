@@ -4,31 +4,37 @@ import time
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
-from . import config
+from . import config, instrument, waits
 
+# Any of the left-hand menu sections; present on every page once logged in.
+MENU_LOCATOR = (By.CSS_SELECTOR, "[id^='linkpitmenu_section_']")
+
+
+@instrument.span("login")
 def get_driver():
     """
     Create a Chrome WebDriver, log into the portal, and return
     the authenticated driver instance.
     """
     chrome_opts = Options()
-    chrome_opts.add_argument("--start-maximized")
+    if config.HEADLESS:
+        chrome_opts.add_argument("--headless=new")
+        chrome_opts.add_argument("--window-size=1920,1080")
+    else:
+        chrome_opts.add_argument("--start-maximized")
 
     driver = webdriver.Chrome(
         service=Service(ChromeDriverManager().install()),
         options=chrome_opts,
     )
-    wait = WebDriverWait(driver, 10)
-
     print("🔐 Logging in...")
     driver.get(config.LOGIN_URL)
-    time.sleep(2)
+    waits.until(driver, waits.document_ready, "login page")
 
     # If the login is inside an iframe, switch into it
     frames = driver.find_elements(By.TAG_NAME, "iframe")
@@ -36,39 +42,86 @@ def get_driver():
         driver.switch_to.frame(frames[0])
 
     # Username / password fields + login button
-    wait.until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text']"))
+    waits.until(
+        driver, EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text']")), "login form"
     ).send_keys(config.USERNAME)
 
-    wait.until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password']"))
+    waits.until(
+        driver, EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password']")), "login form"
     ).send_keys(config.PASSWORD)
 
-    wait.until(
-        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Log In')]"))
-    ).click()
+    login_btn = waits.until(
+        driver, EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Log In')]")), "login form"
+    )
+    login_btn.click()
 
-    time.sleep(2)
+    # Logged in once the form is gone and the landing page has settled
+    waits.until(driver, EC.staleness_of(login_btn), "login submit")
+    waits.page_settled(driver, "landing page")
     return driver
 
 
-def go_home(driver) -> None:
-    """Collapse the menu and return to the home screen."""
-    btn = driver.find_element(
-        By.CSS_SELECTOR,
-        'button.navbar-toggle[data-target="#menuBar"]'
-    )
-    btn.click()
-    time.sleep(1)
-    
-
-    try:
-        # Example:
-        # btn = driver.find_element(By.XPATH, "//a[contains(@title, 'Collapse')]")
-        # btn.click()
-        # time.sleep(1)
-        # driver.find_element(By.LINK_TEXT, "Home").click()
-        pass
-    except Exception:
-        #
-        pass
+def go_home(driver, home_url: str | None = None) -> None:
+    """
+    Return the driver to a known page: close any stray detail windows,
+    leave iframes, load the home page and wait for the menu.
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.switch_to.default_content()
+
+    driver.get(home_url or config.HOME_URL)
+    waits.until(driver, EC.presence_of_element_located(MENU_LOCATOR), "home")
+
+
+# --------------------------------------------------
+# SHARED SESSION
+# --------------------------------------------------
+
+class BrowserSession:
+    """
+    Log in once and hand the same authenticated driver to every
+    workflow in a run. Between workflows the driver is sent back to
+    the home page; it is only quit when the session closes.
+
+        with BrowserSession() as session:
+            process_received_orders(session.acquire())
+            process_upcoming_orders(session.acquire())
+    """
+
+    def __init__(self):
+        self._driver = None
+        self.home_url: str | None = None
+        self.login_seconds = 0.0
+        self.reuses = 0
+
+    def __enter__(self) -> "BrowserSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def acquire(self):
+        """Return the live driver, logging in on first use."""
+        if self._driver is None:
+            t0 = time.perf_counter()
+            self._driver = get_driver()
+            self.login_seconds = time.perf_counter() - t0
+            self.home_url = self._driver.current_url
+        else:
+            go_home(self._driver, self.home_url)
+            self.reuses += 1
+        return self._driver
+
+    def close(self) -> None:
+        if self._driver is None:
+            return
+        self._driver.quit()
+        self._driver = None
+        if self.reuses:
+            saved = self.login_seconds * self.reuses
+            print(f"⏱️  Shared browser session: 1 login ({self.login_seconds:.1f}s) "
+                  f"reused {self.reuses}× — saved ~{saved:.1f}s")
@@ -0,0 +1,178 @@
+"""
+Headless command-line runner (for cron; no Tkinter, no display).
+
+The workflows form a small dependency graph:
+
+    received ─┐
+              ├─► item_summary
+    upcoming ─┘
+    history ────► trend
+
+Each step starts as soon as the steps it depends on have finished, on a
+pool of worker threads, so the browser scrapes (received, upcoming,
+history) run side by side – each logs into its own browser – and the
+sheet-only steps follow their inputs. A step whose dependency failed is
+skipped. Steps not selected are not waited for. With the local store on
+(store.py), a final "sync" step publishes everything the steps stored to
+the sheets, also after a failed step.
+
+    python -m automation-project.cli full              # everything
+    python -m automation-project.cli quick             # summaries from Sheets + history
+    python -m automation-project.cli received item_summary --workers 2
+    python -m automation-project.cli full --show-browser
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from . import config, detail_fetch, store, waits
+from .scrape_history import process_data_from_2024, write_weekly_by_month_table
+from .scrape_item_summary import process_item_summary
+from .scrape_received import process_received_orders
+from .scrape_upcoming import process_upcoming_orders
+
+
+class Step(NamedTuple):
+    func: Callable[[], None]
+    after: Tuple[str, ...] = ()
+    browser: bool = False     # starts its own logged-in browser
+
+
+STEPS: Dict[str, Step] = {
+    "received":     Step(process_received_orders, browser=True),
+    "upcoming":     Step(process_upcoming_orders, browser=True),
+    "item_summary": Step(process_item_summary, after=("received", "upcoming")),
+    "history":      Step(process_data_from_2024, browser=True),
+    "trend":        Step(write_weekly_by_month_table, after=("history",)),
+}
+
+PRESETS = {
+    "full":  list(STEPS),
+    "quick": ["item_summary", "history", "trend"],   # the menu's Quick Update
+}
+
+
+class StepResult(NamedTuple):
+    start: float      # seconds after the run started
+    seconds: float
+    status: str       # "ok", "failed" or "skipped"
+
+
+def run_steps(names: List[str], workers: int = config.CLI_WORKERS,
+              steps: Dict[str, Step] = STEPS) -> Dict[str, StepResult]:
+    """
+    Run the named steps in dependency order on `workers` threads, with at
+    most config.CLI_BROWSER_WORKERS browsers open at a time, counting the
+    detail-page workers (detail_fetch.browser_slots). Returns each
+    step's result; a failure is printed and doesn't stop other branches.
+    """
+    selected = set(names)
+    waiting = {n: {d for d in steps[n].after if d in selected} for n in names}
+    results: Dict[str, StepResult] = {}
+    browsers = threading.BoundedSemaphore(max(1, config.CLI_BROWSER_WORKERS))
+    detail_fetch.browser_slots = browsers
+    t_run = time.perf_counter()
+
+    def run(name: str) -> StepResult:
+        step = steps[name]
+        if step.browser:
+            browsers.acquire()
+        try:
+            return _run_step(name, step.func, t_run)
+        finally:
+            if step.browser:
+                browsers.release()
+
+    try:
+        with ThreadPoolExecutor(max(1, workers)) as pool:
+            running = {}
+            while waiting or running:
+                for name in [n for n, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    running[pool.submit(run, name)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    results[name] = fut.result()
+                    if results[name].status == "ok":
+                        for deps in waiting.values():
+                            deps.discard(name)
+                    else:
+                        _skip_downstream(name, waiting, results, time.perf_counter() - t_run)
+    finally:
+        detail_fetch.browser_slots = None
+    return results
+
+
+def _run_step(name: str, func: Callable[[], None], t_run: float) -> StepResult:
+    start = time.perf_counter() - t_run
+    print(f"▶️  {name} started")
+    try:
+        func()
+        status = "ok"
+    except Exception:
+        print(f"❌ {name} failed:\n{traceback.format_exc()}")
+        status = "failed"
+    return StepResult(start, time.perf_counter() - t_run - start, status)
+
+
+def _skip_downstream(name: str, waiting, results, now: float) -> None:
+    for other, deps in list(waiting.items()):
+        if name in deps:
+            del waiting[other]
+            results[other] = StepResult(now, 0.0, "skipped")
+            print(f"⏭️  {other} skipped ({name} did not run)")
+            _skip_downstream(other, waiting, results, now)
+
+
+def print_summary(results: Dict[str, StepResult], total: float) -> None:
+    print(f"\n⏱️  Run finished in {total:.1f}s")
+    print(f"   {'step':<14} {'start':>7} {'took':>8}  status")
+    for name, r in sorted(results.items(), key=lambda kv: kv[1].start):
+        mark = {"ok": "✅", "failed": "❌"}.get(r.status, "⏭️")
+        print(f"   {name:<14} {r.start:>6.1f}s {r.seconds:>7.1f}s  {mark} {r.status}")
+
+
+def _expand(targets: List[str]) -> List[str]:
+    names: List[str] = []
+    for t in targets:
+        for name in PRESETS.get(t, [t]):
+            if name not in STEPS:
+                raise SystemExit(f"Unknown step {name!r}; choose from "
+                                 f"{', '.join(list(PRESETS) + list(STEPS))}.")
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("targets", nargs="*", default=["full"],
+                    help=f"steps ({', '.join(STEPS)}) or presets ({', '.join(PRESETS)})")
+    ap.add_argument("--workers", type=int, default=config.CLI_WORKERS,
+                    help="steps run at the same time")
+    ap.add_argument("--show-browser", action="store_true",
+                    help="open visible browser windows instead of headless ones")
+    args = ap.parse_args(argv)
+
+    names = _expand(args.targets)
+    config.HEADLESS = not args.show_browser
+
+    t0 = time.perf_counter()
+    results = run_steps(names, args.workers)
+    if store.enabled() and any(r.status == "ok" for r in results.values()):
+        results["sync"] = _run_step("sync", store.sync_sheets, t0)
+    print_summary(results, time.perf_counter() - t0)
+    waits.report()
+    return 0 if all(r.status == "ok" for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 """
 Central configuration for the Purchase Order Automation tool.
 All credentials and environment-specific settings live here.
+
+Relative paths of the data and state files below (*_FILE, *_DIR) are
+inside the package directory, whatever directory the tool is run from.
 """
 
 # --- Portal / Authentication (sanitized placeholders) ---
@@ -9,16 +12,158 @@ LOGIN_URL = "https://example-portal.com/workflow"
 USERNAME  = "YOUR_USERNAME_HERE"
 PASSWORD  = "YOUR_PASSWORD_HERE"
 
+# Page the browser returns to between workflows (the post-login URL is
+# preferred when known).
+HOME_URL  = LOGIN_URL
+
 # --- Google Sheets / OAuth ---
 
 SHEET_ID   = "REDACTED_SHEET_ID"
 CREDS_FILE = r"path/to/creds.json"
 
+# Re-authorize the shared Sheets client before its ~1h token expires
+SHEETS_TOKEN_REFRESH_SECONDS = 50 * 60
+# Re-fetch a cached worksheet handle (and its row count) after this long
+SHEETS_WORKSHEET_REFRESH_SECONDS = 60
+
+# Large ranges are read in chunks of this many rows, and writes are split
+# so no single request carries more than this many cells.
+SHEETS_READ_CHUNK_ROWS        = 2000
+SHEETS_MAX_CELLS_PER_REQUEST  = 40000
+
+# Tables rewritten in full every run (WAITING ON, ITEM SUMMARY, LATEST 2
+# YEARS, TREND GRAPH) are compared with the sheet first and only changed
+# cells are sent. False: clear and rewrite them whole.
+SHEETS_DIFF_WRITES = True
+
 # --- Site / Domain configuration (sanitized) ---
 
 SITE_CODE       = "001" 
 BASE_PO_DOMAIN  = "https://example-procurement.com"
 
+# --- Scraping ---
+
+# Run Chrome without a window (the CLI runner turns this on)
+HEADLESS = False
+
+# Browser waits time out after WAIT_TIMEOUT_FACTOR × the slowest of the
+# last WAIT_HISTORY waits for the same step, kept within MIN..MAX seconds
+# (WAIT_TIMEOUT until a step has history); a wait fails at its timeout
+WAIT_TIMEOUT        = 15
+WAIT_MIN_TIMEOUT    = 5
+WAIT_MAX_TIMEOUT    = 60
+WAIT_TIMEOUT_FACTOR = 3
+WAIT_HISTORY        = 20
+# A page's network is idle once nothing new has loaded for this long
+WAIT_NETWORK_QUIET  = 0.5
+# Every wait is logged here and seeds the next run's timeouts ("" disables)
+WAIT_LOG_FILE       = "wait_times.csv"
+
+# Extra logged-in browsers used to fetch PO detail pages in parallel
+# (1 = open each PO in a second window of the main browser). Each one is
+# another portal login and another Chrome; under the CLI they share the
+# CLI_BROWSER_WORKERS cap with the steps' own browsers.
+DETAIL_WORKERS  = 3
+
+# How detail pages are fetched after login: "browser" (worker pool above)
+# or "http" (copy the session cookies into a pooled HTTP client).
+DETAIL_FETCH_MODE = "browser"
+HTTP_CONCURRENCY  = 6
+HTTP_TIMEOUT      = 20     # seconds per request
+# In http mode, retry a PO in the browser if its download fails
+HTTP_FALLBACK_TO_BROWSER = True
+
+# BeautifulSoup tree builder for portal pages: "lxml" (fast; falls back
+# to "html.parser" when lxml isn't installed) or "html.parser"
+HTML_PARSER = "lxml"
+
+# Local cache of parsed PO detail pages ("" disables it). Reconciled POs
+# are cached for good. Open POs change with every receipt, so they are
+# only reused for a short while (a re-run or a retry after a failure) and
+# re-fetched after PO_CACHE_TTL_MINUTES.
+PO_CACHE_FILE         = "po_cache.sqlite3"
+PO_CACHE_TTL_MINUTES  = 30
+
+# --- Item names ---
+
+# Alias → canonical name and item ID → name maps (JSON; a relative path
+# is inside the package). A running tool picks up edits to the file
+# after at most MAPPINGS_RELOAD_INTERVAL seconds (-1 disables).
+MAPPINGS_FILE            = "data/mappings.json"
+MAPPINGS_RELOAD_INTERVAL = 5
+
+# Memoized description → canonical name lookups kept per run
+NAME_CACHE_SIZE = 4096
+
+# Descriptions with no exact NAME_MAP entry are matched to the closest
+# canonical name if they score at least this (0..1; 0 disables it)
+FUZZY_NAME_THRESHOLD    = 0.8
+# Accepted matches below this score, and rejected ones above the floor,
+# are listed in FUZZY_REPORT_FILE for review ("" disables the report)
+FUZZY_NAME_CONFIDENT    = 0.95
+FUZZY_NAME_REPORT_FLOOR = 0.5
+FUZZY_REPORT_FILE       = "fuzzy_name_report.csv"
+
+# --- Local store (store.py) ---
+
+# Optional SQLite system of record for received lines, open PO lines and
+# requisitions (e.g. "po_store.sqlite3"; fill it once with
+# `python -m automation-project.store --import`). With it on the scrapers
+# write to it, the summaries are computed from it and the sheets are
+# published from it by a final sync step – CAME IN is no longer streamed
+# while the scrape runs and ITEM SUMMARY is recomputed in full (from
+# SQLite) instead of incrementally. "" (default): every step reads its
+# input back from Sheets and writes its own tab.
+STORE_FILE = ""
+
+# --- Item summary ---
+
+# "python" (default) or "numpy" – the grouped-array engine in
+# item_summary_np.py; falls back to python if NumPy isn't installed
+ITEM_SUMMARY_ENGINE = "python"
+
+# Per-item state kept between runs so ITEM SUMMARY only reads new CAME IN
+# rows and recomputes the items they touch ("" = always recompute all).
+# Only used with the local store off (STORE_FILE = "").
+ITEM_SUMMARY_STATE_FILE = "item_summary_state.pickle"
+
+# --- History (LATEST 2 YEARS) ---
+
+# Rolling window of requisitions kept in LATEST 2 YEARS
+HISTORY_WINDOW_DAYS  = 730
+# Re-check this many days below the newest stored requisition, so ones
+# that became "Fully Received" late are still picked up
+HISTORY_OVERLAP_DAYS = 14
+# The grid is dated by creation, so a requisition received more than
+# HISTORY_OVERLAP_DAYS after it was placed is only seen by a crawl of the
+# whole window. One runs when the last is this many days old (0 = every
+# run), so such a requisition reaches the sheet at most this late.
+HISTORY_FULL_CRAWL_DAYS = 7
+# Date of the last full crawl ("" = not kept: every run is a full crawl)
+HISTORY_STATE_FILE = "history_state.json"
+
+# --- Streaming writes (CAME IN) ---
+
+# Scraped rows are appended as they come in: a batch is written once it
+# holds this many rows, or after this many seconds
+STREAM_FLUSH_ROWS    = 200
+STREAM_FLUSH_SECONDS = 60
+
+# --- Run reports (instrument.py) ---
+
+# Each workflow's per-stage timings and counters are saved here as JSON
+# ("" disables); the slowest POs listed in them and on screen
+RUN_REPORT_DIR     = "run_reports"
+RUN_REPORT_SLOWEST = 10
+
+# --- Command-line runner (cli.py) ---
+
+# Steps run at the same time, and how many browsers may be open at once:
+# each browser step logs into its own, and DETAIL_WORKERS take whatever
+# slots are left (falling back to the step's own browser when none are)
+CLI_WORKERS         = 3
+CLI_BROWSER_WORKERS = 3
+
 # --- Sheet names ---
 
 SHEET_NAMES = {
@@ -0,0 +1,231 @@
+"""
+Fetching of PO detail pages for the upcoming/received scrapers.
+
+Two modes, picked by config.DETAIL_FETCH_MODE:
+  "browser"  a pool of logged-in browser workers loads each page;
+  "http"     the main browser's session cookies are copied into a pooled
+             HTTP client and pages are downloaded directly.
+
+Either way pages come back as raw HTML in the same order as the PO
+list. A PO that fails is retried once in the caller's browser
+(http mode only if config.HTTP_FALLBACK_TO_BROWSER); if that also
+fails it comes back as None so the remaining POs are not lost.
+
+Worker browsers count against `browser_slots` when it is set (cli.py
+sets it to the CLI's browser semaphore): each takes a free slot without
+waiting, and the pool shrinks to the slots it got.
+
+Exposes:
+    imap_detail_pages(urls, driver, workers, mode) -> Iterator[(url, html | None)]
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from . import config, instrument, waits
+from .browser import get_driver
+
+# Element that marks a PO detail page as loaded
+DETAIL_READY = (By.ID, "PODatePlaced_DISP")
+
+# Shared cap on open browsers, set by cli.run_steps (None = no cap)
+browser_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def _load_detail(driver, url: str) -> str:
+    """Load a detail page in the driver's current window and return its HTML."""
+    driver.get(url)
+    waits.until(driver, EC.presence_of_element_located(DETAIL_READY), "detail page")
+    return driver.page_source
+
+
+def _load_in_new_window(driver, url: str) -> str:
+    """Open a detail page in a second window, leaving the list page untouched."""
+    main = driver.window_handles[0]
+    driver.execute_script("window.open(arguments[0]);", url)
+    driver.switch_to.window(driver.window_handles[-1])
+    try:
+        waits.until(driver, EC.presence_of_element_located(DETAIL_READY), "detail page")
+        return driver.page_source
+    finally:
+        driver.close()
+        driver.switch_to.window(main)
+
+
+def _sequential(urls: List[str], driver) -> Iterator[Tuple[str, Optional[str]]]:
+    for url in urls:
+        try:
+            with instrument.span("detail fetch", item=url):
+                html = _load_in_new_window(driver, url)
+            yield url, html
+        except Exception as e:
+            print(f"⚠️ Could not load {url}: {e}")
+            yield url, None
+
+
+def _ordered_map(
+    fetch: Callable[[str], str],
+    urls: List[str],
+    workers: int,
+    fallback_driver=None,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Run fetch(url) on `workers` threads and yield (url, html) in input
+    order. At most 2 × workers URLs are in flight or buffered; failures
+    are retried in `fallback_driver` when one is given.
+    """
+    @instrument.carry
+    def attempt(url: str):
+        try:
+            with instrument.span("detail fetch", item=url):
+                return fetch(url), None
+        except Exception as e:
+            return None, e
+
+    window = 2 * workers
+    todo = iter(urls)
+    with ThreadPoolExecutor(workers) as pool:
+        pending: deque = deque()
+        for url in todo:
+            pending.append((url, pool.submit(attempt, url)))
+            if len(pending) >= window:
+                break
+
+        while pending:
+            url, fut = pending.popleft()
+            html, err = fut.result()
+            if html is None:
+                if fallback_driver is not None:
+                    print(f"⚠️ Fetch failed for {url} ({err}); retrying in main browser.")
+                    html = next(_sequential([url], fallback_driver))[1]
+                else:
+                    print(f"⚠️ Fetch failed for {url} ({err}).")
+            yield url, html
+
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(attempt, nxt)))
+
+
+def _start_workers(n: int) -> list:
+    """Log in n worker browsers in parallel; workers that fail are dropped."""
+    drivers = []
+    with ThreadPoolExecutor(n) as pool:
+        futures = [pool.submit(instrument.carry(get_driver)) for _ in range(n)]
+        for fut in futures:
+            try:
+                drivers.append(fut.result())
+            except Exception as e:
+                print(f"⚠️ Worker browser failed to log in: {e}")
+    return drivers
+
+
+def _take_slots(n: int) -> int:
+    """Take up to n free browser slots without blocking; returns how many."""
+    if browser_slots is None:
+        return n
+    taken = 0
+    while taken < n and browser_slots.acquire(blocking=False):
+        taken += 1
+    return taken
+
+
+def _release_slots(n: int) -> None:
+    if browser_slots is not None:
+        for _ in range(n):
+            browser_slots.release()
+
+
+def _browser_pool(urls: List[str], driver, workers: int):
+    slots = _take_slots(workers)
+    try:
+        yield from _browser_workers(urls, driver, slots)
+    finally:
+        _release_slots(slots)
+
+
+def _browser_workers(urls: List[str], driver, workers: int):
+    if workers <= 1:
+        # not worth logging in a single extra browser for
+        yield from _sequential(urls, driver)
+        return
+    print(f"🧵 Fetching {len(urls)} PO detail pages with {workers} browser workers…")
+    drivers = _start_workers(workers)
+    if not drivers:
+        print("⚠️ No worker browsers available; fetching sequentially.")
+        yield from _sequential(urls, driver)
+        return
+
+    # Idle logged-in drivers; a fetch borrows one and always returns it
+    idle: queue.Queue = queue.Queue()
+    for d in drivers:
+        idle.put(d)
+
+    def fetch(url: str) -> str:
+        d = idle.get()
+        try:
+            return _load_detail(d, url)
+        finally:
+            idle.put(d)
+
+    try:
+        yield from _ordered_map(fetch, urls, len(drivers), driver)
+    finally:
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+
+def _http_pool(urls: List[str], driver):
+    from . import http_fetch
+
+    print(f"🌐 Fetching {len(urls)} PO detail pages over HTTP "
+          f"({config.HTTP_CONCURRENCY} connections)…")
+    session = http_fetch.session_from_driver(driver)
+    fallback = driver if config.HTTP_FALLBACK_TO_BROWSER else None
+    try:
+        yield from _ordered_map(
+            lambda url: http_fetch.fetch_page(session, url),
+            urls, config.HTTP_CONCURRENCY, fallback,
+        )
+    finally:
+        session.close()
+
+
+def imap_detail_pages(
+    urls: List[str],
+    driver=None,
+    workers: Optional[int] = None,
+    mode: Optional[str] = None,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Yield (url, html) for every detail URL, in input order.
+
+    mode="http" downloads pages with the logged-in driver's cookies.
+    mode="browser" with workers > 1 uses that many extra browsers; with
+    workers <= 1 pages are opened one by one in a second window of
+    `driver`. Both default to the config values at call time.
+    """
+    workers = config.DETAIL_WORKERS if workers is None else workers
+    mode = mode or config.DETAIL_FETCH_MODE
+    urls = list(urls)
+    if not urls:
+        return
+    if mode == "http":
+        yield from _http_pool(urls, driver)
+        return
+
+    n = min(workers, len(urls))
+    if n <= 1:
+        yield from _sequential(urls, driver)
+    else:
+        yield from _browser_pool(urls, driver, n)
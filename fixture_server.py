@@ -0,0 +1,424 @@
+"""
+Local stand-in for the procurement portal, serving the pages in
+fixtures/. Lets the HTTP detail-fetch mode and whole workflows be
+exercised offline.
+
+The fixture pages are synthetic: hand-written HTML that follows the
+portal's markup (the ids, classes and table layout the scrapers rely
+on), not captured portal pages. They are used as templates: their data
+rows are replaced by rows from a Portal – a synthetic site of fully
+received POs, open POs and requisitions, `scale` times a small base
+size – so the same markup comes back at any size.
+
+Routes:
+    GET  /login                 login form (text + password + "Log In" button)
+    POST /login                 sets the session cookie, redirects to /home
+    GET  /home                  landing page with the portal menu
+    GET  /po/search             PO Search (po_search.html); ?status=… lists POs
+    GET  /po/open               open POs (po_list.html)
+    GET  /po/detail/<po>        PO detail (po_detail.html, or po_detail_invoice.html
+                                with the CAD-Invoice column for some received POs)
+    GET  /requisitions?page=N   requisition grid (history_grid.html), paged
+    GET  /po/<name>             fixtures/<name>.html as is
+
+Everything under /po/ and /requisitions needs the session cookie and
+redirects to /login without it, as the portal does.
+
+Usage:
+    python -m automation-project.fixture_server --port 8765 --scale 10
+
+    with fixture_server.serve(Portal(scale=10)) as base_url:
+        session = http_fetch.new_session([fixture_server.SESSION_COOKIE])
+        html = http_fetch.fetch_page(session, f"{base_url}/po/po_detail")
+"""
+from __future__ import annotations
+
+import argparse
+import html as html_lib
+import random
+import re
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+SESSION_COOKIE = {"name": "ASP.NET_SessionId", "value": "fixture-session", "path": "/"}
+
+RECEIVED_STATUS = "fully received, reconciled"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Sign In</title></head><body>
+  <form method="post" action="/login">
+    <input type="text" name="username">
+    <input type="password" name="password">
+    <button type="submit">Log In</button>
+  </form>
+</body></html>
+"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><title>Home</title></head><body>
+  <a id="linkpitmenu_section_15" href="#">Requisitions</a>
+  <a id="linkpitmenu_item_160" href="/requisitions">My Requisitions</a>
+  <a id="linkpitmenu_section_20" href="#">Purchase Orders</a>
+  <a id="linkpitmenu_item_230" href="/po/search">PO Search</a>
+  <a id="linkpitmenu_item_280" href="/po/open">Open POs</a>
+</body></html>
+"""
+
+# --------------------------------------------------
+# SYNTHETIC PORTAL DATA
+# --------------------------------------------------
+
+# (item link text, href, description, unit cost) – the fixture pages' lines first
+_FIXTURE_ITEMS = [
+    ("CR-0870-J (1081787)", "/item/1081787", "Taylor Reagent DPD Powder (113 g) [TAYLOR]", 18.40),
+    ("STP-221104", "/item/221104", "Clipboard, Masonite, Legal (each)", 2.15),
+    ("DEB-1001", "/item/1001", "Deb Clear Foam Wash 1 Litre", 9.80),
+    ("GLV-NIT-L", "/item/88321", "Nitrile Powder Free Medical Gloves Large", 11.25),
+    ("TWL-UNIV", "/item/77410", "Towel Tork Universal Natural (case of 12)", 41.00),
+]
+_VENDORS = ["Taylor Technologies", "Grainger Canada", "Bunzl Canada", "Staples Business"]
+_REQ_TITLES = [
+    "Group Fitness Equipment (Store 001)", "Pool Chemicals - Store 001",
+    "Main Location Support (Store 001)", "Main Location GM (Store 001)",
+    "Janitorial Supplies (Store 001)",
+]
+_REQ_STATUSES = ["Fully Received"] * 4 + ["Partially Received", "Approved"]
+
+
+class Line(NamedTuple):
+    item: str           # link text
+    href: str
+    desc: str
+    cost: float
+    qty: int
+    received: int
+
+
+class PO(NamedTuple):
+    number: str
+    vendor: str
+    placed: date
+    complete: Optional[date]    # None while open
+    invoice: bool               # detail page has the CAD-Invoice column
+    lines: List[Line]
+
+
+class Requisition(NamedTuple):
+    number: str
+    when: datetime
+    status: str
+    title: str
+    total: float
+
+
+class Portal:
+    """
+    Synthetic portal contents, `scale` × the base site: BASE_RECEIVED
+    fully received POs inside the two-year window (plus two older ones,
+    where the received scan stops), BASE_OPEN open POs and
+    BASE_REQUISITIONS requisitions going back past the window, newest
+    first like the portal lists them. Same scale and seed, same site.
+    """
+
+    BASE_RECEIVED = 8
+    BASE_OPEN = 4
+    BASE_REQUISITIONS = 40
+    GRID_PAGE_ROWS = 20
+    ITEMS = 60              # distinct items across all POs (× scale, capped)
+
+    def __init__(self, scale: int = 1, seed: int = 7, today: Optional[date] = None):
+        self.scale = scale
+        self.today = today or date.today()
+        rng = random.Random(seed)
+        self.catalog = list(_FIXTURE_ITEMS) + [
+            (f"SYN-{n:05d}", f"/item/9{n:05d}", f"Synthetic Supply Item {n}",
+             round(rng.uniform(1, 90), 2))
+            for n in range(min(self.ITEMS * scale, 2000))
+        ]
+
+        n_received = self.BASE_RECEIVED * scale
+        self.received = [
+            self._po(rng, f"001-{10000 + n_received + 2 - i}",
+                     self.today - timedelta(days=5 + i * 700 // n_received), True)
+            for i in range(n_received)
+        ] + [
+            self._po(rng, f"001-{10000 + 2 - i}", self.today - timedelta(days=760 + 30 * i), True)
+            for i in range(2)
+        ]
+        n_open = self.BASE_OPEN * scale
+        self.open = [
+            self._po(rng, f"001-{30000 - i}", self.today - timedelta(days=i * 60 // n_open), False)
+            for i in range(n_open)
+        ]
+        self.pos: Dict[str, PO] = {po.number: po for po in self.received + self.open}
+
+        n_req = self.BASE_REQUISITIONS * scale
+        step = 800 * 24 * 60 // n_req          # minutes between requisitions
+        self.requisitions = [
+            Requisition(
+                str(60000 + n_req - i),
+                datetime.combine(self.today, datetime.min.time())
+                - timedelta(minutes=i * step + rng.randrange(max(1, step))),
+                rng.choice(_REQ_STATUSES), rng.choice(_REQ_TITLES),
+                round(rng.uniform(40, 2500), 2),
+            )
+            for i in range(n_req)
+        ]
+
+    def _po(self, rng: random.Random, number: str, placed: date, done: bool) -> PO:
+        lines = []
+        for item, href, desc, cost in rng.sample(self.catalog, rng.randint(1, 8)):
+            qty = rng.randint(1, 24)
+            received = rng.randint(0, qty) if rng.random() < 0.3 else qty
+            if not done and rng.random() < 0.7:
+                received = rng.randint(0, qty - 1)
+            lines.append(Line(item, href, desc, cost, qty, received))
+        complete = min(placed + timedelta(days=rng.randint(3, 30)), self.today) if done else None
+        return PO(number, rng.choice(_VENDORS), placed, complete,
+                  done and int(number[-1]) % 3 == 0, lines)
+
+    def grid_pages(self) -> int:
+        return max(1, -(-len(self.requisitions) // self.GRID_PAGE_ROWS))
+
+    def summary(self) -> str:
+        lines = sum(len(po.lines) for po in self.pos.values())
+        return (f"{len(self.received)} received POs, {len(self.open)} open POs "
+                f"({lines} lines), {len(self.requisitions)} requisitions "
+                f"on {self.grid_pages()} grid pages")
+
+
+# --------------------------------------------------
+# PAGES (fixture markup, generated rows)
+# --------------------------------------------------
+
+_LIST_ROW = re.compile(r'\n[ \t]*<tr class="Grid(?:Alt)?Row">.*?</tr>', re.S)
+_DETAIL_ROW = re.compile(r'\n[ \t]*<tr><td class="GridDetail".*?</tr>', re.S)
+_PAGER = re.compile(r'<div class="GridPager">.*?</div>', re.S)
+
+_templates: Dict[str, str] = {}
+
+
+def _template(name: str) -> str:
+    if name not in _templates:
+        _templates[name] = (FIXTURES_DIR / f"{name}.html").read_text(encoding="utf-8")
+    return _templates[name]
+
+
+def _with_rows(page: str, row_re: "re.Pattern", rows: List[str]) -> str:
+    """Replace the fixture page's data rows (matched by row_re) with `rows`."""
+    first = row_re.search(page)
+    rest = row_re.sub("", page[first.end():])
+    return page[:first.start()] + "".join("\n" + r for r in rows) + rest
+
+
+def _set_disp(page: str, field: str, value: str) -> str:
+    return re.sub(rf'(<div id="{field}_DISP">)[^<]*(</div>)',
+                  lambda m: m.group(1) + html_lib.escape(value) + m.group(2), page)
+
+
+def _grid_class(i: int) -> str:
+    return "GridAltRow" if i % 2 == 0 else "GridRow"
+
+
+def _us(d: date) -> str:
+    return d.strftime("%m/%d/%Y")
+
+
+def _detail_url(po: PO) -> str:
+    return f"/po/detail/{quote(po.number)}"
+
+
+def search_page(portal: Portal, status: str) -> str:
+    page = _template("po_search")
+    pos = portal.received if status == RECEIVED_STATUS else []
+    if not status:
+        page = page.replace(f'value="{RECEIVED_STATUS}"', 'value=""').replace(
+            f'__rendered">{RECEIVED_STATUS}<', '__rendered">Any status<')
+    rows = [
+        f'      <tr class="{_grid_class(i)}"><td class="GridDetail"><a href="{_detail_url(po)}">'
+        f'{po.number}</a> ({_us(po.placed)})</td><td class="GridDetail">{po.vendor}</td>'
+        f'<td class="GridDetail">{RECEIVED_STATUS}</td><td class="GridDetail">'
+        f'${sum(l.cost * l.qty for l in po.lines):,.2f}</td></tr>'
+        for i, po in enumerate(pos)
+    ]
+    return _with_rows(page, _LIST_ROW, rows)
+
+
+def open_list_page(portal: Portal) -> str:
+    rows = [
+        f'      <tr class="{_grid_class(i)}"><td class="GridDetail"><a href="{_detail_url(po)}">'
+        f'{po.number}</a></td><td class="GridDetail">{_us(po.placed)}</td>'
+        f'<td class="GridDetail">{po.vendor}</td><td class="GridDetail">partially received</td>'
+        f'<td class="GridDetail">${sum(l.cost * l.qty for l in po.lines):,.2f}</td></tr>'
+        for i, po in enumerate(portal.open)
+    ]
+    return _with_rows(_template("po_list"), _LIST_ROW, rows)
+
+
+def detail_page(po: PO) -> str:
+    page = _template("po_detail_invoice" if po.invoice else "po_detail")
+    page = re.sub(r"<title>.*?</title>", f"<title>Purchase Order {po.number}</title>", page)
+    page = _set_disp(page, "PONumber", po.number)
+    page = _set_disp(page, "PODatePlaced", _us(po.placed))
+    page = _set_disp(page, "DateComplete", _us(po.complete) if po.complete else "")
+    page = _set_disp(page, "POStatus", RECEIVED_STATUS if po.complete else "partially received")
+
+    rows = []
+    for n, line in enumerate(po.lines, 1):
+        cells = [
+            f'<a href="{line.href}">{html_lib.escape(line.item)}</a>',
+            html_lib.escape(line.desc), "EA",
+            f'<div id="InvoiceCostOC_DISP">{line.cost:.2f}</div>',
+            str(line.qty), "0.00", f"{line.cost * line.qty:.2f}",
+            _us(po.placed), "Store 001", "",
+        ]
+        if po.invoice:
+            cells.append(f"INV-{po.number}-{n}")
+        cells.append(str(line.received))
+        rows.append("      <tr>" + "".join(
+            f'<td class="GridDetail" id="{n}_{c}">{v}</td>' for c, v in enumerate(cells, 1)
+        ) + "</tr>")
+    return _with_rows(page, _DETAIL_ROW, rows)
+
+
+def grid_page(portal: Portal, page_no: int) -> str:
+    size = portal.GRID_PAGE_ROWS
+    reqs = portal.requisitions[(page_no - 1) * size:page_no * size]
+    rows = [
+        f'      <tr class="{_grid_class(i)}">\n'
+        f'        <td class="GridDetail"><input type="checkbox" name="sel" value="{r.number}"></td>\n'
+        f'        <td class="GridDetail"><a href="/Requisition/View.aspx?ReqID={r.number}">{r.number}</a></td>\n'
+        f'        <td class="GridDetail">{_us(r.when)} {r.when.hour}:{r.when.minute:02d}</td>\n'
+        f'        <td class="GridDetail">{r.status}</td>\n'
+        f'        <td class="GridDetail">{html_lib.escape(r.title)}</td>\n'
+        f'        <td class="GridDetail">${r.total:,.2f}</td>\n'
+        f'        <td class="GridDetail">Store 001</td>\n'
+        f'      </tr>'
+        for i, r in enumerate(reqs)
+    ]
+    last = page_no >= portal.grid_pages()
+    pager = (
+        f'<form class="GridPager" method="get" action="/requisitions">\n'
+        f'      <input type="hidden" name="page" value="{page_no + 1}">\n'
+        f'      <input type="submit" class="GridDetailSubmit" name="prev" value="&lt; Prev" disabled>\n'
+        f'      <input type="submit" class="GridDetailSubmit" name="next" value="Next &gt;"'
+        f'{" disabled" if last else ""}>\n'
+        f'    </form>'
+    )
+    page = _with_rows(_template("history_grid"), _LIST_ROW, rows)
+    return _PAGER.sub(lambda _: pager, page)
+
+
+# --------------------------------------------------
+# SERVER
+# --------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):  # keep benchmark output quiet
+        pass
+
+    def _send(self, status: int, body: str = "", headers: dict | None = None) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _logged_in(self) -> bool:
+        token = f"{SESSION_COOKIE['name']}={SESSION_COOKIE['value']}"
+        return token in self.headers.get("Cookie", "")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path, query = url.path, parse_qs(url.query)
+        portal: Portal = self.server.portal
+        if path == "/login":
+            return self._send(200, LOGIN_PAGE)
+        if path == "/home":
+            return self._send(200, HOME_PAGE)
+        if not path.startswith(("/po/", "/requisitions")):
+            return self._send(404, "not found")
+        if not self._logged_in():
+            return self._send(302, headers={"Location": "/login"})
+
+        if path == "/po/search":
+            return self._send(200, search_page(portal, query.get("status", [""])[0]))
+        if path == "/po/open":
+            return self._send(200, open_list_page(portal))
+        if path.startswith("/po/detail/"):
+            po = portal.pos.get(unquote(path[len("/po/detail/"):]))
+            if po is None:
+                return self._send(404, "not found")
+            return self._send(200, detail_page(po))
+        if path == "/requisitions":
+            try:
+                page_no = max(1, int(query.get("page", ["1"])[0]))
+            except ValueError:
+                page_no = 1
+            return self._send(200, grid_page(portal, page_no))
+
+        page = FIXTURES_DIR / (Path(path[len("/po/"):]).name + ".html")
+        if not page.is_file():
+            return self._send(404, "not found")
+        return self._send(200, page.read_text(encoding="utf-8"))
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0] != "/login":
+            return self._send(404, "not found")
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        cookie = f"{SESSION_COOKIE['name']}={SESSION_COOKIE['value']}; Path=/"
+        return self._send(302, headers={"Location": "/home", "Set-Cookie": cookie})
+
+
+def _server(host: str, port: int, portal: Optional[Portal]) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.portal = portal or Portal()
+    return server
+
+
+@contextmanager
+def serve(portal: Optional[Portal] = None, host: str = "127.0.0.1",
+          port: int = 0) -> Iterator[str]:
+    """Run the server on a background thread; yields its base URL."""
+    server = _server(host, port, portal)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve the synthetic fixture portal locally.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--scale", type=int, default=1, help="multiply the synthetic site size")
+    args = ap.parse_args()
+
+    portal = Portal(args.scale)
+    server = _server(args.host, args.port, portal)
+    print(f"🧪 Fixture portal on http://{args.host}:{args.port} – {portal.summary()} "
+          f"(Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
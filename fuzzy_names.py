@@ -0,0 +1,171 @@
+"""
+Fuzzy lookup of canonical item names for descriptions that NAME_MAP
+doesn't spell exactly.
+
+A trigram index over every alias (NAME_MAP keys and canonical names)
+finds a handful of candidates; they are re-scored token by token so
+that typos ("nitrle" ~ "nitrile") count as matches while real
+differences ("small" vs "large", "6 lbs" vs "10 lbs") do not.
+
+Matches that were accepted with a low score, or rejected narrowly, are
+collected and written to config.FUZZY_REPORT_FILE so the map can be
+extended.
+
+Exposes:
+    NameIndex(aliases).lookup(text) -> (canonical | None, score, alias)
+    record(query, canonical, alias, score, accepted), write_report()
+"""
+from __future__ import annotations
+
+import csv
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import config
+from .utils import package_path
+
+
+def squash(text: str) -> str:
+    """Lower-case, punctuation to spaces, single spaces."""
+    out = [ch if ch.isalnum() else " " for ch in text.lower()]
+    return " ".join("".join(out).split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insert, delete or substitution."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def _token_sim(q: str, c: str) -> float:
+    if q == c:
+        return 1.0
+    # sizes, weights and counts must match exactly
+    if any(ch.isdigit() for ch in q + c):
+        return 0.0
+    if min(len(q), len(c)) >= 4 and _within_one_edit(q, c):
+        return 0.9
+    if min(len(q), len(c)) >= 4 and (q.startswith(c) or c.startswith(q)):
+        return 0.8   # abbreviations: "cond" ~ "conditioner"
+    return 0.0
+
+
+def _token_score(q_tokens: List[str], c_tokens: List[str]) -> float:
+    """Dice-style score over greedily aligned tokens."""
+    if not q_tokens or not c_tokens:
+        return 0.0
+    used = set()
+    total = 0.0
+    for q in q_tokens:
+        best, best_j = 0.0, None
+        for j, c in enumerate(c_tokens):
+            if j in used:
+                continue
+            s = _token_sim(q, c)
+            if s > best:
+                best, best_j = s, j
+                if s == 1.0:
+                    break
+        if best_j is not None:
+            used.add(best_j)
+            total += best
+    return 2 * total / (len(q_tokens) + len(c_tokens))
+
+
+class NameIndex:
+    """Trigram → alias postings plus per-alias tokens, built once per map."""
+
+    def __init__(self, aliases: Iterable[Tuple[str, str]], candidates: int = 8):
+        self._alias: List[str] = []
+        self._canonical: List[str] = []
+        self._tokens: List[List[str]] = []
+        self._ngram_count: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._candidates = candidates
+
+        seen = set()
+        for alias, canonical in aliases:
+            text = squash(alias)
+            if not text or canonical is None or text in seen:
+                continue
+            seen.add(text)
+            idx = len(self._alias)
+            grams = _trigrams(text)
+            self._alias.append(text)
+            self._canonical.append(canonical)
+            self._tokens.append(text.split())
+            self._ngram_count.append(len(grams))
+            for g in grams:
+                self._postings[g].append(idx)
+
+    def lookup(self, text: str) -> Tuple[Optional[str], float, str]:
+        """Best (canonical, score, alias) for text; canonical None if nothing shares a trigram."""
+        query = squash(text)
+        grams = _trigrams(query)
+        shared: Dict[int, int] = defaultdict(int)
+        for g in grams:
+            for idx in self._postings.get(g, ()):
+                shared[idx] += 1
+        if not shared:
+            return None, 0.0, ""
+
+        n = len(grams)
+        dice = sorted(
+            shared.items(),
+            key=lambda kv: 2 * kv[1] / (n + self._ngram_count[kv[0]]),
+            reverse=True,
+        )[:self._candidates]
+
+        q_tokens = query.split()
+        best_idx, best_score = None, -1.0
+        for idx, _ in dice:
+            score = _token_score(q_tokens, self._tokens[idx])
+            if score > best_score:
+                best_idx, best_score = idx, score
+        return self._canonical[best_idx], best_score, self._alias[best_idx]
+
+
+# --- Low-confidence report ---
+
+_report_lock = threading.Lock()
+_report: Dict[str, Tuple[str, str, float, bool]] = {}
+
+
+def record(query: str, canonical: Optional[str], alias: str,
+           score: float, accepted: bool) -> None:
+    """Remember a borderline lookup for the report (once per query)."""
+    if accepted and score >= config.FUZZY_NAME_CONFIDENT:
+        return
+    if not accepted and score < config.FUZZY_NAME_REPORT_FLOOR:
+        return
+    with _report_lock:
+        _report[query] = (canonical or "", alias, round(score, 3), accepted)
+
+
+def write_report(path: Optional[str] = None) -> None:
+    """Write borderline lookups collected so far as CSV, lowest score first."""
+    path = path or package_path(config.FUZZY_REPORT_FILE)
+    with _report_lock:
+        rows = sorted(_report.items(), key=lambda kv: kv[1][2])
+    if not rows or not path:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(["description", "best canonical name", "matched alias", "score", "used"])
+        for query, (canonical, alias, score, accepted) in rows:
+            w.writerow([query, canonical, alias, score, "yes" if accepted else "no"])
+    print(f"📝 {len(rows)} low-confidence name matches written to {path}")
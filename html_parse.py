@@ -0,0 +1,150 @@
+"""
+HTML parsing for portal pages.
+
+Every page goes through one BeautifulSoup tree builder, picked by
+config.HTML_PARSER ("lxml" is several times faster than the pure-Python
+"html.parser", which is used when lxml isn't installed). Detail and grid
+pages only need their tables, so by default just the <table> subtrees are
+built (a SoupStrainer); the rest of the page is skipped.
+
+A PO detail page is wrapped in a DetailPage, which parses it once and is
+shared by every lookup a scraper makes. One pass over the parsed tables
+indexes every element with an id: the `*_DISP` header fields, the
+line-item cells (`{row}_{col}`) and the line-item column headers
+(`..._col-N`), so the scrapers read rows from dicts instead of searching
+the tree once per cell. A `*_DISP` field that isn't inside a table is
+looked up in a full parse of the page, made at most once.
+
+Exposes:
+    parser_name() -> str
+    parse_page(html, tables_only=False) -> BeautifulSoup
+    DetailPage(html).tables / .full / .disp(field)
+    DetailPage(html).rows / .headers / .columns()
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.builder import builder_registry
+
+from . import config, instrument
+
+FALLBACK_PARSER = "html.parser"
+
+_TABLES = SoupStrainer("table")
+_CELL_ID = re.compile(r"(\d+)_(\d+)")      # line-item cell: {row}_{col}
+_HEADER_ID = re.compile(r"col-(\d+)$")     # line-item header: ..._col-N
+_resolved: Dict[str, str] = {}
+
+
+def parser_name() -> str:
+    """config.HTML_PARSER if that tree builder is installed, else html.parser."""
+    wanted = config.HTML_PARSER or FALLBACK_PARSER
+    name = _resolved.get(wanted)
+    if name is None:
+        name = wanted
+        if builder_registry.lookup(wanted) is None:
+            print(f"⚠️ HTML parser {wanted!r} not installed; using {FALLBACK_PARSER}.")
+            name = FALLBACK_PARSER
+        _resolved[wanted] = name
+    return name
+
+
+def parse_page(html: str, tables_only: bool = False) -> BeautifulSoup:
+    with instrument.span("html parse"):
+        return BeautifulSoup(html, parser_name(), parse_only=_TABLES if tables_only else None)
+
+
+class DetailPage:
+    """A PO detail page, parsed once and shared by every lookup on it."""
+
+    __slots__ = ("html", "_tables", "_full", "_ids", "_rows", "_headers")
+
+    def __init__(self, html: str):
+        self.html = html
+        self._tables: Optional[BeautifulSoup] = None
+        self._full: Optional[BeautifulSoup] = None
+        self._ids: Optional[Dict[str, Tag]] = None
+        self._rows: Dict[int, Dict[int, Tag]] = {}
+        self._headers: Dict[int, str] = {}
+
+    @property
+    def tables(self) -> BeautifulSoup:
+        """The page's tables (header form and line items)."""
+        if self._tables is None:
+            self._tables = parse_page(self.html, tables_only=True)
+        return self._tables
+
+    @property
+    def full(self) -> BeautifulSoup:
+        """The whole page; only parsed when something isn't in the tables."""
+        if self._full is None:
+            self._full = parse_page(self.html)
+        return self._full
+
+    def _index(self) -> None:
+        """One pass over the tables: ids, line-item cells, column headers."""
+        if self._ids is not None:
+            return
+        self._ids = {}
+        for el in self.tables.find_all(id=True):
+            el_id = el["id"]
+            if el_id in self._ids:
+                continue
+            self._ids[el_id] = el
+            m = _CELL_ID.fullmatch(el_id)
+            if m:
+                self._rows.setdefault(int(m.group(1)), {})[int(m.group(2))] = el
+                continue
+            m = _HEADER_ID.search(el_id)
+            if m:
+                self._headers[int(m.group(1))] = el.get_text(strip=True)
+
+    @property
+    def ids(self) -> Dict[str, Tag]:
+        """id → first element with it, over the tables."""
+        self._index()
+        return self._ids
+
+    def disp(self, field: str) -> Optional[str]:
+        """Stripped text of the `{field}_DISP` element, or None if the page has none."""
+        el_id = f"{field}_DISP"
+        el = self.ids.get(el_id)
+        if el is None:
+            el = self.full.find(id=el_id)
+        return None if el is None else el.get_text().strip()
+
+    # --- line items ---
+
+    @property
+    def rows(self) -> Dict[int, Dict[int, Tag]]:
+        """Line-item cells as {row: {col: cell}}, rows in page order."""
+        self._index()
+        return self._rows
+
+    @property
+    def headers(self) -> Dict[int, str]:
+        """Line-item header text by column number."""
+        self._index()
+        return self._headers
+
+    def columns(self) -> Dict[str, int]:
+        """
+        Column numbers of the line-item fields the scrapers read, from the
+        header text: "item" (Item No (ID)), "description", "quantity"
+        (ordered) and "received". Fields without a header are left out.
+        """
+        cols = {}
+        for n, text in self.headers.items():
+            text = text.lower()
+            if "item" in text and "id" in text:
+                cols["item"] = n
+            elif "description" in text:
+                cols["description"] = n
+            elif "quantity" in text:
+                cols["quantity"] = n
+            elif "received" in text:
+                cols["received"] = n
+        return cols
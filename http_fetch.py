@@ -0,0 +1,70 @@
+"""
+Cookie-backed HTTP fetching of PO detail pages.
+
+Once Selenium has logged in, its session cookies are copied into a
+pooled `requests.Session` (keep-alive, one connection per worker) and
+detail pages are downloaded directly instead of rendered in a browser.
+
+Exposes:
+    new_session(cookies, user_agent=None, pool_size=None) -> requests.Session
+    session_from_driver(driver, pool_size=None) -> requests.Session
+    fetch_page(session, url) -> str
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import config
+
+# Present on every PO detail page; a login/error page won't have it.
+DETAIL_MARKER = "PODatePlaced_DISP"
+
+
+def new_session(
+    cookies: Iterable[Dict],
+    user_agent: Optional[str] = None,
+    pool_size: Optional[int] = None,
+) -> requests.Session:
+    """
+    Build a keep-alive session carrying Selenium-style cookie dicts, with
+    pool_size connections per host (config.HTTP_CONCURRENCY by default).
+    """
+    if pool_size is None:
+        pool_size = config.HTTP_CONCURRENCY
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+
+    for c in cookies:
+        session.cookies.set(
+            c["name"], c["value"],
+            domain=c.get("domain") or "",
+            path=c.get("path", "/"),
+        )
+    return session
+
+
+def session_from_driver(driver, pool_size: Optional[int] = None) -> requests.Session:
+    """Copy the logged-in browser's cookies and user agent into a new session."""
+    user_agent = driver.execute_script("return navigator.userAgent;")
+    return new_session(driver.get_cookies(), user_agent, pool_size)
+
+
+def fetch_page(session: requests.Session, url: str) -> str:
+    """
+    GET a detail page and return its HTML. Raises if the response is an
+    error or doesn't look like a PO detail page (e.g. an expired session
+    redirected to the login screen).
+    """
+    resp = session.get(url, timeout=config.HTTP_TIMEOUT)
+    resp.raise_for_status()
+    html = resp.text
+    if DETAIL_MARKER not in html:
+        raise ValueError("response is not a PO detail page (session expired?)")
+    return html
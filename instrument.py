@@ -0,0 +1,272 @@
+"""
+Lightweight timing and counters for the workflows.
+
+A workflow (process_received_orders, …) runs inside workflow(name); while
+it runs, span(stage) blocks add their time to that stage – login, list
+navigation, detail fetch, html parse, normalize, sheets open / read /
+write – and count() bumps named counters. A span can name the PO it
+worked on, so the slowest POs can be listed across stages. Spans outside
+a workflow cost almost nothing and are not recorded.
+
+Recording is per thread; helper threads (detail-page workers) join the
+workflow that started them through carry(fn). Workflows running at the
+same time on different threads (cli.py) are kept apart.
+
+At the end of a workflow a stage table, the counters and the slowest
+POs are printed, and the same data is written as JSON to
+config.RUN_REPORT_DIR. last_run(name) hands the finished Run to code
+that wants the numbers (benchmarks/end_to_end.py).
+
+Worksheets handed out by sheets_io.open_sheet are wrapped in
+TimedWorksheet, so every Sheets read and write is a span.
+
+Exposes:
+    workflow(name)              context manager / decorator
+    span(stage, item=None)      context manager / decorator
+    count(name, n=1), label(item, name), carry(fn)
+    last_run(name) -> Run | None
+    TimedWorksheet(ws)
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Optional
+
+from . import config
+from .utils import package_path
+
+_local = threading.local()
+_finished: Dict[str, "Run"] = {}     # workflow name → its last finished Run
+
+
+class Run:
+    """Everything recorded during one workflow."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = datetime.now()
+        self.seconds = 0.0
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, list] = {}               # stage → [count, seconds, max]
+        self.counters: Dict[str, int] = {}
+        self.items: Dict[str, Dict[str, float]] = {}    # PO/URL → stage → seconds
+        self.labels: Dict[str, str] = {}                # URL → PO
+
+    def add(self, stage: str, seconds: float, item: Optional[str] = None) -> None:
+        with self._lock:
+            st = self.stages.get(stage)
+            if st is None:
+                st = self.stages[stage] = [0, 0.0, 0.0]
+            st[0] += 1
+            st[1] += seconds
+            st[2] = max(st[2], seconds)
+            if item is not None:
+                per = self.items.setdefault(item, {})
+                per[stage] = per.get(stage, 0.0) + seconds
+
+    def count(self, name: str, n: int) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def slowest(self, n: int) -> list:
+        """[(po, total seconds, {stage: seconds})], slowest first."""
+        merged: Dict[str, Dict[str, float]] = {}
+        for item, per in self.items.items():
+            dst = merged.setdefault(self.labels.get(item, item), {})
+            for stage, s in per.items():
+                dst[stage] = dst.get(stage, 0.0) + s
+        rows = [(po, sum(per.values()), per) for po, per in merged.items()]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows[:n]
+
+    def to_dict(self) -> dict:
+        return {
+            "workflow": self.name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "seconds": round(self.seconds, 3),
+            "stages": {
+                stage: {"count": c, "seconds": round(s, 3), "max": round(m, 3)}
+                for stage, (c, s, m) in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_pos": [
+                {"po": po, "seconds": round(total, 3),
+                 "stages": {k: round(v, 3) for k, v in per.items()}}
+                for po, total, per in self.slowest(config.RUN_REPORT_SLOWEST)
+            ],
+        }
+
+
+def current() -> Optional[Run]:
+    return getattr(_local, "run", None)
+
+
+# --------------------------------------------------
+# RECORDING
+# --------------------------------------------------
+
+@contextmanager
+def span(stage: str, item: Optional[str] = None):
+    """Time the block under `stage` (and `item`, a PO or URL) in the current workflow."""
+    run = current()
+    if run is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add(stage, time.perf_counter() - t0, item)
+
+
+def count(name: str, n: int = 1) -> None:
+    run = current()
+    if run is not None:
+        run.count(name, n)
+
+
+def label(item: str, name: str) -> None:
+    """Report spans recorded under `item` (e.g. a detail URL) as `name` (its PO)."""
+    run = current()
+    if run is not None:
+        run.labels[item] = name
+
+
+def carry(fn):
+    """Wrap fn so that, called on another thread, it records into this thread's workflow."""
+    run = current()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        prev = current()
+        _local.run = run
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.run = prev
+    return wrapper
+
+
+@contextmanager
+def workflow(name: str):
+    """Record the block as workflow `name`, then print and save its report."""
+    if current() is not None:       # nested: part of the outer workflow
+        yield current()
+        return
+    run = _local.run = Run(name)
+    try:
+        yield run
+    finally:
+        _local.run = None
+        run.seconds = time.perf_counter() - run._t0
+        _finished[name] = run
+        report(run)
+
+
+def last_run(name: str) -> Optional[Run]:
+    """The most recent finished run of workflow `name` in this process."""
+    return _finished.get(name)
+
+
+# --------------------------------------------------
+# REPORT
+# --------------------------------------------------
+
+def report(run: Run) -> None:
+    data = run.to_dict()
+    print(f"📈 {run.name}: {run.seconds:.1f}s")
+    for stage, st in data["stages"].items():
+        share = st["seconds"] / run.seconds if run.seconds else 0.0
+        print(f"   {stage:<16} {st['count']:>6}× {st['seconds']:>8.2f}s "
+              f"(max {st['max']:.2f}s, {share:4.0%} of wall time)")
+    if data["counters"]:
+        print("   " + ", ".join(f"{k}: {v}" for k, v in data["counters"].items()))
+    if data["slowest_pos"]:
+        print("   Slowest POs:")
+        for row in data["slowest_pos"]:
+            parts = ", ".join(f"{k} {v:.2f}s" for k, v in row["stages"].items())
+            print(f"     {row['po']:<24} {row['seconds']:6.2f}s  ({parts})")
+
+    folder = package_path(config.RUN_REPORT_DIR)
+    if not folder:
+        return
+    try:
+        os.makedirs(folder, exist_ok=True)
+        slug = run.name.lower().replace(" ", "_")
+        path = os.path.join(folder, f"{run.started:%Y%m%d-%H%M%S}-{slug}.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️ Could not write run report: {e}")
+
+
+# --------------------------------------------------
+# SHEETS
+# --------------------------------------------------
+
+_READS = frozenset({"get", "get_values", "get_all_values", "get_all_records",
+                    "batch_get", "col_values", "row_values", "acell", "cell"})
+_WRITES = frozenset({"update", "batch_update", "batch_clear", "clear", "append_row",
+                     "append_rows", "add_rows", "insert_rows", "delete_rows"})
+
+
+def _timed_call(stage: str, fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(stage):
+            result = fn(*args, **kwargs)
+        if stage == "sheets read" and isinstance(result, list):
+            count("sheets rows read", len(result))
+        return result
+    return wrapper
+
+
+class TimedSpreadsheet:
+    """Spreadsheet proxy timing values_batch_get / values_batch_update as Sheets reads / writes."""
+
+    def __init__(self, sh):
+        self._sh = sh
+
+    def __getattr__(self, name):
+        return getattr(self._sh, name)
+
+    def values_batch_get(self, ranges, params=None):
+        with span("sheets read"):
+            result = self._sh.values_batch_get(ranges, params=params)
+        count("sheets rows read",
+              sum(len(vr.get("values", ())) for vr in result.get("valueRanges", ())))
+        return result
+
+    def values_batch_update(self, body=None, **kwargs):
+        with span("sheets write"):
+            result = self._sh.values_batch_update(body=body, **kwargs)
+        count("sheets cells written",
+              sum(v is not None for item in (body or {}).get("data", ())
+                  for row in item["values"] for v in row))
+        return result
+
+
+class TimedWorksheet:
+    """Worksheet proxy: Sheets reads and writes are timed, everything else passes through."""
+
+    def __init__(self, ws):
+        self._ws = ws
+
+    def __getattr__(self, name):
+        attr = getattr(self._ws, name)
+        if name in _READS:
+            return _timed_call("sheets read", attr)
+        if name in _WRITES:
+            return _timed_call("sheets write", attr)
+        return attr
+
+    @property
+    def spreadsheet(self):
+        return TimedSpreadsheet(self._ws.spreadsheet)
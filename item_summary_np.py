@@ -0,0 +1,166 @@
+"""
+NumPy engine for ITEM SUMMARY (config.ITEM_SUMMARY_ENGINE = "numpy").
+
+Same inputs and output as scrape_item_summary.compute_rows, but CAME IN
+is turned into columnar arrays (item code, order day, qty, delivery
+days, price) and every per-item statistic is a grouped operation over
+arrays sorted by (item, value): group offsets come from the sort, and a
+group's median is the mean of its two middle elements, exactly as
+statistics.median computes it. Only the final string formatting loops
+over items.
+
+Exposes:
+    compute_rows(cols, pending, today=None) -> list[list[str]]
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Dict, List
+
+import numpy as np
+
+from .utils import order_frequency_text
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _pair_keys(groups, values, lo, width):
+    return groups.astype(np.int64) * width + (values - lo)
+
+
+def _grouped(groups: np.ndarray, values: np.ndarray, n_groups: int):
+    """
+    Values sorted by (group, value), with each group's start offset and
+    size (groups are ids 0..n_groups-1). Integer values are packed into
+    one int64 key per element, so a plain sort does it.
+    """
+    if values.dtype.kind == "f" or not len(values):
+        order = np.lexsort((values, groups))
+        g, v = groups[order], values[order]
+    else:
+        lo = values.min()
+        width = values.max() - lo + 1
+        keys = np.sort(_pair_keys(groups, values, lo, width))
+        g, v = keys // width, keys % width + lo
+    count = np.bincount(g, minlength=n_groups)
+    start = np.concatenate(([0], np.cumsum(count)[:-1]))
+    return g, v, start, count
+
+
+def _grouped_median(groups, values, n_groups, empty=np.nan):
+    """statistics.median per group; `empty` for groups with no values."""
+    if not len(values):
+        return np.full(n_groups, empty, dtype=np.float64)
+    _, v, start, count = _grouped(groups, values, n_groups)
+    has = count > 0
+    lo = np.where(has, start + (count - 1) // 2, 0)
+    hi = np.where(has, start + count // 2, 0)
+    v = v.astype(np.float64)
+    return np.where(has, (v[lo] + v[hi]) / 2, empty)
+
+
+def _gap_median(groups, days, n_groups):
+    """Median day gap between a group's consecutive dates; inf below two dates."""
+    g, d, _, _ = _grouped(groups, days, n_groups)
+    same = g[1:] == g[:-1]
+    return _grouped_median(g[1:][same], (d[1:] - d[:-1])[same], n_groups, np.inf)
+
+
+def _unique_pairs(groups, values):
+    """Distinct (group, value) pairs, sorted."""
+    lo = values.min()
+    width = values.max() - lo + 1
+    keys = np.sort(_pair_keys(groups, values, lo, width))
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return (keys // width).astype(np.intp), keys % width + lo
+
+
+def _month(days: np.ndarray) -> np.ndarray:
+    """Proleptic ordinal day → months since 1970-01."""
+    return (days - _EPOCH).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def compute_rows(cols: Dict[str, list], pending: Dict[str, List[datetime]],
+                 today=None) -> List[list]:
+    # Item codes in order of first appearance (that is the output order)
+    codes: Dict[str, int] = {}
+    first_row: List[int] = []
+    for r, item_id in enumerate(cols["item_id"]):
+        if item_id not in codes:
+            codes[item_id] = len(codes)
+            first_row.append(r)
+    n = len(codes)
+    print(f"⚙️  Aggregated stats for {n} unique items")
+    if not n:
+        return []
+
+    rows = len(cols["item_id"])
+    item = np.fromiter((codes[i] for i in cols["item_id"]), dtype=np.intp, count=rows)
+    day = np.fromiter((d.toordinal() for d in cols["date"]), dtype=np.int64, count=rows)
+    qty = np.asarray(cols["qty"], dtype=np.int64)
+    has_days = np.fromiter((d is not None for d in cols["days"]), dtype=bool, count=rows)
+    deliv = np.fromiter((d or 0 for d in cols["days"]), dtype=np.int64, count=rows)
+    has_price = np.fromiter((p is not None for p in cols["price"]), dtype=bool, count=rows)
+    price = np.fromiter((p or 0.0 for p in cols["price"]), dtype=np.float64, count=rows)
+
+    # CAME IN lines only: counts, quantities, month span
+    count = np.bincount(item, minlength=n)
+    sum_qty = np.bincount(item, weights=qty, minlength=n)
+    _, d_sorted, start, _ = _grouped(item, day, n)
+    span = _month(d_sorted[start + count - 1]) - _month(d_sorted[start]) + 1
+    avg_per_month = np.ceil(sum_qty / span).astype(np.int64)
+
+    med_deliv = _grouped_median(item[has_days], deliv[has_days], n)
+    med_qty = _grouped_median(item, qty, n, 0)
+    med_price = _grouped_median(item[has_price], price[has_price], n, 0.0)
+    cost = med_price * avg_per_month
+
+    # All order dates: CAME IN lines (duplicates kept) plus each pending
+    # date the item doesn't have yet
+    p_item, p_day = [], []
+    for item_id, dts in pending.items():
+        code = codes.get(item_id)
+        if code is not None:
+            p_item.extend([code] * len(dts))
+            p_day.extend(d.toordinal() for d in dts)
+    all_item, all_day = item, day
+    if p_item:
+        pu_item, pu_day = _unique_pairs(np.asarray(p_item, dtype=np.intp),
+                                        np.asarray(p_day, dtype=np.int64))
+        lo = min(day.min(), pu_day.min())
+        width = max(day.max(), pu_day.max()) - lo + 1
+        fresh = ~np.isin(_pair_keys(pu_item, pu_day, lo, width),
+                         _pair_keys(item, day, lo, width))
+        all_item = np.concatenate((item, pu_item[fresh]))
+        all_day = np.concatenate((day, pu_day[fresh]))
+
+    med_gap = _gap_median(all_item, all_day, n)
+    months = np.bincount(_unique_pairs(all_item, _month(all_day))[0], minlength=n)
+    badge = (count > 1) & (span > 2) & ((months / span >= 0.80) | (med_gap <= 45))
+
+    # utils.order_frequency_median works on distinct dates
+    u_item, u_day = _unique_pairs(all_item, all_day)
+    u_count = np.bincount(u_item, minlength=n)
+    u_gap = _gap_median(u_item, u_day, n)
+    last_day = u_day[np.cumsum(u_count) - 1]
+
+    urls, names = cols["url"], cols["name"]
+    out = []
+    for item_id, code in codes.items():
+        row = first_row[code]
+        last = date.fromordinal(int(last_day[code]))
+        gap = int(u_gap[code]) if u_count[code] > 1 else None
+        mark = "✅" if badge[code] else ""
+
+        out.append([
+            f'=HYPERLINK("{urls[row]}","{item_id}")',
+            names[row],
+            "" if np.isnan(med_deliv[code]) else f"{float(med_deliv[code]):.0f}",
+            str(int(med_qty[code])),
+            order_frequency_text((int(u_count[code]), last, gap), mark, today),
+            str(int(avg_per_month[code])),
+            f"{float(cost[code]):.2f}",
+            mark,
+            last.strftime("%Y-%m-%d"),
+        ])
+    return out
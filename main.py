@@ -2,6 +2,9 @@ from .scrape_upcoming import process_upcoming_orders
 from .scrape_received import process_received_orders
 from .scrape_item_summary import process_item_summary
 from .scrape_history import process_data_from_2024, write_weekly_by_month_table
+from .browser import BrowserSession
+from . import waits
+from .store import sync_sheets
 
 import tkinter as tk
 from tkinter import ttk, messagebox
@@ -36,7 +39,7 @@ def ask_user_choice():
       ("📥 Upcoming → WAITING ON",   "1"),
       ("📦 Received → CAME IN",      "2"),
       ("📊 Item Summary",            "3"),
-      ("📅 Past 2024",               "4"),
+      ("📅 Past 2 Years",            "4"),
       ("📅 Trend Chart Table",       "5"),
       ("⚡ Quick Update",            "6"),
       ("⚡⚡⚡ Full Update",         "7"),
@@ -67,23 +70,31 @@ if __name__ == "__main__":
         ch = ask_user_choice()
         if ch in (None,"0"):
             break
+        done = None     # (title, message) shown once everything is published
         if   ch=="1": process_upcoming_orders()
         elif ch=="2": process_received_orders()
-        elif ch=="3": process_item_summary()
-        elif ch=="4": process_data_from_2024()
+        elif ch=="3": process_item_summary(full=True)
+        elif ch=="4": process_data_from_2024(full=True)
         elif ch=="5": write_weekly_by_month_table()
         elif ch == "6":
             process_item_summary()
             process_data_from_2024()
             write_weekly_by_month_table()
-            messagebox.showinfo("Quick Update", "All summaries/tables refreshed from Sheets only.")
+            done = ("Quick Update", "All summaries/tables refreshed from Sheets only.")
         elif ch == "7":
-            process_received_orders()
-            process_upcoming_orders()
-            process_item_summary()
-            process_data_from_2024()
+            # One login for all three browser workflows
+            with BrowserSession() as session:
+                process_received_orders(session.acquire())
+                process_upcoming_orders(session.acquire())
+                process_item_summary()
+                process_data_from_2024(session.acquire())
             write_weekly_by_month_table()
-            messagebox.showinfo("Full Update", "All summaries/tables are completed.")
+            done = ("Full Update", "All summaries/tables are completed.")
         else:
             tk.Tk().withdraw()
             messagebox.showerror("Invalid choice", f"'{ch}' is not an option.")
+            continue
+        sync_sheets()   # publish what the action stored (no-op without the store)
+        waits.report()
+        if done:
+            messagebox.showinfo(*done)
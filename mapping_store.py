@@ -0,0 +1,86 @@
+"""
+Loads the item-name / item-ID maps from config.MAPPINGS_FILE (JSON):
+
+    {"name_map": {"alias": "Canonical Name", ...},
+     "item_id_map": {"CR-0870-J (1081787)": "Canonical Name", ...}}
+
+Reading and parsing the file is fast enough to do on every start (the
+matcher built from the aliases is compiled lazily by mappings.py). A
+running process notices edits: poll() re-stats the file at most every
+config.MAPPINGS_RELOAD_INTERVAL seconds and hands back the new maps when
+it changed.
+
+Exposes:
+    MappingStore().load() -> (name_map, item_id_map)
+    MappingStore.poll() -> (name_map, item_id_map) | None
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from . import config
+from .utils import package_path
+
+Maps = Tuple[Dict[str, Optional[str]], Dict[str, str]]
+
+
+def read_maps(path: str) -> Maps:
+    """(name_map, item_id_map) from a mappings JSON file, in file order."""
+    with open(path, encoding="utf-8") as fh:
+        doc = json.load(fh)
+    return dict(doc.get("name_map", {})), dict(doc.get("item_id_map", {}))
+
+
+class MappingStore:
+    """The mappings file at `path`, re-read by poll() when it changes."""
+
+    def __init__(self, path: str = config.MAPPINGS_FILE,
+                 interval: float = config.MAPPINGS_RELOAD_INTERVAL):
+        self.path = package_path(path)
+        self.interval = interval
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def load(self) -> Maps:
+        """The maps as the file is now."""
+        with self._lock:
+            stamp = self._file_stamp()
+            maps = read_maps(self.path)
+            self._stamp = stamp
+            self._checked_at = time.monotonic()
+            return maps
+
+    def poll(self) -> Optional[Maps]:
+        """
+        Re-read maps if the file changed since the last load, else None.
+        Cheap to call often: the file is only stat'ed once per interval.
+        A file that fails to parse (e.g. saved mid-edit) is reported and
+        the current maps are kept.
+        """
+        now = time.monotonic()
+        if self.interval < 0 or now - self._checked_at < self.interval:
+            return None
+        self._checked_at = now
+        stamp = None
+        try:
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                return None
+            maps = self.load()
+        except (OSError, ValueError) as e:
+            # don't retry (and warn again) until the file changes once more
+            if stamp is not None:
+                self._stamp = stamp
+            print(f"⚠️ Keeping current mappings; could not reload {self.path}: {e}")
+            return None
+        print(f"🔄 Reloaded mappings from {self.path}")
+        return maps
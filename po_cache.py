@@ -0,0 +1,136 @@
+"""
+On-disk cache of parsed PO detail pages, keyed by PO number.
+
+Parsed results (dates + raw line items, before name normalization) are
+stored as zlib-compressed JSON in SQLite. Payloads are content-addressed:
+each PO points at the SHA-1 of its payload, so identical pages share one
+blob and a re-parse that changes nothing doesn't rewrite anything.
+
+Entries for open POs expire after config.PO_CACHE_TTL_MINUTES (their
+remaining quantities change with every receipt); entries for "fully
+received, reconciled" POs never change and are kept for good. The age of
+every open entry served is kept in `ages` and reported.
+
+Exposes:
+    POCache(kind) – get(po) / put(po, parsed, status) / report()
+    OPEN, RECONCILED
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from . import config, instrument
+from .utils import package_path
+
+OPEN       = "open"
+RECONCILED = "reconciled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest  TEXT PRIMARY KEY,
+    data    BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pos (
+    kind        TEXT NOT NULL,
+    po          TEXT NOT NULL,
+    digest      TEXT NOT NULL REFERENCES blobs(digest),
+    status      TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    PRIMARY KEY (kind, po)
+);
+"""
+
+
+def _tuples(obj: Any) -> Any:
+    """JSON hands lists back; the scrapers work with tuples."""
+    if isinstance(obj, list):
+        return tuple(_tuples(x) for x in obj)
+    return obj
+
+
+class POCache:
+    """
+    Cache for one kind of detail page ("upcoming" or "received").
+    Disabled (always misses, stores nothing) when config.PO_CACHE_FILE
+    is empty.
+    """
+
+    def __init__(self, kind: str, path: Optional[str] = None,
+                 ttl_minutes: Optional[float] = None):
+        path = package_path(config.PO_CACHE_FILE) if path is None else path
+        ttl_minutes = config.PO_CACHE_TTL_MINUTES if ttl_minutes is None else ttl_minutes
+        self.kind = kind
+        self.ttl = ttl_minutes * 60
+        self.ages: Dict[str, float] = {}    # open PO → seconds since it was parsed
+        self.hits = 0
+        self.misses = 0
+        self.db: Optional[sqlite3.Connection] = None
+        if path:
+            self.db = sqlite3.connect(path)
+            self.db.executescript(_SCHEMA)
+
+    def __enter__(self) -> "POCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, po: str):
+        """Return the cached parse for `po`, or None (counted as a miss)."""
+        row = None
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT b.data, p.status, p.fetched_at FROM pos p "
+                "JOIN blobs b ON b.digest = p.digest WHERE p.kind = ? AND p.po = ?",
+                (self.kind, po),
+            ).fetchone()
+        if row is not None:
+            data, status, fetched_at = row
+            age = time.time() - fetched_at
+            if status == RECONCILED or age < self.ttl:
+                if status != RECONCILED:
+                    self.ages[po] = age
+                self.hits += 1
+                instrument.count("po cache hits")
+                return _tuples(json.loads(zlib.decompress(data)))
+        self.misses += 1
+        instrument.count("po cache misses")
+        return None
+
+    def put(self, po: str, parsed, status: str = OPEN) -> None:
+        if self.db is None:
+            return
+        data = json.dumps(parsed, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO blobs (digest, data) VALUES (?, ?)",
+                (digest, zlib.compress(data)),
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO pos (kind, po, digest, status, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.kind, po, digest, status, time.time()),
+            )
+
+    def report(self) -> None:
+        total = self.hits + self.misses
+        if total:
+            oldest = (f", open POs up to {max(self.ages.values()) / 60:.0f} min old"
+                      if self.ages else "")
+            print(f"🗄️  PO cache ({self.kind}): {self.hits} hits, {self.misses} misses "
+                  f"({self.hits / total:.0%} hit rate{oldest})")
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.execute(
+                "DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM pos)"
+            )
+            self.db.commit()
+            self.db.close()
+            self.db = None
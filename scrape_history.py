@@ -1,87 +1,158 @@
 """
 History scraping + trend statistics for the last 2 years.
 """
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+import json
+import re
 from calendar import month_name
 from collections import defaultdict
+from typing import Optional
+from urllib.parse import urljoin
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-
 from .browser import get_driver
-from .sheets_io import open_sheet, auto_stamp_gsheet, clear_range
-from . import config
+from .html_parse import parse_page
+from .sheets_io import open_sheet, auto_stamp_gsheet, clear_range, WriteBatch, iter_rows
+from .utils import package_path, parse_sheet_date
+from . import config, instrument, store, waits
+
+link_re = re.compile(
+    r'=HYPERLINK\("(?P<url>[^"]+)"\s*,\s*"(?P<text>[^"]+)"\)',
+    re.IGNORECASE
+)
+
+# --------------------------------------------------
+# REQUISITION GRID PARSER
+# --------------------------------------------------
+
+def window_start() -> date:
+    """First day of the HISTORY_WINDOW_DAYS window LATEST 2 YEARS keeps."""
+    return date.today() - timedelta(days=config.HISTORY_WINDOW_DAYS)
+
+
+def parse_history_grid(html: str, base_url: str = "", cutoff: Optional[date] = None):
+    """
+    Parse one page of the requisition grid into
+    ([(req_num, req_url, date_only, cost, exception), ...], done),
+    where done is True once a row dated before `cutoff` (by default the
+    start of the history window) was reached.
+    Links are made absolute against `base_url`, as the browser does.
+    """
+    if cutoff is None:
+        cutoff = window_start()
+    soup = parse_page(html, tables_only=True)
+
+    expense_rows = []
+    for tr in soup.find_all("tr"):
+        tds = tr.find_all("td", class_="GridDetail")
+        if len(tds) < 6:
+            continue
+
+        # a) parse date and stop if before the cutoff
+        full_dt = tds[2].get_text(" ", strip=True)
+        if not full_dt:
+            continue
+        date_only = full_dt.split()[0]
+        try:
+            dt = datetime.strptime(date_only, "%m/%d/%Y").date()
+        except Exception:
+            continue
+        if dt < cutoff:
+            return expense_rows, True
+
+        # b) only “Fully Received”
+        if tds[3].get_text(" ", strip=True) != "Fully Received":
+            continue
+
+        # c) extract Request # link
+        link = tds[1].find("a")
+        if link is None:
+            continue
+        req_num = link.get_text(" ", strip=True)
+        req_url = urljoin(base_url, link.get("href", ""))
+
+        # d) extract total, strip "$" and commas
+        raw_cost = tds[5].get_text(" ", strip=True)
+        cost     = raw_cost.replace("$", "").replace(",", "")
+
+        # e) extract Request Title and check for Exception
+        req_title = tds[4].get_text(" ", strip=True)
+        is_main = (
+            "Main Location GM (Store 001)" in req_title or
+            "Main Location Support (Store 001)" in req_title
+        )
+        exception = "—"
+        if not is_main:
+            exception = "✅"
+
+        expense_rows.append((req_num, req_url, date_only, cost, exception))
+
+    return expense_rows, False
 
 # --------------------------------------------------
 # MONTHLY EXPENSE BUCKETER
 # --------------------------------------------------
 
-def process_data_from_2024():
-    driver = get_driver()
-    wait   = WebDriverWait(driver, 15)
+def _stored_requisitions(ws):
+    """
+    Read what LATEST 2 YEARS already holds:
+    {req_num: (sheet_row, req_url, date, cost, exception)}.
+    """
+    stored = {}
+    for offset, row in enumerate(iter_rows(ws, "B", "E", value_render_option="FORMULA")):
+        if len(row) < 2:
+            continue
+        row = row + [""] * (4 - len(row))
+        m = link_re.match(str(row[0]))
+        dt = parse_sheet_date(row[1])
+        if not m or dt is None:
+            continue
+        try:
+            cost = float(str(row[2]).replace(",", ""))
+        except ValueError:
+            cost = None
+        stored[m.group("text")] = (11 + offset, m.group("url"), dt.date(), cost, row[3])
+    return stored
 
-    wait = WebDriverWait(driver, 15)
-    el = wait.until(EC.element_to_be_clickable((By.ID, "linkpitmenu_section_15")))
-    el.click()
-    wait = WebDriverWait(driver, 15)
-    el = wait.until(EC.element_to_be_clickable((By.ID, "linkpitmenu_item_160")))
-    el.click()
 
-    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "td.GridDetail")))
+def _same_requisition(stored, scraped) -> bool:
+    _, _, s_dt, s_cost, s_exc = stored
+    _, _, date_only, cost, exception = scraped
+    try:
+        cost = float(cost)
+    except ValueError:
+        return False
+    return (
+        s_dt == datetime.strptime(date_only, "%m/%d/%Y").date()
+        and s_cost is not None and abs(s_cost - cost) < 0.005
+        and s_exc == exception
+    )
+
+
+def _crawl_grid(driver, stop_at: date) -> list:
+    """Open My Requisitions and page through the grid back to stop_at."""
+    grid = EC.presence_of_element_located((By.CSS_SELECTOR, "td.GridDetail"))
+    with instrument.span("list navigation"):
+        el = waits.until(driver, EC.element_to_be_clickable((By.ID, "linkpitmenu_section_15")),
+                         "requisitions menu")
+        el.click()
+        el = waits.until(driver, EC.element_to_be_clickable((By.ID, "linkpitmenu_item_160")),
+                         "my requisitions")
+        el.click()
+
+        waits.until(driver, grid, "requisition grid")
 
     expense_rows = []
-    done = False
 
     while True:
-        all_rows = driver.find_elements(By.XPATH, "//tr")
-        for tr in all_rows:
-            tds = tr.find_elements(By.CSS_SELECTOR, "td.GridDetail")
-            if len(tds) < 6:
-                continue
-
-            # a) parse date and stop if before 2023
-            full_dt = tds[2].text.strip()
-            if not full_dt:
-                continue
-            date_only = full_dt.split()[0]
-            try:
-                dt = datetime.strptime(date_only, "%m/%d/%Y").date()
-            except Exception:
-                continue
-            if dt.year < 2024:
-                done = True
-                break
-
-            # b) only “Fully Received”
-            if tds[3].text.strip() != "Fully Received":
-                continue
-
-            # c) extract Request # link
-            link_els = tds[1].find_elements(By.TAG_NAME, "a")
-            if not link_els:
-                continue
-            req_num = link_els[0].text.strip()
-            req_url = link_els[0].get_attribute("href")
-
-            # d) extract total, strip "$" and commas
-            raw_cost = tds[5].text.strip()
-            cost     = raw_cost.replace("$", "").replace(",", "")
-
-            # e) extract Request Title and check for Exception
-            req_title = tds[4].text.strip()
-            is_main = (
-                "Main Location GM (Store 001)" in req_title or
-                "Main Location Support (Store 001)" in req_title
-            )
-            exception = "—" 
-            if not is_main:
-                exception = "✅"
-
-            expense_rows.append((req_num, req_url, date_only, cost, exception))
+        # One round trip per page: grab the HTML and parse it locally
+        with instrument.span("grid page"):
+            html, url = driver.page_source, driver.current_url
+        rows, done = parse_history_grid(html, url, stop_at)
+        expense_rows.extend(rows)
+        instrument.count("grid pages")
 
         if done:
             break
@@ -91,47 +162,153 @@ def process_data_from_2024():
             nxt = driver.find_element(By.CSS_SELECTOR, "input.GridDetailSubmit[name='next']")
             if not nxt.is_enabled():
                 break
-            nxt.click()
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "td.GridDetail")))
+            with instrument.span("list navigation"):
+                nxt.click()
+                # the old grid must go away before its HTML is read again
+                waits.until(driver, EC.staleness_of(nxt), "grid next page")
+                waits.until(driver, grid, "requisition grid")
         except NoSuchElementException:
             break
 
-    driver.quit()
+    return expense_rows
+
 
-    # 4) Push into Google Sheets
-    scope = ["https://spreadsheets.google.com/feeds","https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_name(config.CREDS_FILE, scope)
-    gc    = gspread.authorize(creds)
-    sh    = gc.open_by_key(config.SHEET_ID)
+def _last_full_crawl() -> Optional[date]:
+    try:
+        with open(package_path(config.HISTORY_STATE_FILE), encoding="utf-8") as fh:
+            return date.fromisoformat(json.load(fh)["last_full_crawl"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
+
+def _save_full_crawl(day: date) -> None:
+    path = package_path(config.HISTORY_STATE_FILE)
+    if not path:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"last_full_crawl": day.isoformat()}, fh)
+    except OSError as e:
+        print(f"⚠️ Could not save {path}: {e}")
+
+
+@instrument.workflow("history")
+def process_data_from_2024(driver=None, full: Optional[bool] = None):
+    """
+    Crawl fully received requisitions into LATEST 2 YEARS, incrementally.
+
+    The newest requisition already in the sheet is the high-water mark:
+    paging stops once rows are older than it (minus HISTORY_OVERLAP_DAYS,
+    to catch requisitions that were received late) and the crawled rows
+    are merged into the stored ones. The grid is dated by creation, so a
+    requisition received later than that is only found by a full crawl
+    of the window: with full=True, and by default whenever the last one
+    is HISTORY_FULL_CRAWL_DAYS old – such a row shows up at most that
+    many days late. A full crawl replaces the stored rows outright, so
+    requisitions no longer "Fully Received" drop out too.
+
+    The tab is kept newest first and written through a diff batch, so
+    only the cells that moved or changed are sent.
+
+    With the local store on, the high-water mark comes from the store,
+    the merge happens there, and the sheet sync rewrites the tab from it
+    (newest first).
+    """
     ws_name = "LATEST 2 YEARS"
+    header = ["Request #", "Date", "Total", "Exception"]
+    cutoff = window_start()
+    if store.enabled():
+        with store.Store() as db:
+            stored = db.requisitions()
+    else:
+        ws = open_sheet(ws_name, create_header=header)
+        stored = _stored_requisitions(ws)
+    if full is None:
+        last = _last_full_crawl()
+        full = last is None or (date.today() - last).days >= config.HISTORY_FULL_CRAWL_DAYS
+    stop_at = cutoff
+    if full:
+        print(f"🔁 Full crawl of {ws_name} back to {cutoff:%m/%d/%Y} "
+              f"(picks up requisitions received late).")
+    elif stored:
+        hwm_req, hwm = max(stored.items(), key=lambda kv: (kv[1][2], kv[0]))
+        hwm_date = hwm[2]
+        stop_at = max(cutoff, hwm_date - timedelta(days=config.HISTORY_OVERLAP_DAYS))
+        print(f"⏩ {ws_name} holds {len(stored)} requisitions up to #{hwm_req} "
+              f"({hwm_date:%m/%d/%Y}); crawling back to {stop_at:%m/%d/%Y}.")
+
+    own_driver = driver is None
+    if own_driver:
+        driver = get_driver()
     try:
-        ws = sh.worksheet(ws_name)
-    except gspread.exceptions.WorksheetNotFound:
-        ws = sh.add_worksheet(ws_name, rows="1000", cols="5")
-        ws.append_row(["Request #", "Date", "Total", "Exception"], value_input_option="USER_ENTERED")
-
-    clear_range(ws, "B11:H1000")
-
-    data = [
-        [f'=HYPERLINK("{url}","{req}")', date, cost, exception]
-        for req, url, date, cost, exception in expense_rows
-    ]
-    if data:
-        ws.update(values=data, range_name="B11", value_input_option="USER_ENTERED")
-        print(f"✅ {ws_name} updated ({len(data)} rows).")
+        expense_rows = _crawl_grid(driver, stop_at)
+    finally:
+        if own_driver:
+            driver.quit()
+
+    # 4) Merge into what the sheet already has
+    new_rows, changed = [], []
+    for row in expense_rows:
+        req = row[0]
+        if req not in stored:
+            new_rows.append(row)
+        elif not _same_requisition(stored[req], row):
+            changed.append(row)
+    crawled = {row[0] for row in expense_rows}
+    if full:
+        dropped = [req for req in stored if req not in crawled]
     else:
-        print("⚠️ No fully‐received requisitions from 2024 onward found.")
-    auto_stamp_gsheet(ws)
+        dropped = [req for req, rec in stored.items() if rec[2] < cutoff]
+
+    def _cells(req, url, date_str, cost, exception):
+        return [f'=HYPERLINK("{url}","{req}")', date_str, cost, exception]
+
+    summary = (f"{len(new_rows)} new, {len(changed)} updated, {len(dropped)} dropped "
+               f"(older than {cutoff:%m/%d/%Y}"
+               f"{' or no longer fully received' if full else ''})")
+
+    if store.enabled():
+        with store.Store() as db:
+            if full:
+                db.replace_requisitions(expense_rows)
+            else:
+                db.upsert_requisitions(new_rows + changed)
+                db.drop_requisitions_before(cutoff)
+            data = [_cells(*r) for r in db.requisition_rows()]
+            db.set_table(ws_name, "B11", data, clear="B11:H", create_header=header)
+        print(f"✅ Stored {summary}; {ws_name} is updated by the sheet sync.")
+        if full:
+            _save_full_crawl(date.today())
+        return
 
-def write_weekly_by_month_table():
-    # 1) Auth & open
-    ws_exp = open_sheet("LATEST 2 YEARS")
-    raw    = ws_exp.get("C11:E1000")  # Now includes exception column
+    # 5) Newest first; a diff batch sends only the cells that differ, so new
+    #    rows on top shift the block down by value in the same request
+    merged = {} if full else {
+        req: (req, url, dt.strftime("%m/%d/%Y"), "" if cost is None else f"{cost:.2f}", exc)
+        for req, (_, url, dt, cost, exc) in stored.items()
+        if dt >= cutoff
+    }
+    for row in expense_rows:
+        merged[row[0]] = row
+    data = sorted(merged.values(),
+                  key=lambda r: (datetime.strptime(r[2], "%m/%d/%Y"), r[0]), reverse=True)
+
+    batch = WriteBatch(diff=True)
+    clear_range(ws, "B11:H", batch)
+    batch.update(ws, "B11", [_cells(*r) for r in data])
+    if new_rows or changed or dropped:
+        print(f"✅ {ws_name}: {len(data)} rows; {summary}.")
+    else:
+        print(f"✅ {ws_name} already up to date.")
+    auto_stamp_gsheet(ws, batch=batch)
+    batch.flush()
+    if full:
+        _save_full_crawl(date.today())
 
-    # 2) Sum daily totals, split into normal vs exception
-    daily_normal = defaultdict(float)
-    daily_exception = defaultdict(float)
+
+def _sheet_amounts(ws_exp):
+    """(date, cost, exception) for every usable LATEST 2 YEARS row."""
+    raw    = iter_rows(ws_exp, "C", "E")  # Now includes exception column
     for row in raw:
         if len(row) < 2:
             continue
@@ -144,7 +321,22 @@ def write_weekly_by_month_table():
             amt = float(cost_str)
         except Exception:
             continue
+        yield dt, amt, exception
+
 
+@instrument.workflow("trend")
+def write_weekly_by_month_table():
+    # 1) Requisition totals: from the local store, or read back from the sheet
+    daily_normal = defaultdict(float)
+    daily_exception = defaultdict(float)
+    if store.enabled():
+        with store.Store() as db:
+            amounts = list(db.requisition_amounts())
+    else:
+        amounts = _sheet_amounts(open_sheet("LATEST 2 YEARS"))
+
+    # 2) Sum daily totals, split into normal vs exception
+    for dt, amt, exception in amounts:
         if exception == "✅":
             daily_exception[dt] += amt
         else:
@@ -182,11 +374,17 @@ def write_weekly_by_month_table():
         row.append(round(exception_amt, 2) if exception_amt else "")
         rows.append(row)
 
-    # 5) Write to TREND GRAPH at B11
+    # 5) Write to TREND GRAPH at B11 (with the store: at the sheet sync)
+    if store.enabled():
+        with store.Store() as db:
+            db.set_table("TREND GRAPH", "B11", [header] + rows, clear="B11:H")
+        print("✅ TREND GRAPH table computed (written by the sheet sync).")
+        return
     ws = open_sheet("TREND GRAPH")
-    clear_range(ws, "B11:H1000")
-    ws.update(values=[header], range_name="B11")
-    ws.update(values=rows, range_name="B12")
-    auto_stamp_gsheet(ws)
+    with WriteBatch(diff=True) as batch:
+        clear_range(ws, "B11:H", batch)
+        batch.update(ws, "B11", [header])
+        batch.update(ws, "B12", rows)
+        auto_stamp_gsheet(ws, batch=batch)
 
     print("✅ TREND GRAPH updated with weekly-by-month table and one exception column per month.")
\ No newline at end of file
@@ -1,112 +1,155 @@
 from datetime import datetime, timedelta
 from math import ceil
 from statistics import median
+from typing import Dict, List
 import re
 
-from .sheets_io import open_sheet, auto_stamp_gsheet, clear_range
-from . import mappings
-from .utils import get_last_order_date, order_frequency_median
+from .sheets_io import open_sheet, auto_stamp_gsheet, clear_range, WriteBatch, iter_rows
+from . import config, instrument, mappings, store
+from .summary_state import SummaryState
+from .utils import (DateSeries, get_last_order_date, order_frequency_median,
+                    order_frequency_parts, order_frequency_text)
 
+link_re = re.compile(
+    r'=HYPERLINK\("(?P<url>[^"]+)"\s*,\s*"(?P<text>[^"]+)"\)',
+    re.IGNORECASE
+)
 
-def process_item_summary():
+# CAME IN is loaded column-wise; row i of the table is column[i] of each
+COLUMNS = ("item_id", "url", "name", "date", "qty", "days", "price")
+
+HEADERS = [
+    "Item ID",
+    "Description",
+    "Delivery\nDays",
+    "Qty Per Order",
+    "Lasts For",
+    "Avg\nQty Monthly",
+    "Monthly Cost",
+    "Ordered Often?",
+    "Last Ordered",
+]
+
+
+# --------------------------------------------------
+# LOAD
+# --------------------------------------------------
+
+def _cell_date(cell):
+    if isinstance(cell, (int, float)):
+        return datetime(1899, 12, 30) + timedelta(days=int(cell))
+    try:
+        return datetime.strptime(str(cell), "%m/%d/%Y")
+    except ValueError:
+        return None
+
+
+def parse_came_in_row(row):
     """
-    Compute per-item stats from CAME IN and WAITING ON and push
-    a consolidated summary into ITEM SUMMARY (B11:J).
+    One CAME IN row (B→I, FORMULA render) → (item_id, url, raw_desc,
+    date, qty, days, price), with days/price None when blank; None if the
+    row has no item link or order date.
     """
+    if len(row) < 8:
+        row = row + [""] * (8 - len(row))
 
-    link_re = re.compile(
-        r'=HYPERLINK\("(?P<url>[^"]+)"\s*,\s*"(?P<text>[^"]+)"\)',
-        re.IGNORECASE
+    # B→I: PO#, Order Date, Received Date, Arrived In,
+    #      Item ID (HYPERLINK), Description, Qty, Price Per Unit
+    order_cell, _, ai_cell, link_formula, raw_desc, qty_cell, price_cell = (
+        row[1], row[2], row[3], row[4], row[5], row[6], row[7]
     )
 
-    def _pending_order_dates_from_waiting_on():
-        """Returns {item_id: [datetime,...]} from WAITING ON."""
-        ws = open_sheet("WAITING ON")
-        rows = ws.get("B11:D1000", value_render_option="FORMULA")
-        pending = {}
-        for r in rows:
-            if len(r) < 3:
-                continue
-            order_cell   = r[1]      # C
-            link_formula = r[2]      # D
-            m = link_re.match(link_formula or "")
-            if not m:
-                continue
-            item_id = m.group("text")
+    m = link_re.match(link_formula or "")
+    if not m:
+        return None
+    url, item_id = m.group("url"), m.group("text")
 
-            if isinstance(order_cell, (int, float)):
-                dt = datetime(1899, 12, 30) + timedelta(days=int(order_cell))
-            else:
-                try:
-                    dt = datetime.strptime(str(order_cell), "%m/%d/%Y")
-                except ValueError:
-                    continue
+    try:
+        qty = int(float(qty_cell))
+    except Exception:
+        qty = 0
 
-            pending.setdefault(item_id, []).append(dt)
-        return pending
+    try:
+        price_per_unit = float(price_cell)
+    except Exception:
+        price_per_unit = None
 
-    # 1) Open sheets
-    came    = open_sheet("CAME IN")
-    summary = open_sheet("ITEM SUMMARY")
+    dt = _cell_date(order_cell)
+    if dt is None:
+        return None
 
-    # 2) Clear old output
-    clear_range(summary, "B11:J1000")
+    days = None
+    if ai_cell:
+        m2 = re.match(r"(\d+)", str(ai_cell))
+        if m2:
+            days = int(m2.group(1))
 
-    # 3) Fetch B→I with formulas from CAME IN (keeps HYPERLINKs)
-    raw = came.get("B11:I1000", value_render_option="FORMULA")
-    print(f"⚙️  Fetched {len(raw)} rows from CAME IN")
+    return item_id, url, raw_desc or "", dt, qty, days, price_per_unit
 
-    stats = {}
-    for row in raw:
-        if len(row) < 8:
-            row += [""] * (8 - len(row))
-
-        # B→I: PO#, Order Date, Received Date, Arrived In,
-        #      Item ID (HYPERLINK), Description, Qty, Price Per Unit
-        order_cell, _, ai_cell, link_formula, raw_desc, qty_cell, price_cell = (
-            row[1], row[2], row[3], row[4], row[5], row[6], row[7]
-        )
 
-        m = link_re.match(link_formula or "")
-        if not m:
+def load_came_in(ws) -> Dict[str, list]:
+    """
+    CAME IN as columns, one entry per usable line: item_id, url, name,
+    date (datetime), qty (int), days and price (None when blank).
+    """
+    cols = {c: [] for c in COLUMNS}
+    fetched = 0
+    for row in iter_rows(ws, "B", "I", value_render_option="FORMULA"):
+        fetched += 1
+        line = parse_came_in_row(row)
+        if line is None:
             continue
-        url, item_id = m.group("url"), m.group("text")
+        item_id, url, raw_desc, dt, qty, days, price = line
+        cols["item_id"].append(item_id)
+        cols["url"].append(url)
+        cols["name"].append(mappings.clean_name(raw_desc, item_id))
+        cols["date"].append(dt)
+        cols["qty"].append(qty)
+        cols["days"].append(days)
+        cols["price"].append(price)
 
-        try:
-            qty = int(float(qty_cell))
-        except Exception:
-            qty = 0
+    print(f"⚙️  Fetched {fetched} rows from CAME IN")
+    return cols
 
-        try:
-            price_per_unit = float(price_cell)
-        except Exception:
-            price_per_unit = None
-
-        if isinstance(order_cell, (int, float)):
-            dt = datetime(1899, 12, 30) + timedelta(days=int(order_cell))
-        else:
-            try:
-                dt = datetime.strptime(str(order_cell), "%m/%d/%Y")
-            except ValueError:
-                continue
 
-        days = None
-        if ai_cell:
-            m2 = re.match(r"(\d+)", str(ai_cell))
-            if m2:
-                days = int(m2.group(1))
+def load_pending(ws) -> Dict[str, List[datetime]]:
+    """Returns {item_id: [datetime,...]} from WAITING ON."""
+    pending = {}
+    for r in iter_rows(ws, "B", "D", value_render_option="FORMULA"):
+        if len(r) < 3:
+            continue
+        order_cell   = r[1]      # C
+        link_formula = r[2]      # D
+        m = link_re.match(link_formula or "")
+        if not m:
+            continue
+        dt = _cell_date(order_cell)
+        if dt is None:
+            continue
+        pending.setdefault(m.group("text"), []).append(dt)
+    return pending
+
 
-        desc_trunc = mappings.truncate_desc(raw_desc or "")
-        name = mappings.normalize_name(desc_trunc, item_id)
+# --------------------------------------------------
+# COMPUTE
+# --------------------------------------------------
 
+def compute_rows(cols: Dict[str, list], pending: Dict[str, List[datetime]],
+                 today=None) -> List[list]:
+    """
+    One ITEM SUMMARY row per item, in order of first appearance in
+    CAME IN. Pending (WAITING ON) dates count towards order frequency
+    and last-ordered, not towards the month span.
+    """
+    stats = {}
+    for item_id, url, name, dt, qty, days, price_per_unit in zip(*(cols[c] for c in COLUMNS)):
         rec = stats.setdefault(item_id, {
             "url":           url,
             "name":          name,
             "sum_qty":       0,
             "count":         0,
             "qtys":          [],
-            "dates":         [],
-            "months":        set(),
+            "dates":         DateSeries(),   # sorted, with running gaps and months
             "min_dt":        dt,
             "max_dt":        dt,
             "delivery_days": [],
@@ -116,8 +159,7 @@ def process_item_summary():
         rec["sum_qty"] += qty
         rec["count"]   += 1
         rec["qtys"].append(qty)
-        rec["dates"].append(dt)
-        rec["months"].add((dt.year, dt.month))
+        rec["dates"].add(dt)
         rec["min_dt"]  = min(rec["min_dt"], dt)
         rec["max_dt"]  = max(rec["max_dt"], dt)
         if days is not None:
@@ -127,15 +169,12 @@ def process_item_summary():
 
     print(f"⚙️  Aggregated stats for {len(stats)} unique items")
 
-    pending_map = _pending_order_dates_from_waiting_on()
-    for item_id, pend_dates in pending_map.items():
+    for item_id, pend_dates in pending.items():
         if item_id not in stats:
             continue
-        rec = stats[item_id]
+        dates = stats[item_id]["dates"]
         for dt in pend_dates:
-            if dt not in rec["dates"]:
-                rec["dates"].append(dt)
-                rec["months"].add((dt.year, dt.month))
+            dates.add_unique(dt)
 
     out = []
     for item_id, info in stats.items():
@@ -153,17 +192,15 @@ def process_item_summary():
         price_per_unit      = median(info["prices"]) if info["prices"] else 0.0
         mdn_cost_per_month  = price_per_unit * avg_per_month
 
-        dates_sorted = sorted(info["dates"])
-        gaps = [(dates_sorted[i+1] - dates_sorted[i]).days for i in range(len(dates_sorted)-1)]
-        med_gap    = median(gaps) if gaps else float("inf")
-        freq_ratio = len(info["months"]) / span_months if span_months else 0
+        med_gap    = info["dates"].median_gap()
+        freq_ratio = len(info["dates"].months) / span_months if span_months else 0
         badge = ""
         if info["count"] > 1 and span_months > 2:
             if freq_ratio >= 0.80 or med_gap <= 45:
                 badge = "✅"
 
         last_order = get_last_order_date(info["dates"])
-        order_freq = order_frequency_median(info["dates"], badge)
+        order_freq = order_frequency_median(info["dates"], badge, today)
 
         out.append([
             f'=HYPERLINK("{info["url"]}","{item_id}")',
@@ -176,34 +213,145 @@ def process_item_summary():
             badge,
             last_order,
         ])
+    return out
 
+
+def _engine():
+    """compute_rows for config.ITEM_SUMMARY_ENGINE ("python" or "numpy")."""
+    if config.ITEM_SUMMARY_ENGINE == "numpy":
+        try:
+            from .item_summary_np import compute_rows as compute_rows_np
+            return compute_rows_np
+        except ImportError:
+            print("⚠️ NumPy not installed; using the Python item-summary engine.")
+    return compute_rows
+
+
+def sort_rows(out: List[list]) -> List[list]:
     # sort: ✅ first, then Monthly Cost desc (col 6)
     out.sort(key=lambda row: (row[7] == "✅", float(row[6] or 0.0)), reverse=True)
+    return out
+
+
+def update_rows(state: SummaryState, touched) -> List[list]:
+    """
+    Recompute the rows of the touched items, refresh the rest, and return
+    every item's row in first-appearance order (unsorted).
+    """
+    today = datetime.now().date()
+    touched = [item_id for item_id in state.items if item_id in touched]
+    if touched:
+        pending = {i: list(state.pending[i]) for i in touched if i in state.pending}
+        fresh = _engine()(state.columns(touched, mappings.clean_name), pending, today)
+        for item_id, row in zip(touched, fresh):
+            state.rows[item_id] = row
+            state.freq_parts[item_id] = order_frequency_parts(state.all_dates(item_id))
+
+    out = []
+    for item_id, rec in state.items.items():
+        row = list(state.rows[item_id])
+        # names follow mapping edits; "N days ago" follows the calendar
+        row[1] = mappings.clean_name(rec.raw_desc, item_id)
+        row[4] = order_frequency_text(state.freq_parts[item_id], row[7], today)
+        out.append(row)
+    return out
+
+
+# --------------------------------------------------
+# WRITE
+# --------------------------------------------------
+
+def write_summary(summary, out: List[list]) -> None:
+    # Clear old output and write the new table in one request (changed cells only)
+    with WriteBatch(diff=True) as batch:
+        clear_range(summary, "B11:J", batch)
+        batch.update(summary, "B10:J10", [HEADERS])
+        auto_stamp_gsheet(summary, batch=batch)
+        batch.update(summary, "B11", out)
+
+
+def write_changed_rows(summary, old: List[list], new: List[list]) -> int:
+    """
+    Rewrite only the rows of the table at B11 that differ from what was
+    written last time (runs of changed rows go out as one range), and
+    clear rows left over if the table shrank. Returns rows written.
+    """
+    written = 0
+    with WriteBatch() as batch:
+        batch.update(summary, "B10:J10", [HEADERS])
+        auto_stamp_gsheet(summary, batch=batch)
+        i = 0
+        while i < len(new):
+            if i < len(old) and old[i] == new[i]:
+                i += 1
+                continue
+            j = i
+            while j < len(new) and (j >= len(old) or old[j] != new[j]):
+                j += 1
+            batch.update(summary, f"B{11 + i}:J{10 + j}", new[i:j])
+            written += j - i
+            i = j
+        if len(old) > len(new):
+            clear_range(summary, f"B{11 + len(new)}:J{10 + len(old)}", batch)
+    return written
 
-    headers = [
-        "Item ID",
-        "Description",
-        "Delivery\nDays",
-        "Qty Per Order",
-        "Lasts For",
-        "Avg\nQty Monthly",
-        "Monthly Cost",
-        "Ordered Often?",
-        "Last Ordered",
-    ]
-    summary.update(
-        range_name="B10:J10",
-        values=[headers],
-        value_input_option="USER_ENTERED",
+
+@instrument.workflow("item summary")
+def process_item_summary(full: bool = False):
+    """
+    Compute per-item stats from CAME IN and WAITING ON and push
+    a consolidated summary into ITEM SUMMARY (B11:J).
+
+    Only CAME IN rows appended since the last run are read and only the
+    items they (or changed pending dates) touch are recomputed; see
+    summary_state.py. full=True – or a saved state that no longer matches
+    CAME IN – recomputes every item and rewrites the whole table.
+
+    With the local store on, every item is computed from the store's
+    received and open PO lines (no Sheets reads) and the table is written
+    by the final sheet sync.
+    """
+    if store.enabled():
+        with store.Store() as db:
+            cols, pending = db.came_in_columns(mappings.clean_name), db.pending_dates()
+            print(f"⚙️  Read {len(cols['item_id'])} received lines from the local store")
+            out = sort_rows(_engine()(cols, pending, datetime.now().date()))
+            db.set_table("ITEM SUMMARY", "B10", [HEADERS] + out, clear="B11:J")
+        print(f"✅ ITEM SUMMARY computed ({len(out)} items; written by the sheet sync).")
+        mappings.report_cache_stats()
+        return
+
+    came    = open_sheet("CAME IN")
+    summary = open_sheet("ITEM SUMMARY")
+
+    state = None if full else SummaryState.load()
+    if state is not None and not state.matches(came):
+        print("⚠️ CAME IN changed above the last row read; rebuilding ITEM SUMMARY.")
+        state = None
+    rebuild = state is None
+    if rebuild:
+        state = SummaryState()
+
+    first_row = state.next_row
+    touched = state.read_rows(
+        iter_rows(came, "B", "I", start_row=first_row, value_render_option="FORMULA"),
+        parse_came_in_row,
     )
-    auto_stamp_gsheet(summary)
+    print(f"⚙️  Fetched {state.next_row - first_row} rows from CAME IN")
+    touched |= state.set_pending(load_pending(open_sheet("WAITING ON")))
+
+    out = sort_rows(update_rows(state, touched))
+    if rebuild:
+        write_summary(summary, out)
+        written = len(out)
+    else:
+        written = write_changed_rows(summary, state.written, out)
+    state.written = out
+    state.save()
 
     if out:
-        summary.update(
-            range_name="B11",
-            values=out,
-            value_input_option="USER_ENTERED",
-        )
-        print(f"✅ ITEM SUMMARY updated ({len(out)} items).")
+        print(f"✅ ITEM SUMMARY updated ({len(out)} items; {len(touched)} recomputed, "
+              f"{written} rows written).")
     else:
         print("⚠️ No valid rows found to populate ITEM SUMMARY.")
+    mappings.report_cache_stats()
@@ -2,24 +2,24 @@
 Scraping logic for fully received purchase orders.
 
 Exposes:
-    process_received_orders(driver) -> list[list[Any]]
+    parse_received_detail(html) -> (order_date, received_date, items)
+    iter_received_rows(driver, todo, cutoff) -> iterator of (po, rows)
+    process_received_orders(driver=None)
 """
 from __future__ import annotations
-from typing import Any, List
-import time, re
+from typing import Any, Iterator, List, Tuple
+import re
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-from . import config, mappings
-from .browser import go_home
+from . import config, instrument, mappings, store, waits
 
 from datetime import datetime, timedelta
 
-from selenium.common.exceptions import NoSuchElementException
-
 from .browser import get_driver
-from .sheets_io import open_sheet, auto_stamp_gsheet
+from .detail_fetch import imap_detail_pages
+from .html_parse import DetailPage
+from .po_cache import POCache, RECONCILED
+from .sheets_io import open_sheet, auto_stamp_gsheet, iter_rows, next_free_row, RowAppender
 
 
 # --------------------------------------------------
@@ -28,11 +28,10 @@ from .sheets_io import open_sheet, auto_stamp_gsheet
 
 def get_existing_pos_and_latest_date():
     ws_g = open_sheet("CAME IN")
-    data = ws_g.get("B11:L1000")
 
     existing_pos = set()
     latest_date = None
-    for row in data:
+    for row in iter_rows(ws_g, "B", "L"):
         if len(row) >= 1 and row[0]:
             # Try to extract from HYPERLINK formula
             m = re.search(r'HYPERLINK\(".*?","([^"]+)"\)', str(row[0]))
@@ -52,52 +51,101 @@ def get_existing_pos_and_latest_date():
 
     return existing_pos, latest_date
 
-def process_received_orders() -> list[list[Any]]:
-    print("📦 Scraping received orders via PO Search…")
-    driver = get_driver()
-    wait = WebDriverWait(driver, 15)
-
-    # Rolling window: last 24 months for CAME IN (tiny patch)
-    cutoff_date = datetime.now() - timedelta(days=730)
-
-    # 1) Get existing PO numbers and latest date from the sheet
-    ws_g = open_sheet("CAME IN")
-    old_data = ws_g.get("B11:L1000")
+def parse_received_detail(html: str):
+    """
+    Parse a received PO detail page into (order_date, received_date, items),
+    where items are (item_id, item_url, raw_desc, qty_received, price_per_unit).
+    """
+    page = DetailPage(html)
+
+    od_text = page.disp("PODatePlaced") or ""
+    rd_text = page.disp("DateComplete") or ""
+
+    invoice = any("CAD-Invoice" in text for text in page.headers.values())
+    if not invoice:
+        # a header without a col-N id isn't in page.headers: scan them all
+        invoice = any("CAD-Invoice" in td.get_text()
+                      for td in page.tables.find_all("td", class_="SecHeader"))
+    received_col = 12 if invoice else 11
+
+    items = []
+    rows = page.rows
+    idx = 1
+    while True:
+        cells = rows.get(idx, {})
+        idx += 1
+        idf = cells.get(1)
+        if not idf:
+            break
+
+        rf = cells.get(received_col)
+        if not rf:
+            continue
 
-    existing_pos, latest_date_in_sheet = get_existing_pos_and_latest_date()
+        # Extract quantity as before
+        try:
+            qty_rec = int(float(rf.get_text(strip=True).replace(",", "")))
+        except ValueError:
+            continue
 
-    # 2) Navigate to received POs
-    el = wait.until(EC.element_to_be_clickable((By.ID, "linkpitmenu_section_20")))
+        iid      = idf.get_text(strip=True)
+        iurl     = f"{config.BASE_PO_DOMAIN}" + idf.find("a")["href"]
+        desc_td  = cells.get(2)
+        raw_desc = desc_td.get_text(strip=True) if desc_td else ""
+
+        # --- Extract Price Per Unit for THIS row (if present) ---
+        price_per_unit = ""
+        cost_td = cells.get(4)
+        if cost_td:
+            price_div = cost_td.find("div", id="InvoiceCostOC_DISP")
+            if price_div:
+                try:
+                    price_per_unit = f"{float(price_div.get_text(strip=True)):0.2f}"
+                except Exception:
+                    price_per_unit = price_div.get_text(strip=True)
+
+        items.append((iid, iurl, raw_desc, qty_rec, price_per_unit))
+
+    return od_text, rd_text, items
+
+def _search_received_pos(driver, existing_pos, cutoff_date):
+    """
+    Open the fully received POs in PO Search and return [(po, url)] for
+    the ones inside the window that aren't in the sheet yet, newest first.
+    """
+    el = waits.until(driver, EC.element_to_be_clickable((By.ID, "linkpitmenu_section_20")),
+                     "purchase orders menu")
     el.click()
-    el = wait.until(EC.element_to_be_clickable((By.ID, "linkpitmenu_item_230")))
+    el = waits.until(driver, EC.element_to_be_clickable((By.ID, "linkpitmenu_item_230")),
+                     "PO search")
     el.click()
 
     # Status dropdown
-    status_span = wait.until(EC.element_to_be_clickable(
+    status_span = waits.until(driver, EC.element_to_be_clickable(
         (By.XPATH, "//span[starts-with(@id,'select2-POStatusID') and contains(@class,'selection__rendered')]")
-    ))
+    ), "status dropdown")
     status_span.click()
 
     # Wait for dropdown option
-    received_option = wait.until(EC.element_to_be_clickable(
+    received_option = waits.until(driver, EC.element_to_be_clickable(
         (By.XPATH, "//li[contains(@class,'select2-results__option') and normalize-space(.)='fully received, reconciled']")
-    ))
+    ), "status option")
     received_option.click()
 
     # Wait for and click the Search POs button
-    search_btn = wait.until(EC.element_to_be_clickable(
+    search_btn = waits.until(driver, EC.element_to_be_clickable(
         (By.XPATH, "//input[@type='submit' and @value='Search POs']")
-    ))
+    ), "search button")
     search_btn.click()
 
     # Wait for results table to load
-    wait.until(EC.presence_of_element_located(
+    waits.until(driver, EC.presence_of_element_located(
         (By.XPATH, f"//td/a[contains(text(),'{config.SITE_CODE}')]")
-    ))
+    ), "PO search results")
 
     po_links = driver.find_elements(By.XPATH, f"//td/a[contains(text(),'{config.SITE_CODE}')]")
-    new_rows = []
     seen = set()
+    todo = []
 
     for link in po_links:
         td = link.find_element(By.XPATH, "./parent::td")
@@ -122,135 +170,155 @@ def process_received_orders() -> list[list[Any]]:
             print(f"⏩ Skipping duplicate PO {po} (already in sheet or this run)")
             continue
         seen.add(po)
+        todo.append((po, link.get_attribute("href")))
 
-        url = link.get_attribute("href")
-        driver.execute_script("window.open(arguments[0]);", url)
-        driver.switch_to.window(driver.window_handles[1])
-
-        # Wait for PO detail page to load
-        wait.until(EC.visibility_of_element_located((By.ID, "PODatePlaced_DISP")))
+    return todo
 
-        od_text = driver.find_element(By.ID, "PODatePlaced_DISP").text.strip()
-        rd_text = driver.find_element(By.ID, "DateComplete_DISP").text.strip()
-        fmt = "%m/%d/%Y"
 
-        try:
-            rd_date = datetime.strptime(rd_text, fmt)
-            # tiny patch: rolling window instead of year==2025
-            if rd_date < cutoff_date:
-                print(f"⏩ Skipping PO {po} with received date {rd_date.strftime('%Y-%m-%d')} (older than window)")
-                driver.close()
-                driver.switch_to.window(driver.window_handles[0])
-                continue
-        except Exception:
-            pass
+def received_rows(po, url, parsed, cutoff_date) -> List[List[Any]]:
+    """CAME IN rows (B→I) for one parsed PO; [] if it was received before the window."""
+    od_text, rd_text, items = parsed
+    fmt = "%m/%d/%Y"
 
-        try:
-            od_date = datetime.strptime(od_text, fmt)
-            arrived_days = (rd_date - od_date).days
-            ai_str = f"{arrived_days} days"
-        except Exception:
-            ai_str = ""
+    try:
+        rd_date = datetime.strptime(rd_text, fmt)
+    except Exception:
+        rd_date = None
+    # tiny patch: rolling window instead of year==2025
+    if rd_date and rd_date < cutoff_date:
+        print(f"⏩ Skipping PO {po} with received date {rd_date.strftime('%Y-%m-%d')} (older than window)")
+        return []
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+    try:
+        od_date = datetime.strptime(od_text, fmt)
+        arrived_days = (rd_date - od_date).days
+        ai_str = f"{arrived_days} days"
+    except Exception:
+        ai_str = ""
 
-        # --- NEW: Grab Unit Cost from PO detail page ---
-        unit_cost_div = soup.find(id="UnitCostStart_DISP")
-        if unit_cost_div:
-            try:
-                price_per_unit = f"{float(unit_cost_div.text.strip()):.2f}"
-            except ValueError:
-                price_per_unit = ""
-        else:
-            price_per_unit = ""
-
-        invoice_hdr = None
-        for hdr in soup.find_all("td", class_="SecHeader"):
-            if "CAD-Invoice" in hdr.get_text():
-                invoice_hdr = hdr
-                break
-        received_col = 12 if invoice_hdr else 11
-
-        idx = 1
-        while True:
-            idf = soup.find(id=f"{idx}_1")
-            if not idf:
-                break
-
-            rf = soup.find(id=f"{idx}_{received_col}")
-            if not rf:
-                idx += 1
-                continue
-
-            # Extract quantity as before
-            try:
-                qty_rec = int(float(rf.get_text(strip=True).replace(",", "")))
-            except ValueError:
-                idx += 1
-                continue
-
-            iid      = idf.get_text(strip=True)
-            iurl     = f"{config.BASE_PO_DOMAIN}" + idf.find("a")["href"]
-            raw_desc = soup.find(id=f"{idx}_2").get_text(strip=True)
-            desc_trunc = mappings.truncate_desc(raw_desc)
-            clean = mappings.normalize_name(desc_trunc, iid)
-
-            # --- Extract Price Per Unit for THIS row (if present) ---
-            price_per_unit = ""
-            cost_td = soup.find(id=f"{idx}_4")
-            if cost_td:
-                price_div = cost_td.find("div", id="InvoiceCostOC_DISP")
-                if price_div:
-                    try:
-                        price_per_unit = f"{float(price_div.get_text(strip=True)):0.2f}"
-                    except Exception:
-                        price_per_unit = price_div.get_text(strip=True)
-                else:
-                    price_per_unit = ""
-            else:
-                price_per_unit = ""
-
-            # --- New row ---
-            new_rows.append((
-                po, url,
-                od_text, rd_text, ai_str,
-                iid, iurl,
-                clean, str(qty_rec), price_per_unit
-            ))
-            idx += 1
-
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
-
-    driver.quit()
-
-    # 3) Append new rows only
-    next_row = len(old_data) + 11 
-    headers = [
-        "PO #", "Order Date", "Received Date", "Arrived In",
-        "Item ID", "Description", "Quantity Received", "Price Per Unit"
-    ]
-    ws_g.update(
-        range_name="B10:I10", 
-        values=[headers],
-        value_input_option="USER_ENTERED"
-    )
-    auto_stamp_gsheet(ws_g)
-
-    data = [[
+    return [[
         f'=HYPERLINK("{url}","{po}")',
         od_text, rd_text, ai_str,
         f'=HYPERLINK("{iurl}","{iid}")',
-        clean, qty, price
-    ] for po, url, od_text, rd_text, ai_str, iid, iurl, clean, qty, price in new_rows]
-
-    if data:
-        # tiny patch: write starting at B{next_row} (true append), not always B11
-        ws_g.update(
-            values=data,
-            range_name=f"B{next_row}",
-            value_input_option="USER_ENTERED"
-        )
-        print(f"✅ Appended {len(data)} new POs to CAME IN (starting at row {next_row})")
+        mappings.clean_name(raw_desc, iid), str(qty_rec), price_per_unit
+    ] for iid, iurl, raw_desc, qty_rec, price_per_unit in items]
+
+
+def iter_received_rows(driver, todo, cutoff_date) -> Iterator[Tuple[str, List[List[Any]]]]:
+    """
+    Yield (po, CAME IN rows) for each (po, url) in `todo`, in order, as
+    soon as the PO is parsed. Reconciled POs never change, so a PO parsed
+    on an earlier run comes from the PO cache; the rest are fetched
+    lazily, a few pages ahead of the consumer. A PO whose page couldn't
+    be loaded is skipped (it is picked up next run).
+    """
+    with POCache("received") as cache:
+        parsed_pos = {}
+        misses = []
+        for po, url in todo:
+            hit = cache.get(po)
+            if hit is None:
+                misses.append((po, url))
+            else:
+                parsed_pos[po] = hit
+
+        for po, url in misses:
+            instrument.label(url, po)
+        pages = imap_detail_pages([url for _, url in misses], driver)
+        for po, url in todo:
+            parsed = parsed_pos.pop(po, None)
+            if parsed is None:
+                _, html = next(pages)
+                if html is None:
+                    print(f"⚠️ Could not load PO {po}; it will be picked up next run.")
+                    continue
+                with instrument.span("detail parse", item=po):
+                    parsed = parse_received_detail(html)
+                cache.put(po, parsed, RECONCILED)
+            with instrument.span("normalize", item=po):
+                rows = received_rows(po, url, parsed, cutoff_date)
+            instrument.count("line items", len(rows))
+            yield po, rows
+        cache.report()
+
+
+def _received_to_store(driver, cutoff_date) -> None:
+    """Scrape new POs into the local store; CAME IN follows at the sheet sync."""
+    lines = pos = 0
+    with store.Store() as db:
+        with instrument.span("list navigation"):
+            todo = _search_received_pos(driver, db.received_pos(), cutoff_date)
+        for po, rows in iter_received_rows(driver, todo, cutoff_date):
+            if rows:
+                db.add_received(rows)
+                lines += len(rows)
+                pos += 1
+    if pos:
+        print(f"✅ Stored {lines} lines from {pos} new POs (CAME IN is updated by the sheet sync)")
+    else:
+        print("No new POs to store.")
+
+
+@instrument.workflow("received")
+def process_received_orders(driver=None) -> None:
+    """
+    Add newly received POs to CAME IN.
+
+    With the local store on (config.STORE_FILE), POs are stored one by
+    one as they are parsed and the sheet is appended to by the final sync
+    step (store.sync_sheets). Otherwise rows are written to the sheet
+    while the scrape runs, every config.STREAM_FLUSH_ROWS rows or
+    config.STREAM_FLUSH_SECONDS seconds, whole POs at a time.
+
+    Either way an interrupted run keeps everything already stored or
+    flushed, and the next run skips those POs (their PO numbers are the
+    checkpoint); POs parsed but not saved yet come back from the PO cache.
+    """
+    print("📦 Scraping received orders via PO Search…")
+    own_driver = driver is None
+    if own_driver:
+        driver = get_driver()
+
+    # Rolling window: last 24 months for CAME IN (tiny patch)
+    cutoff_date = datetime.now() - timedelta(days=730)
+
+    if store.enabled():
+        try:
+            _received_to_store(driver, cutoff_date)
+        finally:
+            if own_driver:
+                driver.quit()
+        mappings.report_cache_stats()
+        return
+
+    # 1) Get existing PO numbers and latest date from the sheet
+    ws_g = open_sheet("CAME IN")
+
+    existing_pos, latest_date_in_sheet = get_existing_pos_and_latest_date()
+
+    def prepare(batch):
+        batch.update(ws_g, "B10:I10", [store.CAME_IN_HEADERS])
+        auto_stamp_gsheet(ws_g, batch=batch)
+
+    # 2) Scan the received list, then 3) append rows as POs are parsed
+    # tiny patch: write starting at B{next_row} (true append), not always B11
+    first_row = next_free_row(ws_g, "B", 11)
+    pos = 0
+    try:
+        with instrument.span("list navigation"):
+            todo = _search_received_pos(driver, existing_pos, cutoff_date)
+        with RowAppender(ws_g, "B", first_row, prepare=prepare) as out:
+            for po, rows in iter_received_rows(driver, todo, cutoff_date):
+                if rows:
+                    out.add(rows)
+                    pos += 1
+    finally:
+        if own_driver:
+            driver.quit()
+
+    if out.rows_written:
+        print(f"✅ Appended {out.rows_written} rows from {pos} new POs to CAME IN "
+              f"(starting at row {first_row})")
     else:
-        print("No new POs to append.")
\ No newline at end of file
+        print("No new POs to append.")
+    mappings.report_cache_stats()
@@ -1,55 +1,506 @@
 from __future__ import annotations
-from typing import List, Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import re
+import threading
+import time
 from datetime import datetime, timedelta
 
 import gspread
+from gspread.utils import a1_to_rowcol, absolute_range_name, rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
-from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font
 
-from . import config
+from . import config, instrument
 
 DEFAULT_FONT = Font(name="Times New Roman", size=13)
 
 
 # ── Google Sheets ────────────────────────────────────────────────────────────
+#
+# One authorized client, one spreadsheet handle and one worksheet handle per
+# title are shared by every workflow in the process, so a run pays for a
+# single OAuth handshake. The client is re-authorized once its token is
+# close to expiry (SHEETS_TOKEN_REFRESH_SECONDS), and a worksheet handle is
+# re-fetched once it is SHEETS_WORKSHEET_REFRESH_SECONDS old, so its row
+# count sees rows added by hand in a long session. use_spreadsheet() swaps
+# in another spreadsheet object (the in-memory fake the benchmarks use).
 
-def open_sheet(title: str):
-    
-    # Authenticate and open the given worksheet by title.
-    # Returns a gspread.models.Worksheet object.
-    
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
+_SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+]
+
+_lock = threading.RLock()
+_client = None
+_authorized_at = 0.0
+_spreadsheet = None
+_worksheets: Dict[str, Tuple[Any, float]] = {}   # title → (handle, fetched at)
+_override = None
+
+
+def _authorize() -> None:
+    global _client, _authorized_at, _spreadsheet
     creds = ServiceAccountCredentials.from_json_keyfile_name(
-        config.CREDS_FILE, scope
+        config.CREDS_FILE, _SCOPE
     )
-    client = gspread.authorize(creds)
-    sh = client.open_by_key(config.SHEET_ID)
-    return sh.worksheet(title)
+    _client = gspread.authorize(creds)
+    _authorized_at = time.monotonic()
+    _spreadsheet = None
+    _worksheets.clear()
+
+
+def get_spreadsheet():
+    """Return the shared handle to config.SHEET_ID, authorizing if needed."""
+    global _spreadsheet
+    with _lock:
+        if _override is not None:
+            return _override
+        if (_client is None or
+                time.monotonic() - _authorized_at > config.SHEETS_TOKEN_REFRESH_SECONDS):
+            _authorize()
+        if _spreadsheet is None:
+            _spreadsheet = _client.open_by_key(config.SHEET_ID)
+        return _spreadsheet
+
+
+def open_sheet(title: str, create_header: Optional[List[str]] = None):
+    """
+    Return the worksheet with the given title (cached per process, for up
+    to SHEETS_WORKSHEET_REFRESH_SECONDS). If it doesn't exist and
+    create_header is given, the tab is created with that header row;
+    otherwise WorksheetNotFound propagates.
+    """
+    with _lock, instrument.span("sheets open"):
+        sh = get_spreadsheet()
+        ws, fetched_at = _worksheets.get(title, (None, 0.0))
+        if ws is None or time.monotonic() - fetched_at > config.SHEETS_WORKSHEET_REFRESH_SECONDS:
+            try:
+                ws = sh.worksheet(title)
+            except gspread.exceptions.WorksheetNotFound:
+                if create_header is None:
+                    raise
+                ws = sh.add_worksheet(title, rows="1000", cols=str(max(5, len(create_header))))
+                ws.append_row(create_header, value_input_option="USER_ENTERED")
+            # reads and writes through it are timed (instrument.py)
+            ws = instrument.TimedWorksheet(ws)
+            _worksheets[title] = (ws, time.monotonic())
+        return ws
+
+
+def use_spreadsheet(sh) -> None:
+    """
+    Serve every open_sheet/get_spreadsheet call from `sh` – any object
+    with the Spreadsheet calls used here, e.g. benchmarks.fake_sheets –
+    instead of config.SHEET_ID; None goes back to Google Sheets.
+    """
+    global _override
+    with _lock:
+        _override = sh
+        _worksheets.clear()
+
+
+def reset_sheet_cache() -> None:
+    """Drop the cached client and handles (next call re-authorizes)."""
+    global _client, _spreadsheet
+    with _lock:
+        _client = None
+        _spreadsheet = None
+        _worksheets.clear()
+
+
+# ── Paged reads ──────────────────────────────────────────────────────────────
+
+def iter_rows(ws, first_col: str, last_col: str, start_row: int = 11,
+              value_render_option: Optional[str] = None,
+              chunk_rows: Optional[int] = None) -> Iterator[List[Any]]:
+    """
+    Stream the rows of columns first_col..last_col from start_row to the
+    end of the sheet, chunk_rows at a time, so no fixed last row is
+    needed and only one chunk is held in memory. Blank rows in the middle
+    come back as [] (row i is sheet row start_row + i); trailing blank
+    rows are dropped, like ws.get().
+    """
+    chunk_rows = chunk_rows or config.SHEETS_READ_CHUNK_ROWS
+    kwargs = {"value_render_option": value_render_option} if value_render_option else {}
+    blanks = 0
+    row = start_row
+    while row <= ws.row_count:
+        last = min(row + chunk_rows - 1, ws.row_count)
+        chunk = ws.get(f"{first_col}{row}:{last_col}{last}", **kwargs)
+        for values in chunk:
+            if not values:
+                blanks += 1
+                continue
+            for _ in range(blanks):
+                yield []
+            blanks = 0
+            yield values
+        blanks += (last - row + 1) - len(chunk)
+        row = last + 1
+
+
+def next_free_row(ws, col: str = "B", start_row: int = 11) -> int:
+    """First row at or below start_row after the last filled cell in `col`."""
+    filled = ws.col_values(a1_to_rowcol(f"{col}1")[1])
+    return max(len(filled) + 1, start_row)
 
 
-def clear_range(ws, cell_range: str) -> None:
-    #Clear a rectangular range in a worksheet (e.g., 'B11:L1000').
-    ws.batch_clear([cell_range])
+def clear_range(ws, cell_range: str, batch: Optional["WriteBatch"] = None) -> None:
+    #Clear a rectangular range in a worksheet (e.g., 'B11:L1000', or 'B11:L' to the last row).
+    if batch is not None:
+        batch.clear(ws, cell_range)
+    else:
+        ws.batch_clear([cell_range])
 
 
-def auto_stamp_gsheet(ws, tz_offset_hours: int = 0) -> None:
+def auto_stamp_gsheet(ws, tz_offset_hours: int = 0,
+                      batch: Optional["WriteBatch"] = None) -> None:
     # Stamp the date and time the program was run in B1 ("Last Updated:"), C1 (date), D1 (time).
     now = datetime.now() + timedelta(hours=tz_offset_hours)
     date_str = now.strftime("%Y-%m-%d")
     time_str = now.strftime("%H:%M")
 
+    values = [["Last Updated:", date_str, time_str]]
+    if batch is not None:
+        batch.update(ws, "B1:D1", values)
+        return
     ws.update(
         range_name="B1:D1",
-        values=[["Last Updated:", date_str, time_str]],
+        values=values,
         value_input_option="USER_ENTERED",
     )
 
 
+# ── Batched writes ───────────────────────────────────────────────────────────
+
+_A1_CELL = re.compile(r"^([A-Za-z]+)(\d*)$")
+
+
+def _grid_range(ws, cell_range: str, values: Optional[List[List[Any]]] = None):
+    """
+    'B11:J20' → (11, 2, 20, 10). An open end ('B11:J') runs to the last
+    row of the sheet; a bare anchor ('B11') is sized from values.
+    """
+    start, _, end = cell_range.partition(":")
+    r1, c1 = a1_to_rowcol(start)
+    if end:
+        col, row = _A1_CELL.match(end).groups()
+        c2 = a1_to_rowcol(f"{col}1")[1]
+        r2 = int(row) if row else ws.row_count
+    else:
+        rows = values or [[]]
+        r2 = r1 + max(len(rows), 1) - 1
+        c2 = c1 + max((len(r) for r in rows), default=1) - 1
+    return r1, c1, max(r2, r1), max(c2, c1)
+
+
+class WriteBatch:
+    """
+    Collects clears, value updates and timestamp stamps, then sends them
+    in one values batchUpdate per spreadsheet, so a sheet is never seen
+    half-written and each workflow costs a single write request.
+
+        with WriteBatch() as batch:
+            clear_range(ws, "B11:J1000", batch)
+            batch.update(ws, "B10:J10", [headers])
+            batch.update(ws, "B11", rows)
+            auto_stamp_gsheet(ws, batch=batch)
+
+    Operations keep their order: a later update wins over an earlier clear
+    of the same cells. The block flushes on exit unless it raised.
+
+    With diff=True (for tables rewritten in full every run) the flush
+    first reads what the sheet holds and sends only the cells that
+    change; cells already holding the same value, and already empty
+    cells being cleared, are skipped. config.SHEETS_DIFF_WRITES = False
+    turns this off everywhere.
+    """
+
+    def __init__(self, value_input_option: str = "USER_ENTERED", diff: bool = False):
+        self.value_input_option = value_input_option
+        self.diff = diff
+        self._ops: List[tuple] = []   # (ws, (r1, c1, r2, c2), values | None)
+
+    def __enter__(self) -> "WriteBatch":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def clear(self, ws, cell_range: str) -> None:
+        r1, c1, r2, c2 = _grid_range(ws, cell_range)
+        r2 = min(r2, ws.row_count)   # nothing to clear past the last row
+        if r1 <= r2:
+            self._ops.append((ws, (r1, c1, r2, c2), None))
+
+    def update(self, ws, cell_range: str, values: List[List[Any]]) -> None:
+        if values:
+            self._ops.append((ws, _grid_range(ws, cell_range, values), values))
+
+    def _data(self, ops) -> List[dict]:
+        """Final cell values per worksheet, emitted as non-redundant ranges."""
+        data = []
+        for ws, ws_ops in _by_worksheet(ops):
+            cells = _final_cells(ws_ops)
+            for rect in _outer_rects(ws_ops):
+                data.extend(_slices(ws, rect, cells))
+        return data
+
+    def _diff_data(self, sh, ops) -> List[dict]:
+        """
+        Like _data, but only the cells whose value would change: the
+        ranges about to be written are read first (one request for the
+        spreadsheet, as formulas and unformatted values) and compared
+        cell by cell.
+        """
+        groups = [(ws, ws_ops, _outer_rects(ws_ops)) for ws, ws_ops in _by_worksheet(ops)]
+        ranges = [absolute_range_name(ws.title, _a1(rect))
+                  for ws, _, rects in groups for rect in rects]
+        got = iter(sh.values_batch_get(ranges, params={"valueRenderOption": "FORMULA"})
+                   .get("valueRanges", []))
+
+        data = []
+        for ws, ws_ops, rects in groups:
+            current: Dict[tuple, Any] = {}
+            for (r1, c1, _, _), vr in zip(rects, got):
+                for i, row in enumerate(vr.get("values", [])):
+                    for j, v in enumerate(row):
+                        current[(r1 + i, c1 + j)] = v
+            changed: Dict[tuple, Any] = {}
+            skipped = 0
+            for cell, v in _final_cells(ws_ops).items():
+                if v is None:
+                    continue
+                if _cell_value(v) == _cell_value(current.get(cell, "")):
+                    skipped += 1
+                else:
+                    changed[cell] = v
+
+            # One range per run of consecutive rows changed in the same columns
+            spans: Dict[int, list] = {}
+            for r, c in changed:
+                span = spans.setdefault(r, [c, c])
+                span[0], span[1] = min(span[0], c), max(span[1], c)
+            rows = sorted(spans)
+            i = 0
+            while i < len(rows):
+                j = i
+                while (j + 1 < len(rows) and rows[j + 1] == rows[j] + 1
+                       and spans[rows[j + 1]] == spans[rows[i]]):
+                    j += 1
+                c_first, c_last = spans[rows[i]]
+                data.extend(_slices(ws, (rows[i], c_first, rows[j], c_last), changed))
+                i = j + 1
+
+            instrument.count("sheets cells skipped", skipped)
+            print(f"📝 {ws.title}: {len(changed)} cells changed, {skipped} unchanged skipped")
+        return data
+
+    def flush(self) -> None:
+        """
+        Send everything collected so far: one request per spreadsheet, split
+        into several only when it exceeds SHEETS_MAX_CELLS_PER_REQUEST cells.
+        Worksheets are grown first if a write runs past their last row.
+        """
+        ops, self._ops = self._ops, []
+        by_sheet: Dict[str, list] = {}
+        for op in ops:
+            by_sheet.setdefault(op[0].spreadsheet.id, []).append(op)
+
+        for sheet_ops in by_sheet.values():
+            _ensure_rows(sheet_ops)
+            sh = sheet_ops[0][0].spreadsheet
+            if self.diff and config.SHEETS_DIFF_WRITES:
+                data = self._diff_data(sh, sheet_ops)
+            else:
+                data = self._data(sheet_ops)
+            request, cells = [], 0
+            for item in data:
+                size = len(item["values"]) * len(item["values"][0])
+                if request and cells + size > config.SHEETS_MAX_CELLS_PER_REQUEST:
+                    self._send(sh, request)
+                    request, cells = [], 0
+                request.append(item)
+                cells += size
+            if request:
+                self._send(sh, request)
+
+    def _send(self, sh, data: List[dict]) -> None:
+        sh.values_batch_update(body={
+            "valueInputOption": self.value_input_option,
+            "data": data,
+        })
+
+
+def _by_worksheet(ops) -> List[tuple]:
+    """[(ws, its ops)] in first-use order."""
+    by_ws: Dict[int, tuple] = {}
+    for op in ops:
+        by_ws.setdefault(id(op[0]), (op[0], []))[1].append(op)
+    return list(by_ws.values())
+
+
+def _final_cells(ws_ops) -> Dict[tuple, Any]:
+    """(row, col) → value after applying the ops in order ("" for cleared)."""
+    cells: Dict[tuple, Any] = {}
+    for _, (r1, c1, r2, c2), values in ws_ops:
+        if values is None:
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    cells[(r, c)] = ""
+        else:
+            for i, row in enumerate(values):
+                for j, v in enumerate(row):
+                    cells[(r1 + i, c1 + j)] = v
+    return cells
+
+
+def _outer_rects(ws_ops) -> List[tuple]:
+    """The ops' ranges, leaving out any covered by an earlier larger one."""
+    emitted: List[tuple] = []
+    for _, rect, _ in ws_ops:
+        r1, c1, r2, c2 = rect
+        if any(a <= r1 and b <= c1 and r2 <= c and c2 <= d
+               for a, b, c, d in emitted):
+            continue  # already covered by a larger range
+        emitted.append(rect)
+    return emitted
+
+
+def _a1(rect: tuple) -> str:
+    r1, c1, r2, c2 = rect
+    return f"{rowcol_to_a1(r1, c1)}:{rowcol_to_a1(r2, c2)}"
+
+
+def _slices(ws, rect: tuple, cells: Dict[tuple, Any]) -> List[dict]:
+    """rect's values from cells, in row slices of at most SHEETS_MAX_CELLS_PER_REQUEST."""
+    r1, c1, r2, c2 = rect
+    step = max(1, config.SHEETS_MAX_CELLS_PER_REQUEST // (c2 - c1 + 1))
+    out = []
+    for top in range(r1, r2 + 1, step):
+        bottom = min(top + step - 1, r2)
+        # None leaves a cell untouched (ragged update rows, unchanged cells)
+        grid = [
+            [cells.get((r, c)) for c in range(c1, c2 + 1)]
+            for r in range(top, bottom + 1)
+        ]
+        out.append({
+            "range": absolute_range_name(ws.title, _a1((top, c1, bottom, c2))),
+            "values": grid,
+        })
+    return out
+
+
+_NUMBER = re.compile(r"^([-+]?)\$?((?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d*)?|\.\d+)(%?)$")
+_SERIAL_EPOCH = datetime(1899, 12, 30)
+
+
+def _cell_value(v) -> Any:
+    """
+    What a cell holds after a USER_ENTERED write of v, as a FORMULA read
+    returns it: numbers (also "1,234.50", "12%") as floats, dates
+    ("MM/DD/YYYY", "YYYY-MM-DD") as serial numbers, formulas as text.
+    """
+    if v is None or v == "":
+        return ""
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return round(float(v), 9)
+    text = str(v).strip()
+    if text.startswith("="):
+        return text
+    m = _NUMBER.match(text)
+    if m:
+        n = float(m.group(2).replace(",", ""))
+        n = -n if m.group(1) == "-" else n
+        return round(n / 100 if m.group(3) else n, 9)
+    if "/" in text or "-" in text:
+        for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
+            try:
+                return float((datetime.strptime(text, fmt) - _SERIAL_EPOCH).days)
+            except ValueError:
+                pass
+    if text.upper() in ("TRUE", "FALSE"):
+        return text.upper() == "TRUE"
+    return text
+
+
+def _ensure_rows(ops) -> None:
+    """Add rows to any worksheet a batch would write past the end of."""
+    needed: Dict[int, tuple] = {}
+    for ws, (_, _, r2, _), values in ops:
+        if values is not None and r2 > ws.row_count:
+            prev = needed.get(id(ws), (ws, 0))[1]
+            needed[id(ws)] = (ws, max(prev, r2))
+    for ws, last_row in needed.values():
+        ws.add_rows(last_row - ws.row_count)
+
+
+class RowAppender:
+    """
+    Appends rows below a sheet's data in batches while a scrape is still
+    running, so finished work reaches the sheet as it goes and a crash
+    loses at most the current batch. A batch is flushed once it holds
+    flush_rows rows, or on the first add() after flush_seconds; every
+    flush is one WriteBatch that also carries whatever `prepare(batch)`
+    adds (e.g. the header and timestamp).
+
+        with RowAppender(ws, "B", next_free_row(ws), prepare=stamp) as out:
+            for rows in scrape():
+                out.add(rows)
+
+    add() takes a group of rows that belong together (one PO) and never
+    splits it across flushes. Whatever has been added is flushed on exit,
+    also when the block raised.
+    """
+
+    def __init__(self, ws, col: str, start_row: int,
+                 flush_rows: Optional[int] = None,
+                 flush_seconds: Optional[float] = None,
+                 prepare=None):
+        self.ws = ws
+        self.col = col
+        self.next_row = start_row
+        self.flush_rows = flush_rows or config.STREAM_FLUSH_ROWS
+        self.flush_seconds = (config.STREAM_FLUSH_SECONDS
+                              if flush_seconds is None else flush_seconds)
+        self.prepare = prepare
+        self.rows_written = 0
+        self.flushes = 0
+        self._buffer: List[List[Any]] = []
+        self._since = time.monotonic()
+
+    def __enter__(self) -> "RowAppender":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if self._buffer or (exc_type is None and not self.flushes):
+            self.flush()
+
+    def add(self, rows: List[List[Any]]) -> None:
+        self._buffer.extend(rows)
+        if (len(self._buffer) >= self.flush_rows or
+                time.monotonic() - self._since >= self.flush_seconds):
+            self.flush()
+
+    def flush(self) -> None:
+        rows, self._buffer = self._buffer, []
+        with WriteBatch() as batch:
+            if self.prepare is not None:
+                self.prepare(batch)
+            batch.update(self.ws, f"{self.col}{self.next_row}", rows)
+        if rows:
+            print(f"💾 Wrote {len(rows)} rows to {self.ws.title} (rows {self.next_row}–"
+                  f"{self.next_row + len(rows) - 1})")
+        self.next_row += len(rows)
+        self.rows_written += len(rows)
+        self.flushes += 1
+        self._since = time.monotonic()
+
+
 # ── Excel workbook helpers (optional; use if you still generate XLSX) ───────
 
 def auto_stamp_excel(ws) -> None:
@@ -0,0 +1,469 @@
+"""
+Local system of record for what the scrapers collect.
+
+Received PO lines (CAME IN), open PO lines (WAITING ON) and requisitions
+(LATEST 2 YEARS) are kept in SQLite (config.STORE_FILE), indexed by item
+ID, PO number and date. With the store on:
+
+  * the scrapers write to it – received lines one PO per transaction, so
+    an interrupted run keeps every PO it finished;
+  * ITEM SUMMARY, the WAITING ON delivery medians and the trend table are
+    computed from it instead of being read back from Google Sheets;
+  * the sheets are brought up to date by one final sync_sheets() step:
+    CAME IN lines not published yet are appended, and every table a step
+    stored (set_table) is rewritten – unless it is identical to what was
+    published last time. Each tab goes out in its own write (CAME IN in
+    request-sized chunks) and is marked published only once that write
+    succeeded, so a failed sync is simply repeated by the next one.
+
+The store is off unless config.STORE_FILE is set. Before first use (and
+after hand edits in those tabs) fill it from CAME IN, WAITING ON and
+LATEST 2 YEARS with `python -m automation-project.store --import`; a
+store that was never imported, or belongs to another spreadsheet, is
+refused rather than filled behind the user's back.
+
+Dates are stored as ISO text (YYYY-MM-DD), so they sort and compare in SQL.
+
+Exposes:
+    enabled() -> bool
+    Store() – received_pos(), add_received(rows), replace_open(rows),
+              requisitions(), upsert_requisitions(rows), set_table(...), …
+    sync_sheets()
+    CAME_IN_HEADERS
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from gspread.exceptions import WorksheetNotFound
+
+from . import config, instrument
+from .sheets_io import WriteBatch, auto_stamp_gsheet, clear_range, iter_rows, next_free_row, open_sheet
+from .utils import package_path, parse_sheet_date
+
+CAME_IN_HEADERS = [
+    "PO #", "Order Date", "Received Date", "Arrived In",
+    "Item ID", "Description", "Quantity Received", "Price Per Unit",
+]
+
+link_re = re.compile(
+    r'=HYPERLINK\("(?P<url>[^"]+)"\s*,\s*"(?P<text>[^"]+)"\)',
+    re.IGNORECASE
+)
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS received_lines (
+    id            INTEGER PRIMARY KEY,      -- CAME IN order
+    po            TEXT NOT NULL,
+    po_url        TEXT NOT NULL,
+    order_date    TEXT,
+    received_date TEXT,
+    arrived_days  INTEGER,
+    item_id       TEXT NOT NULL,
+    item_url      TEXT NOT NULL,
+    description   TEXT NOT NULL,
+    qty           INTEGER NOT NULL,
+    price         REAL,
+    published     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS received_po   ON received_lines (po);
+CREATE INDEX IF NOT EXISTS received_item ON received_lines (item_id, order_date);
+CREATE INDEX IF NOT EXISTS received_date ON received_lines (received_date);
+CREATE INDEX IF NOT EXISTS received_new  ON received_lines (id) WHERE published = 0;
+
+CREATE TABLE IF NOT EXISTS open_lines (
+    id          INTEGER PRIMARY KEY,
+    po          TEXT NOT NULL,
+    po_url      TEXT NOT NULL,
+    order_date  TEXT,
+    item_id     TEXT NOT NULL,
+    item_url    TEXT NOT NULL,
+    description TEXT NOT NULL,
+    remaining   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS open_po   ON open_lines (po);
+CREATE INDEX IF NOT EXISTS open_item ON open_lines (item_id, order_date);
+
+CREATE TABLE IF NOT EXISTS requisitions (
+    req       TEXT PRIMARY KEY,
+    url       TEXT NOT NULL,
+    req_date  TEXT NOT NULL,
+    cost      REAL,
+    exception TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requisitions_date ON requisitions (req_date);
+
+CREATE TABLE IF NOT EXISTS tables (         -- sheet tables for sync_sheets()
+    sheet     TEXT PRIMARY KEY,
+    spec      TEXT NOT NULL,                -- JSON: anchor, clear, create_header, rows
+    published INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def enabled() -> bool:
+    return bool(config.STORE_FILE)
+
+
+def _iso(cell) -> Optional[str]:
+    dt = parse_sheet_date(cell)
+    return dt.date().isoformat() if dt else None
+
+
+def _us(iso: Optional[str]) -> str:
+    return f"{iso[5:7]}/{iso[8:10]}/{iso[:4]}" if iso else ""
+
+
+def _link(cell) -> Optional[Tuple[str, str]]:
+    m = link_re.match(str(cell or ""))
+    return (m.group("url"), m.group("text")) if m else None
+
+
+def _int(cell, default=None):
+    m = re.match(r"\s*(-?\d+(?:\.\d*)?)", str(cell))
+    return int(float(m.group(1))) if m else default
+
+
+def _float(cell) -> Optional[float]:
+    try:
+        return float(str(cell).replace(",", ""))
+    except ValueError:
+        return None
+
+
+# --------------------------------------------------
+# STORE
+# --------------------------------------------------
+
+class Store:
+    """
+    One connection to config.STORE_FILE (one per thread). Raises unless
+    the store was imported from config.SHEET_ID (pass imported=False to
+    open it for import_sheets()).
+
+        with Store() as db:
+            db.add_received(rows)
+    """
+
+    def __init__(self, path: Optional[str] = None, imported: bool = True):
+        path = path or package_path(config.STORE_FILE)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript(_SCHEMA)
+        if imported and self._meta("sheet_id") != config.SHEET_ID:
+            self.close()
+            raise RuntimeError(
+                f"The local store {path} has not been filled from this spreadsheet; "
+                f"run `python -m automation-project.store --import` first."
+            )
+
+    def __enter__(self) -> "Store":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # --- bootstrap ---
+
+    def import_sheets(self) -> None:
+        """Replace the store's contents with CAME IN, WAITING ON and LATEST 2 YEARS."""
+        with instrument.workflow("store import"):
+            print("🗃️  Filling the local store from Google Sheets…")
+            came = [r for r in iter_rows(open_sheet("CAME IN"), "B", "I",
+                                         value_render_option="FORMULA") if r]
+            waiting = [r for r in iter_rows(open_sheet("WAITING ON"), "B", "G",
+                                            value_render_option="FORMULA") if r]
+            try:
+                latest = [r for r in iter_rows(open_sheet("LATEST 2 YEARS"), "B", "E",
+                                               value_render_option="FORMULA") if r]
+            except WorksheetNotFound:
+                latest = []
+            requisitions = []
+            for r in latest:
+                r = list(r) + [""] * (4 - len(r))
+                link, when = _link(r[0]), parse_sheet_date(r[1])
+                if link and when:
+                    requisitions.append((link[1], link[0], when.strftime("%m/%d/%Y"), r[2], r[3]))
+
+            with self.db:
+                for table in ("received_lines", "open_lines", "requisitions", "tables"):
+                    self.db.execute(f"DELETE FROM {table}")
+                self._insert_received(came, published=1)
+                self._insert_open(waiting)
+                self._upsert_requisitions(requisitions)
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('sheet_id', ?)",
+                                (config.SHEET_ID,))
+            instrument.count("store rows imported", len(came) + len(waiting) + len(requisitions))
+            print(f"🗃️  Store holds {self.count('received_lines')} received lines, "
+                  f"{self.count('open_lines')} open lines, "
+                  f"{self.count('requisitions')} requisitions.")
+
+    def count(self, table: str) -> int:
+        return self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    # --- received lines (CAME IN) ---
+
+    def _insert_received(self, rows: Iterable[list], published: int = 0) -> int:
+        """CAME IN rows (B→I, as written or FORMULA-read) → received_lines."""
+        records = []
+        for row in rows:
+            row = list(row) + [""] * (8 - len(row))
+            po, item = _link(row[0]), _link(row[4])
+            if po is None or item is None:
+                continue
+            records.append((
+                po[1], po[0], _iso(row[1]), _iso(row[2]), _int(row[3]),
+                item[1], item[0], str(row[5] or ""), _int(row[6], 0), _float(row[7]),
+                published,
+            ))
+        self.db.executemany(
+            "INSERT INTO received_lines (po, po_url, order_date, received_date, arrived_days, "
+            "item_id, item_url, description, qty, price, published) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+        return len(records)
+
+    def add_received(self, rows: List[list]) -> None:
+        """Store one PO's CAME IN rows (one transaction)."""
+        with self.db:
+            self._insert_received(rows)
+
+    def received_pos(self) -> set:
+        return {po for (po,) in self.db.execute("SELECT DISTINCT po FROM received_lines")}
+
+    def came_in_columns(self, clean) -> Dict[str, list]:
+        """
+        ITEM SUMMARY engine input (scrape_item_summary.COLUMNS) for every
+        line with an order date, in CAME IN order; names through clean().
+        """
+        cols = {c: [] for c in ("item_id", "url", "name", "date", "qty", "days", "price")}
+        for item_id, url, desc, od, qty, days, price in self.db.execute(
+                "SELECT item_id, item_url, description, order_date, qty, arrived_days, price "
+                "FROM received_lines WHERE order_date IS NOT NULL ORDER BY id"):
+            cols["item_id"].append(item_id)
+            cols["url"].append(url)
+            cols["name"].append(clean(desc, item_id))
+            cols["date"].append(datetime.fromisoformat(od))
+            cols["qty"].append(qty)
+            cols["days"].append(days)
+            cols["price"].append(price)
+        instrument.count("store rows read", len(cols["item_id"]))
+        return cols
+
+    def median_delivery_days(self) -> Dict[str, str]:
+        """{item_id: median days to arrive, or "No Data"} – WAITING ON's last column."""
+        days = defaultdict(list)
+        for item_id, d in self.db.execute(
+                "SELECT item_id, arrived_days FROM received_lines WHERE order_date IS NOT NULL"):
+            lst = days[item_id]
+            if d is not None:
+                lst.append(d)
+        return {item_id: f"{median(lst):.0f}" if lst else "No Data"
+                for item_id, lst in days.items()}
+
+    def _unpublished(self) -> List[tuple]:
+        return self.db.execute(
+            "SELECT id, po, po_url, order_date, received_date, arrived_days, item_id, "
+            "item_url, description, qty, price FROM received_lines WHERE published = 0 "
+            "ORDER BY id").fetchall()
+
+    # --- open PO lines (WAITING ON) ---
+
+    def _insert_open(self, rows: Iterable[list]) -> None:
+        records = []
+        for row in rows:
+            row = list(row) + [""] * (5 - len(row))
+            po, item = _link(row[0]), _link(row[2])
+            if po is None or item is None:
+                continue
+            records.append((po[1], po[0], _iso(row[1]), item[1], item[0],
+                            str(row[3] or ""), _int(row[4], 0)))
+        self.db.executemany(
+            "INSERT INTO open_lines (po, po_url, order_date, item_id, item_url, description, "
+            "remaining) VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+
+    def replace_open(self, rows: List[list]) -> None:
+        """Replace the open PO lines with these WAITING ON rows (B→G)."""
+        with self.db:
+            self.db.execute("DELETE FROM open_lines")
+            self._insert_open(rows)
+
+    def pending_dates(self) -> Dict[str, List[datetime]]:
+        """{item_id: [order date, …]} of the open PO lines (like load_pending)."""
+        pending: Dict[str, List[datetime]] = {}
+        for item_id, od in self.db.execute(
+                "SELECT item_id, order_date FROM open_lines WHERE order_date IS NOT NULL ORDER BY id"):
+            pending.setdefault(item_id, []).append(datetime.fromisoformat(od))
+        return pending
+
+    # --- requisitions (LATEST 2 YEARS) ---
+
+    def requisitions(self) -> Dict[str, tuple]:
+        """{req_num: (None, url, date, cost, exception)}, like scrape_history's stored map."""
+        return {
+            req: (None, url, date.fromisoformat(d), cost, exc)
+            for req, url, d, cost, exc in self.db.execute(
+                "SELECT req, url, req_date, cost, exception FROM requisitions")
+        }
+
+    def _upsert_requisitions(self, rows: Iterable[tuple]) -> None:
+        self.db.executemany(
+            "INSERT OR REPLACE INTO requisitions VALUES (?, ?, ?, ?, ?)",
+            [(req, url, _iso(d), _float(cost), exc) for req, url, d, cost, exc in rows])
+
+    def upsert_requisitions(self, rows: Iterable[tuple]) -> None:
+        """(req_num, req_url, "MM/DD/YYYY", cost, exception) tuples, as the grid parser gives."""
+        with self.db:
+            self._upsert_requisitions(rows)
+
+    def replace_requisitions(self, rows: Iterable[tuple]) -> None:
+        """Replace every stored requisition with these (one transaction)."""
+        with self.db:
+            self.db.execute("DELETE FROM requisitions")
+            self._upsert_requisitions(rows)
+
+    def drop_requisitions_before(self, cutoff: date) -> int:
+        with self.db:
+            return self.db.execute("DELETE FROM requisitions WHERE req_date < ?",
+                                   (cutoff.isoformat(),)).rowcount
+
+    def requisition_rows(self) -> List[tuple]:
+        """Every requisition as (req_num, url, "MM/DD/YYYY", cost, exception), newest first."""
+        return [
+            (req, url, _us(d), "" if cost is None else f"{cost:.2f}", exc)
+            for req, url, d, cost, exc in self.db.execute(
+                "SELECT req, url, req_date, cost, exception FROM requisitions "
+                "ORDER BY req_date DESC, req DESC")
+        ]
+
+    def requisition_amounts(self) -> List[Tuple[date, float, str]]:
+        """(date, cost, exception) per requisition with a cost, for the trend table."""
+        rows = [(date.fromisoformat(d), cost, exc) for d, cost, exc in self.db.execute(
+            "SELECT req_date, cost, exception FROM requisitions WHERE cost IS NOT NULL")]
+        instrument.count("store rows read", len(rows))
+        return rows
+
+    # --- computed tables ---
+
+    def set_table(self, sheet: str, anchor: str, rows: List[list], clear: str,
+                  create_header: Optional[List[str]] = None) -> None:
+        """
+        Have sync_sheets() write `rows` at `anchor` of `sheet` after clearing
+        `clear`. Nothing is written if the same table was already published.
+        """
+        spec = json.dumps({"anchor": anchor, "clear": clear,
+                           "create_header": create_header, "rows": rows},
+                          ensure_ascii=False, default=str)
+        with self.db:
+            old = self.db.execute("SELECT spec FROM tables WHERE sheet = ?", (sheet,)).fetchone()
+            if old is None or old[0] != spec:
+                self.db.execute("INSERT OR REPLACE INTO tables VALUES (?, ?, 0)", (sheet, spec))
+
+
+# --------------------------------------------------
+# SYNC
+# --------------------------------------------------
+
+def _came_in_row(rec: tuple) -> list:
+    _, po, po_url, od, rd, days, item_id, item_url, desc, qty, price = rec
+    return [
+        f'=HYPERLINK("{po_url}","{po}")', _us(od), _us(rd),
+        f"{days} days" if days is not None else "",
+        f'=HYPERLINK("{item_url}","{item_id}")', desc, str(qty),
+        f"{price:0.2f}" if price is not None else "",
+    ]
+
+
+def sync_sheets() -> None:
+    """
+    Publish the store: append new CAME IN lines and rewrite the tables
+    stored since the last sync. No-op without the store.
+    """
+    if enabled():
+        _sync()
+
+
+@instrument.workflow("sync")
+def _sync() -> None:
+    with Store() as db:
+        synced = []
+
+        new = db._unpublished()
+        if new:
+            ws = open_sheet("CAME IN")
+            row = next_free_row(ws, "B", 11)
+            # header + stamp + chunk fit in one request, marked as it lands
+            per_request = max(1, (config.SHEETS_MAX_CELLS_PER_REQUEST - 11)
+                              // len(CAME_IN_HEADERS))
+            for i in range(0, len(new), per_request):
+                chunk = new[i:i + per_request]
+                with WriteBatch() as batch:
+                    batch.update(ws, "B10:I10", [CAME_IN_HEADERS])
+                    batch.update(ws, f"B{row}", [_came_in_row(r) for r in chunk])
+                    auto_stamp_gsheet(ws, batch=batch)
+                with db.db:
+                    db.db.executemany("UPDATE received_lines SET published = 1 WHERE id = ?",
+                                      [(r[0],) for r in chunk])
+                row += len(chunk)
+            synced.append(f"CAME IN +{len(new)} rows")
+
+        pending = db.db.execute("SELECT sheet, spec FROM tables WHERE published = 0").fetchall()
+        for sheet, spec_json in pending:
+            spec = json.loads(spec_json)
+            ws = open_sheet(sheet, create_header=spec["create_header"])
+            # A table that fails part-way stays unpublished and is diffed again next sync
+            with WriteBatch(diff=True) as batch:
+                clear_range(ws, spec["clear"], batch)
+                batch.update(ws, spec["anchor"], spec["rows"])
+                auto_stamp_gsheet(ws, batch=batch)
+            with db.db:
+                db.db.execute("UPDATE tables SET published = 1 WHERE sheet = ? AND spec = ?",
+                              (sheet, spec_json))
+            synced.append(f"{sheet} ({len(spec['rows'])} rows)")
+
+        if not synced:
+            print("✅ Sheets already match the local store.")
+            return
+        instrument.count("tabs synced", len(synced))
+        print(f"✅ Synced to Sheets: {', '.join(synced)}.")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local store of scraped PO data.")
+    ap.add_argument("--import", dest="rebuild", action="store_true",
+                    help="fill the store from the sheets (first use, after hand edits there)")
+    ap.add_argument("--sync", action="store_true", help="publish pending changes to the sheets")
+    args = ap.parse_args()
+
+    if not enabled():
+        raise SystemExit("config.STORE_FILE is empty; the store is off.")
+    with Store(imported=not args.rebuild) as db:
+        if args.rebuild:
+            db.import_sheets()
+        for table in ("received_lines", "open_lines", "requisitions"):
+            print(f"   {table:<15} {db.count(table):>8} rows")
+    if args.sync:
+        sync_sheets()
+
+
+if __name__ == "__main__":
+    main()
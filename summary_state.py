@@ -0,0 +1,164 @@
+"""
+Per-item state behind ITEM SUMMARY, kept between runs so an update only
+reads the CAME IN rows appended since the last one and only recomputes
+the items whose lines or pending (WAITING ON) dates changed.
+
+For every item the state holds its CAME IN lines (dates, quantities,
+delivery days, prices – the multisets every statistic is computed from),
+its pending dates, and the summary row last computed for it. Untouched
+items keep their row; only the date-relative "Lasts For" text is
+re-rendered (from utils.order_frequency_parts) and the name is re-cleaned
+in case the mappings changed. The table as last written is kept too, so
+only rows that differ are sent to the sheet.
+
+The state is pickled to config.ITEM_SUMMARY_STATE_FILE. It is thrown away
+(full rebuild) when it belongs to another spreadsheet, when its format is
+out of date, or when the last CAME IN row it read no longer matches the
+sheet (that row was edited, or rows were inserted or deleted above it).
+Other hand edits to older CAME IN rows need a full run
+(process_item_summary(full=True), the "Item Summary" menu entry).
+
+Exposes:
+    SummaryState.load() / .save()
+    SummaryState.matches(came_ws) -> bool
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import config
+from .utils import package_path
+
+_FORMAT = 1
+
+
+class ItemLines:
+    """Every CAME IN line of one item, in sheet order."""
+
+    __slots__ = ("url", "raw_desc", "dates", "qtys", "days", "prices")
+
+    def __init__(self, url: str, raw_desc: str):
+        self.url = url
+        self.raw_desc = raw_desc    # first line's description (names the item)
+        self.dates: list = []
+        self.qtys: List[int] = []
+        self.days: list = []        # None where Arrived In is blank
+        self.prices: list = []      # None where the price is blank
+
+
+def fingerprint(row: Iterable) -> str:
+    return hashlib.sha1(json.dumps(list(row), default=str).encode("utf-8")).hexdigest()
+
+
+class SummaryState:
+
+    def __init__(self):
+        self.format = _FORMAT
+        self.sheet_id = config.SHEET_ID
+        self.next_row = 11                     # first CAME IN row not read yet
+        self.last_row: Optional[Tuple[int, str]] = None   # (sheet row, fingerprint)
+        self.items: Dict[str, ItemLines] = {}  # first-appearance order
+        self.pending: Dict[str, tuple] = {}    # item → sorted distinct dates
+        self.rows: Dict[str, list] = {}        # item → computed summary row
+        self.freq_parts: Dict[str, tuple] = {}
+        self.written: List[list] = []          # table as last written at B11
+
+    # --- persistence ---
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional["SummaryState"]:
+        path = package_path(config.ITEM_SUMMARY_STATE_FILE) if path is None else path
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as fh:
+                state = pickle.load(fh)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable item-summary state {path}: {e}")
+            return None
+        if getattr(state, "format", None) != _FORMAT or state.sheet_id != config.SHEET_ID:
+            return None
+        return state
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = package_path(config.ITEM_SUMMARY_STATE_FILE) if path is None else path
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    # --- CAME IN ---
+
+    def matches(self, came) -> bool:
+        """True if the last row read last time is still there, unchanged."""
+        if self.last_row is None:
+            return True
+        row_no, digest = self.last_row
+        if row_no > came.row_count:
+            return False
+        got = came.get(f"B{row_no}:I{row_no}", value_render_option="FORMULA")
+        return fingerprint(got[0] if got else []) == digest
+
+    def read_rows(self, rows: Iterable[list], parse) -> Set[str]:
+        """
+        Add CAME IN rows read from self.next_row on (blank rows as []);
+        parse(row) → (item_id, url, raw_desc, date, qty, days, price) or
+        None. Returns the item IDs that got new lines.
+        """
+        touched = set()
+        for row in rows:
+            row_no = self.next_row
+            self.next_row += 1
+            if not row:
+                continue
+            self.last_row = (row_no, fingerprint(row))
+            line = parse(row)
+            if line is None:
+                continue
+            item_id, url, raw_desc, dt, qty, days, price = line
+            rec = self.items.get(item_id)
+            if rec is None:
+                rec = self.items[item_id] = ItemLines(url, raw_desc)
+            rec.dates.append(dt)
+            rec.qtys.append(qty)
+            rec.days.append(days)
+            rec.prices.append(price)
+            touched.add(item_id)
+        return touched
+
+    # --- WAITING ON ---
+
+    def set_pending(self, pending: Dict[str, list]) -> Set[str]:
+        """Store the current pending dates; returns items whose set changed."""
+        new = {item_id: tuple(sorted(set(dts))) for item_id, dts in pending.items()
+               if item_id in self.items}
+        changed = {i for i in set(new) | set(self.pending)
+                   if new.get(i, ()) != self.pending.get(i, ())}
+        self.pending = new
+        return changed
+
+    # --- compute ---
+
+    def columns(self, item_ids: Iterable[str], clean) -> Dict[str, list]:
+        """Engine input (scrape_item_summary.COLUMNS) for just these items."""
+        cols = {c: [] for c in ("item_id", "url", "name", "date", "qty", "days", "price")}
+        for item_id in item_ids:
+            rec = self.items[item_id]
+            n = len(rec.dates)
+            cols["item_id"] += [item_id] * n
+            cols["url"] += [rec.url] * n
+            cols["name"] += [clean(rec.raw_desc, item_id)] * n
+            cols["date"] += rec.dates
+            cols["qty"] += rec.qtys
+            cols["days"] += rec.days
+            cols["price"] += rec.prices
+        return cols
+
+    def all_dates(self, item_id: str) -> list:
+        return self.items[item_id].dates + list(self.pending.get(item_id, ()))
@@ -0,0 +1,71 @@
+"""The NumPy ITEM SUMMARY engine gives the same rows as the Python one."""
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from .. import item_summary_np
+from ..benchmarks.fake_sheets import FakeSpreadsheet
+from ..benchmarks.item_summary import _serial, synthetic_sheets
+from ..scrape_item_summary import compute_rows, load_came_in, load_pending
+
+TODAY = date(2025, 11, 1)
+
+
+def _both(book: FakeSpreadsheet):
+    cols = load_came_in(book.worksheet("CAME IN"))
+    pending = load_pending(book.worksheet("WAITING ON"))
+    return compute_rows(cols, pending, TODAY), item_summary_np.compute_rows(cols, pending, TODAY)
+
+
+def _book(came, waiting=()) -> FakeSpreadsheet:
+    book = FakeSpreadsheet()
+    book.add("CAME IN", came)
+    book.add("WAITING ON", waiting)
+    return book
+
+
+def _line(item: str, order_date, qty=1, days="5 days", price="2.50", po="001-1"):
+    return [f'=HYPERLINK("https://example-procurement.com/po/{po}","{po}")', order_date, "",
+            days, f'=HYPERLINK("https://example-procurement.com/item/{item}","{item}")',
+            f"Item {item}", qty, price]
+
+
+def _open(item: str, order_date, po="001-o1"):
+    return [f'=HYPERLINK("https://example-procurement.com/po/{po}","{po}")', order_date,
+            f'=HYPERLINK("https://example-procurement.com/item/{item}","{item}")']
+
+
+@pytest.mark.parametrize("seed", [1, 7, 23, 101])
+def test_random_sheets(seed):
+    py, fast = _both(synthetic_sheets(3000, 40, 300, seed=seed))
+    assert py and py == fast
+
+
+def test_items_without_price():
+    py, fast = _both(_book([_line("A", "01/05/2025", price=""),
+                            _line("A", "02/05/2025", price=""),
+                            _line("B", "03/05/2025", days="")]))
+    assert py == fast
+
+
+def test_single_date():
+    py, fast = _both(_book([_line("A", "04/10/2025", qty=3)]))
+    assert len(py) == 1 and py == fast
+
+
+def test_pending_only_dates():
+    # "B" is only on order; "A" has a pending date after its last receipt
+    py, fast = _both(_book([_line("A", "01/05/2025"), _line("A", "03/05/2025")],
+                           [_open("A", "06/01/2025"), _open("B", "07/01/2025")]))
+    assert py == fast
+
+
+def test_string_and_serial_dates():
+    as_text = _both(_book([_line("A", "01/05/2025"), _line("A", "02/09/2025")],
+                          [_open("A", "05/01/2025")]))
+    as_serial = _both(_book([_line("A", _serial(datetime(2025, 1, 5))),
+                             _line("A", _serial(datetime(2025, 2, 9)))],
+                            [_open("A", _serial(datetime(2025, 5, 1)))]))
+    assert as_text[0] == as_text[1] == as_serial[0] == as_serial[1]
@@ -0,0 +1,31 @@
+"""parse_received_detail on the synthetic PO detail pages in fixtures/."""
+from pathlib import Path
+
+from ..html_parse import DetailPage
+from ..scrape_received import parse_received_detail
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+
+
+def _page(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def _column(html: str, col: int) -> list:
+    rows = DetailPage(html).rows
+    return [int(float(cells[col].get_text(strip=True))) for cells in rows.values() if col in cells]
+
+
+def test_received_column_follows_the_invoice_column():
+    plain = _page("po_detail.html")
+    assert [i[3] for i in parse_received_detail(plain)[2]] == _column(plain, 11)
+    invoice = _page("po_detail_invoice.html")
+    assert [i[3] for i in parse_received_detail(invoice)[2]] == _column(invoice, 12)
+
+
+def test_invoice_header_without_column_id():
+    html = _page("po_detail_invoice.html")
+    stripped = html.replace('<td class="SecHeader" id="POLines_col-11">CAD-Invoice</td>',
+                            '<td class="SecHeader">CAD-Invoice</td>')
+    assert stripped != html
+    assert parse_received_detail(stripped) == parse_received_detail(html)
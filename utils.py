@@ -1,7 +1,128 @@
 # utils.py
-from datetime import datetime
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
 from statistics import median
 
+_PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def package_path(path):
+    """
+    A file setting from config.py with a relative path resolved against
+    the package directory, not the cwd ("" – disabled – stays "").
+    """
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(_PKG_DIR, path)
+
+
+def parse_sheet_date(cell, fmt="%m/%d/%Y"):
+    """
+    Turn a date cell read back from Sheets into a datetime: a serial day
+    number (FORMULA/UNFORMATTED render) or a formatted string.
+    Returns None if the cell isn't a date.
+    """
+    if isinstance(cell, (int, float)) and not isinstance(cell, bool):
+        return datetime(1899, 12, 30) + timedelta(days=int(cell))
+    try:
+        return datetime.strptime(str(cell).strip(), fmt)
+    except ValueError:
+        return None
+
+
+class DateSeries:
+    """
+    Order dates for one item, kept sorted, with the day gaps between
+    neighbours kept sorted alongside. add() keeps duplicates (several
+    lines of one PO), add_unique() skips a date that is already there
+    with an O(log n) search, and the median gap is read off the middle
+    of the gap list instead of re-sorting.
+
+    add() only buffers; the buffer is merged on the next read, in one
+    sort when it is large and by single inserts (patching the two
+    neighbouring gaps) when it is small. Iterates oldest → newest.
+    """
+
+    __slots__ = ("_dates", "_gaps", "_buffer", "months")
+
+    def __init__(self, dates=()):
+        self._dates = []
+        self._gaps = []       # sorted day gaps between consecutive dates
+        self._buffer = []     # added, not yet merged
+        self.months = set()   # {(year, month)}
+        for dt in dates:
+            self.add(dt)
+
+    def _settle(self):
+        buf = self._buffer
+        if not buf:
+            return
+        self._buffer = []
+        if len(buf) * 8 < len(self._dates):
+            for dt in buf:
+                self._insert(dt)
+            return
+        dates = self._dates = sorted(self._dates + buf)
+        self._gaps = sorted((dates[i + 1] - dates[i]).days for i in range(len(dates) - 1))
+
+    def _insert(self, dt):
+        dates, gaps = self._dates, self._gaps
+        i = bisect_right(dates, dt)
+        prev = dates[i - 1] if i else None
+        nxt = dates[i] if i < len(dates) else None
+        if prev is not None and nxt is not None:
+            del gaps[bisect_left(gaps, (nxt - prev).days)]
+        if prev is not None:
+            insort(gaps, (dt - prev).days)
+        if nxt is not None:
+            insort(gaps, (nxt - dt).days)
+        dates.insert(i, dt)
+
+    def __len__(self):
+        return len(self._dates) + len(self._buffer)
+
+    def __iter__(self):
+        self._settle()
+        return iter(self._dates)
+
+    def __contains__(self, dt):
+        self._settle()
+        i = bisect_left(self._dates, dt)
+        return i < len(self._dates) and self._dates[i] == dt
+
+    def add(self, dt):
+        self._buffer.append(dt)
+        self.months.add((dt.year, dt.month))
+
+    def add_unique(self, dt):
+        """Add dt unless it is already present; True if it was added."""
+        if dt in self:
+            return False
+        self._insert(dt)
+        self.months.add((dt.year, dt.month))
+        return True
+
+    @property
+    def first(self):
+        self._settle()
+        return self._dates[0] if self._dates else None
+
+    @property
+    def last(self):
+        self._settle()
+        return self._dates[-1] if self._dates else None
+
+    def median_gap(self):
+        """statistics.median of the gaps, or inf with fewer than two dates."""
+        self._settle()
+        gaps, n = self._gaps, len(self._gaps)
+        if not n:
+            return float("inf")
+        mid = n // 2
+        return gaps[mid] if n % 2 else (gaps[mid - 1] + gaps[mid]) / 2
+
+
 def get_last_order_date(dates):
     """Return the most recent order date as YYYY-MM-DD string."""
     if not dates:
@@ -9,28 +130,45 @@ def get_last_order_date(dates):
     return max(dates).strftime("%Y-%m-%d")
 
 
-def order_frequency_median(dates, badge=None, today=None):
+def order_frequency_parts(dates):
     """
-    ✅  -> 'every N days'  (median gap of UNIQUE order dates)
-    non-✅ & >1 -> 'last ordered X days ago'
-    exactly 1   -> 'Once — X days ago'
+    What order_frequency_median needs from the dates, so the text can be
+    re-rendered for another day without them: (number of distinct days,
+    last day, int median gap between distinct days or None).
     """
-    if not dates:
+    uds = sorted({(d.date() if isinstance(d, datetime) else d) for d in dates})
+    if not uds:
+        return 0, None, None
+    gaps = [(uds[i+1] - uds[i]).days for i in range(len(uds)-1)]
+    return len(uds), uds[-1], (int(median(gaps)) if gaps else None)
+
+
+def order_frequency_text(parts, badge=None, today=None):
+    """order_frequency_median from order_frequency_parts(dates)."""
+    n_unique, last, med_gap = parts
+    if not n_unique:
         return ""
 
     today = today or datetime.now().date()
-    uds = sorted({(d.date() if isinstance(d, datetime) else d) for d in dates})
-    last = uds[-1]
     days_ago = max(0, (today - last).days)
 
-    if len(uds) == 1:
+    if n_unique == 1:
         return f"Once — {days_ago} days ago"
 
     if badge == "✅":
-        gaps = [(uds[i+1] - uds[i]).days for i in range(len(uds)-1)]
-        if not gaps:
+        if med_gap is None:
             return f"Once — {days_ago} days ago"
-        med_gap = int(median(gaps))
         return f"lasts {med_gap} days" if med_gap > 0 else f"Once — {days_ago} days ago"
 
     return f"last ordered {days_ago} days ago"
+
+
+def order_frequency_median(dates, badge=None, today=None):
+    """
+    ✅  -> 'every N days'  (median gap of UNIQUE order dates)
+    non-✅ & >1 -> 'last ordered X days ago'
+    exactly 1   -> 'Once — X days ago'
+    """
+    if not dates:
+        return ""
+    return order_frequency_text(order_frequency_parts(dates), badge, today)
@@ -0,0 +1,204 @@
+"""
+Waiting on the browser without fixed sleeps.
+
+Every wait is a WebDriverWait on a readiness condition – an element,
+document.readyState, or the page's network going quiet – under a named
+step ("login", "home", "detail page", …). Timeouts adapt per step: a step
+that has been waited on before times out at WAIT_TIMEOUT_FACTOR × the
+slowest of its last WAIT_HISTORY waits (kept within WAIT_MIN_TIMEOUT ..
+WAIT_MAX_TIMEOUT), so a hung page is given up on quickly on a fast day
+and a slow portal still gets the time it needs. A wait that reaches its
+adapted timeout fails there; the time it took is recorded, so the step's
+next timeout is wider.
+
+Each wait is appended to config.WAIT_LOG_FILE (step, seconds, timeout,
+ok); the log also seeds the timeouts of the next run. report() prints the
+per-step timings since the last report.
+
+Exposes:
+    document_ready(driver) / NetworkIdle(quiet)    conditions
+    until(driver, condition, step) -> condition result
+    page_settled(driver, step)                      ready + network idle
+    timeout_for(step) -> float
+    report()
+"""
+from __future__ import annotations
+
+import csv
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from statistics import median
+from typing import Deque, Dict, List, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from . import config
+from .utils import package_path
+
+_lock = threading.Lock()
+_recent: Dict[str, Deque[float]] = {}         # step → recent latencies (s)
+_run: Dict[str, List[float]] = defaultdict(list)
+_timeouts: Dict[str, int] = defaultdict(int)
+_seeded = False
+
+_LOG_HEADER = ["time", "step", "seconds", "timeout", "ok"]
+
+
+# --------------------------------------------------
+# CONDITIONS
+# --------------------------------------------------
+
+def document_ready(driver) -> bool:
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+_RESOURCE_COUNT_JS = """
+return [performance.getEntriesByType('resource').length,
+        window.jQuery ? window.jQuery.active : 0,
+        document.readyState];
+"""
+
+
+class NetworkIdle:
+    """
+    True once the document is loaded, no jQuery request is open and no
+    new resource (XHR, script, image…) has been fetched for `quiet`
+    seconds. One instance per wait.
+    """
+
+    def __init__(self, quiet: Optional[float] = None):
+        self.quiet = config.WAIT_NETWORK_QUIET if quiet is None else quiet
+        self._count = -1
+        self._since = 0.0
+
+    def __call__(self, driver) -> bool:
+        count, active, state = driver.execute_script(_RESOURCE_COUNT_JS)
+        now = time.monotonic()
+        if count != self._count or active or state != "complete":
+            self._count, self._since = count, now
+            return False
+        return now - self._since >= self.quiet
+
+
+# --------------------------------------------------
+# ADAPTIVE TIMEOUTS
+# --------------------------------------------------
+
+def _history(step: str) -> Deque[float]:
+    hist = _recent.get(step)
+    if hist is None:
+        hist = _recent[step] = deque(maxlen=config.WAIT_HISTORY)
+    return hist
+
+
+def _seed() -> None:
+    """
+    Load recent latencies from the wait log (once per process), and trim
+    the log to the entries still used when it has grown well past them.
+    """
+    global _seeded
+    if _seeded:
+        return
+    _seeded = True
+    path = package_path(config.WAIT_LOG_FILE)
+    if not path or not os.path.exists(path):
+        return
+    kept: Dict[str, Deque[list]] = {}
+    total = 0
+    try:
+        with open(path, newline="", encoding="utf-8") as fh:
+            for row in csv.reader(fh):
+                if len(row) < 5 or row[0] == "time":
+                    continue
+                total += 1
+                _history(row[1]).append(float(row[2]))
+                kept.setdefault(row[1], deque(maxlen=config.WAIT_HISTORY)).append(row)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable wait log {path}: {e}")
+        return
+
+    rows = sorted((r for q in kept.values() for r in q), key=lambda r: float(r[0]))
+    if total > 4 * len(rows):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as fh:
+            w = csv.writer(fh)
+            w.writerow(_LOG_HEADER)
+            w.writerows(rows)
+        os.replace(tmp, path)
+
+
+def timeout_for(step: str) -> float:
+    """Timeout for the next wait on `step`."""
+    with _lock:
+        _seed()
+        hist = _recent.get(step)
+        if not hist:
+            return float(config.WAIT_TIMEOUT)
+        t = config.WAIT_TIMEOUT_FACTOR * max(hist)
+    return min(config.WAIT_MAX_TIMEOUT, max(config.WAIT_MIN_TIMEOUT, t))
+
+
+def _record(step: str, seconds: float, timeout: float, ok: bool) -> None:
+    with _lock:
+        _history(step).append(seconds)
+        _run[step].append(seconds)
+        if not ok:
+            _timeouts[step] += 1
+        path = package_path(config.WAIT_LOG_FILE)
+        if not path:
+            return
+        try:
+            new = not os.path.exists(path)
+            with open(path, "a", newline="", encoding="utf-8") as fh:
+                w = csv.writer(fh)
+                if new:
+                    w.writerow(_LOG_HEADER)
+                w.writerow([f"{time.time():.0f}", step, f"{seconds:.3f}",
+                            f"{timeout:.1f}", int(ok)])
+        except OSError:
+            pass
+
+
+# --------------------------------------------------
+# WAITS
+# --------------------------------------------------
+
+def until(driver, condition, step: str, poll: float = 0.1):
+    """
+    WebDriverWait(driver, adaptive timeout).until(condition), timed and
+    logged under `step`. Raises TimeoutException at the adapted timeout.
+    """
+    timeout = timeout_for(step)
+    t0 = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll).until(condition)
+    except TimeoutException:
+        print(f"🐢 '{step}' not ready after {timeout:.0f}s.")
+        _record(step, time.perf_counter() - t0, timeout, False)
+        raise
+    _record(step, time.perf_counter() - t0, timeout, True)
+    return result
+
+
+def page_settled(driver, step: str) -> None:
+    """Wait until the current page has loaded and its network is idle."""
+    until(driver, NetworkIdle(), step)
+
+
+def report() -> None:
+    """Print and reset the per-step wait times (waits, median, slowest, next timeout)."""
+    with _lock:
+        steps = {s: list(v) for s, v in _run.items()}
+        failures = dict(_timeouts)
+        _run.clear()
+        _timeouts.clear()
+    if not steps:
+        return
+    print("⏱️  Browser waits:")
+    for step, times in sorted(steps.items(), key=lambda kv: -sum(kv[1])):
+        failed = f", {failures[step]} timed out" if failures.get(step) else ""
+        print(f"   {step:<22} {len(times):>4}× median {median(times):5.2f}s, "
+              f"slowest {max(times):5.2f}s, next timeout {timeout_for(step):4.0f}s{failed}")